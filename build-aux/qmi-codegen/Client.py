@@ -22,6 +22,7 @@ import string
 
 from MessageList import MessageList
 import utils
+import Stats
 
 """
 The Client class is responsible for providing the QmiClient-based service
@@ -60,7 +61,7 @@ class Client:
             template += '#define HAVE_QMI_SERVICE_${service}\n'
         else:
             template += '/* HAVE_QMI_SERVICE_${service} */\n'
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
 
     """
     Emits the generic GObject class implementation
@@ -107,7 +108,7 @@ class Client:
             'GType ${underscore}_get_type (void);\n'
             'G_DEFINE_AUTOPTR_CLEANUP_FUNC (${camelcase}, g_object_unref)\n'
             '\n')
-        hfile.write(string.Template(template).substitute(translations))
+        hfile.write(utils.substitute_template(template, translations))
 
         # Emit class source. Documentation skipped for the CTL service.
         template = ''
@@ -133,13 +134,23 @@ class Client:
                 translations['signal_id'] = utils.build_underscore_uppercase_name(message.name)
                 inner_template = (
                     '    SIGNAL_${signal_id},\n')
-                template += string.Template(inner_template).substitute(translations)
+                template += utils.substitute_template(inner_template, translations)
             template += (
                 '    SIGNAL_LAST\n'
                 '};\n'
                 '\n'
                 'static guint signals[SIGNAL_LAST] = { 0 };\n')
 
+            # The last output of the indications with a change mask is kept
+            # in the client, to compare the next one against
+            for message in message_list.indication_list:
+                if message.output.change_mask_since is not None:
+                    template += (
+                        '\n'
+                        '/* Keys of the last outputs of the indications with a change mask */\n'
+                        'static GQuark previous_output_quarks[SIGNAL_LAST] = { 0 };\n')
+                    break
+
         template += (
             '\n'
             'static void\n'
@@ -164,6 +175,10 @@ class Client:
                     '            ${output_camelcase} *output;\n'
                     '            GError *error = NULL;\n'
                     '\n'
+                    '            /* Don\'t parse the indication if nobody is listening */\n'
+                    '            if (!g_signal_has_handler_pending (self, signals[SIGNAL_${signal_id}], 0, FALSE))\n'
+                    '                break;\n'
+                    '\n'
                     '            /* Parse indication */\n'
                     '            output = __${message_fullname_underscore}_indication_parse (message, &error);\n'
                     '            if (!output) {\n'
@@ -171,7 +186,20 @@ class Client:
                     '                           error ? error->message : "Unknown error");\n'
                     '                if (error)\n'
                     '                    g_error_free (error);\n'
-                    '            } else {\n'
+                    '            } else {\n')
+                if message.output.change_mask_since is not None:
+                    inner_template += (
+                        '                ${output_camelcase} *previous;\n'
+                        '\n'
+                        '                /* Flag which fields changed since the last indication */\n'
+                        '                previous = g_object_get_qdata (G_OBJECT (self), previous_output_quarks[SIGNAL_${signal_id}]);\n'
+                        '                __${output_underscore}_update_changed_fields (output, previous);\n'
+                        '                g_object_set_qdata_full (G_OBJECT (self),\n'
+                        '                                         previous_output_quarks[SIGNAL_${signal_id}],\n'
+                        '                                         ${output_underscore}_ref (output),\n'
+                        '                                         (GDestroyNotify)${output_underscore}_unref);\n'
+                        '\n')
+                inner_template += (
                     '                g_signal_emit (self, signals[SIGNAL_${signal_id}], 0, output);\n'
                     '                ${output_underscore}_unref (output);\n'
                     '            }\n'
@@ -185,7 +213,7 @@ class Client:
                     '            break;\n'
                     '        }\n')
 
-            template += string.Template(inner_template).substitute(translations)
+            template += utils.substitute_template(inner_template, translations)
 
         template += (
             '        default:\n'
@@ -211,6 +239,11 @@ class Client:
             translations['message_name'] = message.name
             translations['since'] = message.since
             inner_template = ''
+            if message.output.change_mask_since is not None:
+                translations['quark_name'] = utils.build_dashed_name(message.output.fullname) + '-previous'
+                inner_template += (
+                    '\n'
+                    '    previous_output_quarks[SIGNAL_${signal_id}] = g_quark_from_static_string ("${quark_name}");\n')
             if message.output is not None and message.output.fields is not None:
                 # At least one field in the indication
                 translations['output_camelcase'] = utils.build_camelcase_name(message.output.fullname)
@@ -261,12 +294,12 @@ class Client:
                     '                      NULL,\n'
                     '                      G_TYPE_NONE,\n'
                     '                      0);\n')
-            template += string.Template(inner_template).substitute(translations)
+            template += utils.substitute_template(inner_template, translations)
 
         template += (
             '}\n'
             '\n')
-        cfile.write(string.Template(template).substitute(translations))
+        cfile.write(utils.substitute_template(template, translations))
 
 
     """
@@ -283,6 +316,9 @@ class Client:
             if message.static:
                 continue
 
+            measurement = Stats.measure(message.fullname, 'client methods', hfile, cfile)
+            measurement.start()
+
             translations['message_name'] = message.name
             translations['message_vendor_id'] = message.vendor
             translations['message_underscore'] = utils.build_underscore_name(message.name)
@@ -356,7 +392,7 @@ class Client:
                 '    ${camelcase} *self,\n'
                 '    GAsyncResult *res,\n'
                 '    GError **error);\n')
-            hfile.write(string.Template(template).substitute(translations))
+            hfile.write(utils.substitute_template(template, translations))
 
             template = (
                 '\n'
@@ -552,7 +588,9 @@ class Client:
             template += (
                 '}\n'
                 '\n')
-            cfile.write(string.Template(template).substitute(translations))
+            cfile.write(utils.substitute_template(template, translations))
+
+            measurement.stop()
 
 
     """
@@ -602,4 +640,4 @@ class Client:
             '${underscore}_get_type\n'
             '</SECTION>\n'
             '\n')
-        sfile.write(string.Template(template).substitute(translations))
+        sfile.write(utils.substitute_template(template, translations))
@@ -0,0 +1,98 @@
+# -*- Mode: python; tab-width: 4; indent-tabs-mode: nil -*-
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2 of the License, or (at your option) any
+# later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Copyright (C) 2012-2017 Aleksander Morgado <aleksander@aleksander.es>
+#
+
+"""
+Whether the TLVs of the service currently being generated are read, written
+and printed with the table-driven codec in libqmi-glib (see qmi-codec.h),
+instead of with fully unrolled code.
+"""
+enabled = False
+
+
+"""
+Enables (or not) the table-driven codec for the service being generated.
+"""
+def reset(enable):
+    global enabled
+    enabled = enable
+
+
+"""
+Builds the C expression giving the offset of a variable within the given
+type, or None if the variable is the value itself (e.g. array elements).
+"""
+def build_offset(type_name, variable_name):
+    if type_name is None or variable_name is None:
+        return None
+    return 'G_STRUCT_OFFSET (%s, %s)' % (type_name, variable_name)
+
+
+"""
+Sets the value of a member of a descriptor, replacing any previous one.
+"""
+def set_member(members, key, value):
+    for i in range(len(members)):
+        if isinstance(members[i], tuple) and members[i][0] == key:
+            members[i] = (key, value)
+            return
+    members.append((key, value))
+
+
+"""
+Builds the initializer of a single descriptor, given the list of its members
+as (key, value) tuples. Plain strings in the list are written as they are, so
+that preprocessor conditionals may be used.
+"""
+def build_initializer(line_prefix, members):
+    built = line_prefix + '{\n'
+    for member in members:
+        if isinstance(member, tuple):
+            if member[1] is not None:
+                built += '%s    .%-19s = %s,\n' % (line_prefix, member[0], member[1])
+        else:
+            built += member + '\n'
+    built += line_prefix + '}'
+    return built
+
+
+"""
+The nested descriptor tables required by the descriptor of a given TLV, which
+must be emitted before it.
+"""
+class Tables:
+
+    """
+    Constructor
+    """
+    def __init__(self, name):
+        self.name = name
+        self.n_tables = 0
+        self.built = ''
+
+    """
+    Adds a new table with the given descriptors, returning its name
+    """
+    def add(self, descriptors):
+        self.n_tables += 1
+        table_name = '%s_%u' % (self.name, self.n_tables)
+        self.built += '\nstatic const QmiCodecField %s[] = {\n' % table_name
+        for members in descriptors:
+            self.built += build_initializer('    ', members) + ',\n'
+        self.built += '};\n'
+        return table_name
@@ -18,9 +18,9 @@
 # Copyright (C) 2012-2017 Aleksander Morgado <aleksander@aleksander.es>
 #
 
-import string
 
 import utils
+import Stats
 from FieldResult import FieldResult
 from Field import Field
 
@@ -33,7 +33,7 @@ class Container:
     """
     Constructor
     """
-    def __init__(self, prefix, container_type, dictionary, common_objects_dictionary, static, since):
+    def __init__(self, prefix, container_type, dictionary, common_objects_dictionary, static, since, lazy = False, arena = False, change_mask_since = None):
         # The field container prefix usually contains the name of the Message,
         # e.g. "Qmi Message Ctl Something"
         self.prefix = prefix
@@ -63,23 +63,20 @@ class Container:
             # First, look for references to common types
             for field_dictionary in dictionary:
                 if 'common-ref' in field_dictionary:
-                    for common in common_objects_dictionary:
-                        if common['type'] == 'TLV' and \
-                           common['common-ref'] == field_dictionary['common-ref']:
-                           # Replace the reference with a copy of the common dictionary
-                           # If the source reference has prerequisites, add them to the copy
-                           copy = dict(common)
-                           if 'prerequisites' in field_dictionary:
-                               copy['prerequisites'] = field_dictionary['prerequisites']
-                           # Fix 'since' in the copy
-                           if 'since' in field_dictionary:
-                               copy['since'] = field_dictionary['since']
-                           else:
-                               copy['since'] = self.since
-                           new_dict.append(copy)
-                           break
-                    else:
+                    common = common_objects_dictionary.get(('TLV', field_dictionary['common-ref']))
+                    if common is None:
                         raise RuntimeError('Common type \'%s\' not found' % field_dictionary['name'])
+                    # Replace the reference with a copy of the common dictionary
+                    # If the source reference has prerequisites, add them to the copy
+                    copy = dict(common)
+                    if 'prerequisites' in field_dictionary:
+                        copy['prerequisites'] = field_dictionary['prerequisites']
+                    # Fix 'since' in the copy
+                    if 'since' in field_dictionary:
+                        copy['since'] = field_dictionary['since']
+                    else:
+                        copy['since'] = self.since
+                    new_dict.append(copy)
                 else:
                     new_dict.append(field_dictionary)
             dictionary = new_dict
@@ -102,6 +99,54 @@ class Container:
                     else:
                         self.fields.append(Field(self.fullname, field_dictionary, common_objects_dictionary, container_type, static))
 
+        # Output containers may keep a reference to the QMI message and decode
+        # the optional fields only when they're first read. Mandatory fields and
+        # fields used as prerequisites of other fields are always decoded right
+        # away.
+        self.lazy = False
+        if lazy and self.readonly and self.fields is not None:
+            prerequisite_fields = set()
+            for field in self.fields:
+                for prerequisite in field.prerequisites:
+                    prerequisite_fields.add(utils.build_underscore_name(prerequisite['field'].split('.')[0]))
+            for field in self.fields:
+                if not field.mandatory and utils.build_underscore_name(field.name) not in prerequisite_fields:
+                    field.lazy = True
+                    self.lazy = True
+
+        # Output containers may store the strings of all their fields in a
+        # single arena, freed at once along with the container, instead of
+        # allocating and freeing each of them on its own. Fields given as views
+        # of the message data keep their own copies, and so do array elements,
+        # as the arrays returned by the getters may outlive the container.
+        self.arena = False
+        if arena and self.readonly and self.fields is not None:
+            for field in self.fields:
+                if not field.zero_copy and field.variable.flag_arena('self->arena'):
+                    field.arena = True
+                    self.arena = True
+
+        # Output containers may flag which of their fields changed when compared
+        # to a previous container of the same type, one bit per field. Fields
+        # decoded on demand or given as views of the message data can't be
+        # compared right away, so they're not supported.
+        self.change_mask_since = None
+        if change_mask_since is not None and self.readonly and self.fields is not None:
+            if len(self.fields) > 64:
+                raise ValueError('Container ' + self.fullname + ' has too many fields for a change mask')
+            for field in self.fields:
+                if field.lazy or field.zero_copy:
+                    raise ValueError('Container ' + self.fullname + ' cannot have a change mask: field \'' + field.name + '\' is lazy or zero-copy')
+            self.change_mask_since = change_mask_since
+
+        # The QMI message is kept around if fields are decoded on demand, or if
+        # there are fields given as views of the message data
+        self.keeps_message = self.lazy
+        if self.fields is not None:
+            for field in self.fields:
+                if field.zero_copy:
+                    self.keeps_message = True
+
 
     """
     Emit enumeration of TLVs in the container
@@ -116,7 +161,7 @@ class Container:
                              'enum_value' : tlv.id }
             template = (
                 '#define ${enum_name} ${enum_value}\n')
-            f.write(string.Template(template).substitute(translations))
+            f.write(utils.substitute_template(template, translations))
 
 
     """
@@ -140,14 +185,29 @@ class Container:
             'typedef struct _${camelcase} ${camelcase};\n'
             '${static}GType ${underscore}_get_type (void) G_GNUC_CONST;\n'
             '#define ${type_macro} (${underscore}_get_type ())\n')
-        hfile.write(string.Template(template).substitute(translations))
+        hfile.write(utils.substitute_template(template, translations))
 
         # Emit types source
         template = (
             '\n'
             'struct _${camelcase} {\n'
             '    volatile gint ref_count;\n')
-        cfile.write(string.Template(template).substitute(translations))
+        if self.keeps_message:
+            template += (
+                '\n'
+                '    /* Message the fields are read from */\n'
+                '    QmiMessage *message;\n')
+        if self.arena:
+            template += (
+                '\n'
+                '    /* Arena where the strings of the fields are stored */\n'
+                '    GStringChunk *arena;\n')
+        if self.change_mask_since is not None:
+            template += (
+                '\n'
+                '    /* Fields changed since the previous container */\n'
+                '    guint64 changed_fields;\n')
+        cfile.write(utils.substitute_template(template, translations))
 
         if self.fields is not None:
             for field in self.fields:
@@ -159,13 +219,114 @@ class Container:
                         '\n'
                         '    /* ${field_name} */\n'
                         '    gboolean ${field_variable_name}_set;\n')
-                    cfile.write(string.Template(template).substitute(translations))
+                    if field.lazy:
+                        template += (
+                            '    gsize ${field_variable_name}_tlv_offset;\n'
+                            '    volatile gsize ${field_variable_name}_decoded;\n')
+                    cfile.write(utils.substitute_template(template, translations))
                     cfile.write(variable_declaration)
+                    if field.zero_copy:
+                        cfile.write(field.variable.build_view_declaration('    ', field.variable_name))
 
         cfile.write(
             '};\n')
 
 
+    """
+    Emit the change mask of the container: the bit of each field, the public
+    getter of the mask, and the method updating it
+    """
+    def __emit_change_mask(self, hfile, cfile, translations):
+        translations['change_mask_since'] = self.change_mask_since
+        translations['underscore_upper'] = utils.build_underscore_name(self.fullname).upper()
+
+        template = ''
+        for i in range(len(self.fields)):
+            translations['field_name'] = self.fields[i].name
+            translations['field_underscore_upper'] = utils.build_underscore_name(self.fields[i].name).upper()
+            translations['bit'] = i
+            if self.static == False:
+                template += utils.substitute_template(
+                    '\n'
+                    '/**\n'
+                    ' * ${underscore_upper}_CHANGED_${field_underscore_upper}:\n'
+                    ' *\n'
+                    ' * Bit flagging a change in the \'${field_name}\' field, in the mask given by\n'
+                    ' * ${underscore}_get_changed_fields().\n'
+                    ' *\n'
+                    ' * Since: ${change_mask_since}\n'
+                    ' */\n', translations)
+            template += utils.substitute_template(
+                '#define ${underscore_upper}_CHANGED_${field_underscore_upper} (G_GUINT64_CONSTANT (1) << ${bit})\n', translations)
+
+        template += '\n'
+        if self.static == False:
+            template += (
+                '/**\n'
+                ' * ${underscore}_get_changed_fields:\n'
+                ' * @self: a #${camelcase}.\n'
+                ' *\n'
+                ' * Gets which fields of @self changed since the previous ${camelcase}\n'
+                ' * emitted by the same client. Fields which are set now and weren\'t set\n'
+                ' * before, or the other way around, are also flagged as changed. If there was\n'
+                ' * no previous ${camelcase}, all the fields set in @self are flagged.\n'
+                ' *\n'
+                ' * Returns: a mask of ${underscore_upper}_CHANGED_* values.\n'
+                ' *\n'
+                ' * Since: ${change_mask_since}\n'
+                ' */\n')
+        template += (
+            '${static}guint64 ${underscore}_get_changed_fields (\n'
+            '    ${camelcase} *self);\n')
+        hfile.write(utils.substitute_template(template, translations))
+
+        template = (
+            '\n'
+            '${static}guint64\n'
+            '${underscore}_get_changed_fields (\n'
+            '    ${camelcase} *self)\n'
+            '{\n'
+            '    g_return_val_if_fail (self != NULL, 0);\n'
+            '\n'
+            '    return self->changed_fields;\n'
+            '}\n'
+            '\n'
+            'static void\n'
+            '__${underscore}_update_changed_fields (\n'
+            '    ${camelcase} *self,\n'
+            '    ${camelcase} *previous)\n'
+            '{\n'
+            '    self->changed_fields = 0;\n')
+        cfile.write(utils.substitute_template(template, translations))
+
+        for field in self.fields:
+            translations['field_name'] = field.name
+            translations['field_underscore_upper'] = utils.build_underscore_name(field.name).upper()
+            translations['variable_name'] = field.variable_name
+            template = (
+                '\n'
+                '    /* ${field_name} */\n'
+                '    {\n'
+                '        gboolean changed = FALSE;\n'
+                '\n'
+                '        if (!previous)\n'
+                '            changed = self->${variable_name}_set;\n'
+                '        else if (self->${variable_name}_set != previous->${variable_name}_set)\n'
+                '            changed = TRUE;\n'
+                '        else if (self->${variable_name}_set) {\n')
+            cfile.write(utils.substitute_template(template, translations))
+            field.variable.emit_compare(cfile, '            ', 'self->' + field.variable_name, 'previous->' + field.variable_name, 'changed')
+            template = (
+                '        }\n'
+                '        if (changed)\n'
+                '            self->changed_fields |= ${underscore_upper}_CHANGED_${field_underscore_upper};\n'
+                '    }\n')
+            cfile.write(utils.substitute_template(template, translations))
+
+        cfile.write(
+            '}\n')
+
+
     """
     Emit container handling core implementation
     """
@@ -219,9 +380,17 @@ class Container:
                 '${static}${camelcase} *${underscore}_new (void);\n')
 
         if self.static:
-            cfile.write(string.Template(template).substitute(translations))
+            cfile.write(utils.substitute_template(template, translations))
         else:
-            hfile.write(string.Template(template).substitute(translations))
+            hfile.write(utils.substitute_template(template, translations))
+
+        # Output containers are only allocated by the parsers, and when freed
+        # they are kept in a pool to be reused by the next parsed message
+        if self.readonly:
+            template = (
+                '\n'
+                'static QmiHelpersPool ${underscore}_pool;\n')
+            cfile.write(utils.substitute_template(template, translations))
 
         # Emit container core source
         template = (
@@ -264,11 +433,26 @@ class Container:
                 if field.variable is not None and field.variable.needs_dispose is True:
                     template += field.variable.build_dispose('        ', 'self->' + field.variable_name)
 
+        if self.keeps_message:
+            template += (
+                '        if (self->message)\n'
+                '            qmi_message_unref (self->message);\n')
+
+        if self.arena:
+            template += (
+                '        if (self->arena)\n'
+                '            g_string_chunk_free (self->arena);\n')
+
+        if self.readonly:
+            template += (
+                '        qmi_helpers_pool_free (&${underscore}_pool, sizeof (${camelcase}), self);\n')
+        else:
+            template += (
+                '        g_slice_free (${camelcase}, self);\n')
         template += (
-            '        g_slice_free (${camelcase}, self);\n'
             '    }\n'
             '}\n')
-        cfile.write(string.Template(template).substitute(translations))
+        cfile.write(utils.substitute_template(template, translations))
 
         # _new() is only generated if the container is not readonly
         if self.readonly == True:
@@ -285,7 +469,7 @@ class Container:
             '    self->ref_count = 1;\n'
             '    return self;\n'
             '}\n')
-        cfile.write(string.Template(template).substitute(translations))
+        cfile.write(utils.substitute_template(template, translations))
 
 
     """
@@ -303,26 +487,47 @@ class Container:
         if self.fields is None:
             template = ('\n'
                         '/* Note: no fields in the ${name} container */\n')
-            auxfile.write(string.Template(template).substitute(translations))
-            cfile.write(string.Template(template).substitute(translations))
+            auxfile.write(utils.substitute_template(template, translations))
+            cfile.write(utils.substitute_template(template, translations))
             return
 
         # Emit the container and field  types
         # Emit field getter/setter
         if self.fields is not None:
             for field in self.fields:
-                field.emit_types(auxfile, cfile)
+                with Stats.measure(self.prefix, 'types', auxfile, cfile, field.fullname):
+                    field.emit_types(auxfile, cfile)
         self.__emit_types(auxfile, cfile, translations)
 
         # Emit TLV enums
         self.__emit_tlv_ids_enum(cfile)
 
+        # Emit the codec descriptors, which need the container type
+        for field in self.fields:
+            with Stats.measure(self.prefix, 'codec descriptors', auxfile, cfile, field.fullname):
+                field.emit_codec_descriptor(cfile)
+
+        # Emit the methods decoding fields on demand
+        if self.lazy:
+            for field in self.fields:
+                if field.lazy:
+                    with Stats.measure(self.prefix, 'parser', auxfile, cfile, field.fullname):
+                        field.emit_output_tlv_decode(cfile)
+
         # Emit fields
         if self.fields is not None:
             for field in self.fields:
-                field.emit_getter(auxfile, cfile)
+                with Stats.measure(self.prefix, 'getters', auxfile, cfile, field.fullname):
+                    field.emit_getter(auxfile, cfile)
+                    if field.zero_copy:
+                        field.emit_zero_copy_getter(auxfile, cfile)
                 if self.readonly == False:
-                    field.emit_setter(auxfile, cfile)
+                    with Stats.measure(self.prefix, 'setters', auxfile, cfile, field.fullname):
+                        field.emit_setter(auxfile, cfile)
+
+        # Emit the change mask
+        if self.change_mask_since is not None:
+            self.__emit_change_mask(auxfile, cfile, translations)
 
         # Emit the container core
         self.__emit_core(auxfile, cfile, translations)
@@ -344,12 +549,12 @@ class Container:
         template = (
             '${underscore}_get_type\n'
             '${type_macro}\n')
-        sections['standard'] += string.Template(template).substitute(translations)
+        sections['standard'] += utils.substitute_template(template, translations)
 
         # Public types
         template = (
             '${camelcase}\n')
-        sections['public-types'] += string.Template(template).substitute(translations)
+        sections['public-types'] += utils.substitute_template(template, translations)
 
         # Public methods
         template = '<SUBSECTION ${camelcase}Methods>\n'
@@ -359,7 +564,19 @@ class Container:
         template += (
             '${underscore}_ref\n'
             '${underscore}_unref\n')
-        sections['public-methods'] += string.Template(template).substitute(translations)
+        if self.change_mask_since is not None:
+            template += (
+                '${underscore}_get_changed_fields\n')
+        sections['public-methods'] += utils.substitute_template(template, translations)
+
+        # Change mask bits
+        if self.change_mask_since is not None:
+            translations['underscore_upper'] = utils.build_underscore_name(self.fullname).upper()
+            for field in self.fields:
+                translations['field_underscore_upper'] = utils.build_underscore_name(field.name).upper()
+                template = (
+                    '${underscore_upper}_CHANGED_${field_underscore_upper}\n')
+                sections['public-types'] += utils.substitute_template(template, translations)
 
         for field in self.fields:
             field.add_sections(sections)
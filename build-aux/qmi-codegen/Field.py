@@ -18,11 +18,12 @@
 # Copyright (C) 2012-2017 Aleksander Morgado <aleksander@aleksander.es>
 #
 
-import string
 
 import utils
 import VariableFactory
 import TypeFactory
+import Codec
+from VariableArray import VariableArray
 
 """
 The Field class takes care of handling Input and Output TLVs
@@ -67,6 +68,27 @@ class Field:
         # Create the ID enumeration name
         self.id_enum_name = utils.build_underscore_name(self.prefix + ' TLV ' + self.name).upper()
 
+        # Output Fields may be decoded on demand, the first time they're read,
+        # if the container says so
+        self.lazy = False
+
+        # Output Fields may store their strings in an arena owned by the
+        # container, if the container says so
+        self.arena = False
+
+        # Whether the codec descriptor of the field has been emitted
+        self.codec_emitted = False
+
+        # Output string and byte array Fields may be read without copying them,
+        # and exposed as views of the message data with an additional getter
+        self.zero_copy = True if 'zero-copy' in dictionary and dictionary['zero-copy'] == 'yes' else False
+        if self.zero_copy:
+            if self.container_type != 'Output' or not self.variable.supports_zero_copy():
+                raise ValueError('TLV ' + self.fullname + ' cannot be zero-copy: only variable-length strings and guint8 arrays in output containers are supported')
+            self.zero_copy_since = dictionary['zero-copy-since'] if 'zero-copy-since' in dictionary else None
+            if self.zero_copy_since is None:
+                raise ValueError('TLV ' + self.fullname + ' requires a "zero-copy-since" tag specifying the version where the zero-copy getter was introduced')
+
         # Output Fields may have prerequisites
         self.prerequisites = []
         if 'prerequisites' in dictionary:
@@ -74,16 +96,13 @@ class Field:
             # First, look for references to common types
             for prerequisite_dictionary in self.prerequisites:
                 if 'common-ref' in prerequisite_dictionary:
-                    for common in common_objects_dictionary:
-                        if common['type'] == 'prerequisite' and \
-                           common['common-ref'] == prerequisite_dictionary['common-ref']:
-                           # Replace the reference with a copy of the common dictionary
-                           copy = dict(common)
-                           self.prerequisites.remove(prerequisite_dictionary)
-                           self.prerequisites.append(copy)
-                           break
-                    else:
+                    common = common_objects_dictionary.get(('prerequisite', prerequisite_dictionary['common-ref']))
+                    if common is None:
                         raise RuntimeError('Common type \'%s\' not found' % prerequisite_dictionary['name'])
+                    # Replace the reference with a copy of the common dictionary
+                    copy = dict(common)
+                    self.prerequisites.remove(prerequisite_dictionary)
+                    self.prerequisites.append(copy)
 
 
     @property
@@ -93,6 +112,74 @@ class Field:
         return self._mandatory == 'yes'
 
 
+    """
+    Name of the method decoding the field on demand
+    """
+    def build_decode_function_name(self):
+        # Use the container prefix and not the full name, as TLVs from common
+        # types may have the same full name in different containers
+        return '__' + utils.build_underscore_name(self.prefix + ' ' + self.name) + '_decode'
+
+
+    """
+    Code decoding the field the first time it's read, for fields decoded on
+    demand. Several threads may read the same container, so the decoding is
+    guarded by a one-time initialization word, and the TLV offset is cleared
+    only once the decoded field is published.
+    """
+    def build_lazy_decode(self):
+        translations = { 'variable_name' : self.variable_name,
+                         'decode'        : self.build_decode_function_name() }
+
+        template = (
+            '    if (g_once_init_enter (&self->${variable_name}_decoded)) {\n'
+            '        if (self->${variable_name}_tlv_offset)\n'
+            '            ${decode} (self);\n'
+            '        self->${variable_name}_tlv_offset = 0;\n'
+            '        g_once_init_leave (&self->${variable_name}_decoded, 1);\n'
+            '    }\n'
+            '\n')
+        return utils.substitute_template(template, translations)
+
+
+    """
+    Name of the codec descriptor of the field
+    """
+    def build_codec_name(self):
+        # Use the container prefix and not the full name, as the descriptor
+        # includes offsets within the container
+        return '__' + utils.build_underscore_name(self.prefix + ' ' + self.name) + '_codec'
+
+
+    """
+    Whether the field is read and written with the table-driven codec. Fields
+    read without copying them or stored in an arena are handled by their own
+    unrolled readers.
+    """
+    def uses_codec(self):
+        return Codec.enabled and \
+               self.variable.supports_codec() and \
+               not self.zero_copy and \
+               not self.arena
+
+
+    """
+    Emit the codec descriptor of the field, if it is going to be used either to
+    read or write the field, or to print it
+    """
+    def emit_codec_descriptor(self, f):
+        if not Codec.enabled or not self.variable.supports_codec():
+            return
+        if not self.uses_codec() and TypeFactory.helpers_emitted(self.fullname):
+            return
+
+        tables = Codec.Tables(self.build_codec_name())
+        members = self.variable.build_codec_members(tables, utils.build_camelcase_name(self.prefix), self.variable_name)
+        f.write(tables.built)
+        f.write('\nstatic const QmiCodecField %s = %s;\n' % (self.build_codec_name(), Codec.build_initializer('', members)))
+        self.codec_emitted = True
+
+
     """
     Emit new types required by this field
     """
@@ -100,6 +187,13 @@ class Field:
         if TypeFactory.is_type_emitted(self.fullname) is False:
             TypeFactory.set_type_emitted(self.fullname)
             self.variable.emit_types(hfile, self.since, False)
+            if not self.arena:
+                self.variable.emit_helper_methods(hfile, cfile)
+
+        # Fields storing their strings in an arena have their own helpers, as
+        # the same type may also be used by fields which don't
+        if self.arena and not TypeFactory.helpers_emitted(self.fullname + ' Arena'):
+            TypeFactory.set_helpers_emitted(self.fullname + ' Arena')
             self.variable.emit_helper_methods(hfile, cfile)
 
 
@@ -121,7 +215,17 @@ class Field:
                          'prefix_camelcase'    : utils.build_camelcase_name(self.prefix),
                          'prefix_underscore'   : utils.build_underscore_name(self.prefix),
                          'since'               : self.since,
-                         'static'              : 'static ' if self.static else '' }
+                         'static'              : 'static ' if self.static else '',
+                         'lazy_decode'         : '',
+                         'zero_copy_copy'      : '' }
+
+        # Fields decoded on demand are decoded the first time they're read
+        if self.lazy:
+            translations['lazy_decode'] = self.build_lazy_decode()
+
+        # Zero-copy fields are copied only if requested with the standard getter
+        if self.zero_copy:
+            translations['zero_copy_copy'] = self.variable.build_view_copy('    ', 'self->' + self.variable_name) + '\n'
 
         # Emit the getter header
         template = '\n'
@@ -145,7 +249,7 @@ class Field:
             '    ${prefix_camelcase} *self,\n'
             '${variable_getter_dec}'
             '    GError **error);\n')
-        hfile.write(string.Template(template).substitute(translations))
+        hfile.write(utils.substitute_template(template, translations))
 
         # Emit the getter source
         template = (
@@ -158,6 +262,7 @@ class Field:
             '{\n'
             '    g_return_val_if_fail (self != NULL, FALSE);\n'
             '\n'
+            '${lazy_decode}'
             '    if (!self->${variable_name}_set) {\n'
             '        g_set_error (error,\n'
             '                     QMI_CORE_ERROR,\n'
@@ -166,11 +271,176 @@ class Field:
             '        return FALSE;\n'
             '    }\n'
             '\n'
+            '${zero_copy_copy}'
             '${variable_getter_imp}'
             '\n'
             '    return TRUE;\n'
             '}\n')
-        cfile.write(string.Template(template).substitute(translations))
+        cfile.write(utils.substitute_template(template, translations))
+
+
+    """
+    Emit the method responsible for getting a zero-copy TLV from the output
+    container: strings are given as views of the message data, and arrays of
+    bytes as GBytes referencing the message.
+    """
+    def emit_zero_copy_getter(self, hfile, cfile):
+        if isinstance(self.variable, VariableArray):
+            self.__emit_bytes_getter(hfile, cfile)
+        else:
+            self.__emit_view_getter(hfile, cfile)
+
+
+    """
+    Emit the getter of a zero-copy string
+    """
+    def __emit_view_getter(self, hfile, cfile):
+        input_variable_name = 'value_' + utils.build_underscore_name(self.name)
+        translations = { 'name'                : self.name,
+                         'variable_name'       : self.variable_name,
+                         'input_variable_name' : input_variable_name,
+                         'lazy_decode'         : '',
+                         'underscore'          : utils.build_underscore_name(self.name),
+                         'prefix_camelcase'    : utils.build_camelcase_name(self.prefix),
+                         'prefix_underscore'   : utils.build_underscore_name(self.prefix),
+                         'since'               : self.zero_copy_since,
+                         'static'              : 'static ' if self.static else '' }
+
+        if self.lazy:
+            translations['lazy_decode'] = self.build_lazy_decode()
+
+        # Emit the getter header
+        template = '\n'
+        if self.static == False:
+            template += (
+                '\n'
+                '/**\n'
+                ' * ${prefix_underscore}_get_${underscore}_view:\n'
+                ' * @self: a #${prefix_camelcase}.\n'
+                ' * @${input_variable_name}: (out)(optional)(transfer none): a placeholder for the output constant string, or %NULL if not required.\n'
+                ' * @${input_variable_name}_length: (out)(optional): a placeholder for the length of the string, or %NULL if not required.\n'
+                ' * @error: Return location for error or %NULL.\n'
+                ' *\n'
+                ' * Get the \'${name}\' field from @self, without copying it.\n'
+                ' *\n'
+                ' * The returned string is not NUL-terminated, and it is valid as long as\n'
+                ' * @self is.\n'
+                ' *\n'
+                ' * Returns: (skip): %TRUE if the field is found, %FALSE otherwise.\n'
+                ' *\n'
+                ' * Since: ${since}\n'
+                ' */\n')
+        template += (
+            '${static}gboolean ${prefix_underscore}_get_${underscore}_view (\n'
+            '    ${prefix_camelcase} *self,\n'
+            '    const gchar **${input_variable_name},\n'
+            '    gsize *${input_variable_name}_length,\n'
+            '    GError **error);\n')
+        hfile.write(utils.substitute_template(template, translations))
+
+        # Emit the getter source
+        template = (
+            '\n'
+            '${static}gboolean\n'
+            '${prefix_underscore}_get_${underscore}_view (\n'
+            '    ${prefix_camelcase} *self,\n'
+            '    const gchar **${input_variable_name},\n'
+            '    gsize *${input_variable_name}_length,\n'
+            '    GError **error)\n'
+            '{\n'
+            '    g_return_val_if_fail (self != NULL, FALSE);\n'
+            '\n'
+            '${lazy_decode}'
+            '    if (!self->${variable_name}_set) {\n'
+            '        g_set_error (error,\n'
+            '                     QMI_CORE_ERROR,\n'
+            '                     QMI_CORE_ERROR_TLV_NOT_FOUND,\n'
+            '                     "Field \'${name}\' was not found in the message");\n'
+            '        return FALSE;\n'
+            '    }\n'
+            '\n'
+            '    if (${input_variable_name})\n'
+            '        *${input_variable_name} = self->${variable_name}_view;\n'
+            '    if (${input_variable_name}_length)\n'
+            '        *${input_variable_name}_length = self->${variable_name}_view_length;\n'
+            '\n'
+            '    return TRUE;\n'
+            '}\n')
+        cfile.write(utils.substitute_template(template, translations))
+
+
+    """
+    Emit the getter of a zero-copy array of bytes
+    """
+    def __emit_bytes_getter(self, hfile, cfile):
+        input_variable_name = 'value_' + utils.build_underscore_name(self.name)
+        translations = { 'name'                : self.name,
+                         'variable_name'       : self.variable_name,
+                         'input_variable_name' : input_variable_name,
+                         'lazy_decode'         : '',
+                         'underscore'          : utils.build_underscore_name(self.name),
+                         'prefix_camelcase'    : utils.build_camelcase_name(self.prefix),
+                         'prefix_underscore'   : utils.build_underscore_name(self.prefix),
+                         'since'               : self.zero_copy_since,
+                         'static'              : 'static ' if self.static else '' }
+
+        if self.lazy:
+            translations['lazy_decode'] = self.build_lazy_decode()
+
+        # Emit the getter header
+        template = '\n'
+        if self.static == False:
+            template += (
+                '\n'
+                '/**\n'
+                ' * ${prefix_underscore}_get_${underscore}_bytes:\n'
+                ' * @self: a #${prefix_camelcase}.\n'
+                ' * @${input_variable_name}: (out)(optional)(transfer full): a placeholder for the output #GBytes, or %NULL if not required. The returned value should be freed with g_bytes_unref().\n'
+                ' * @error: Return location for error or %NULL.\n'
+                ' *\n'
+                ' * Get the \'${name}\' field from @self as a #GBytes, without copying it.\n'
+                ' *\n'
+                ' * The returned #GBytes references the data of the message @self was\n'
+                ' * built from, so it may outlive @self.\n'
+                ' *\n'
+                ' * Returns: (skip): %TRUE if the field is found, %FALSE otherwise.\n'
+                ' *\n'
+                ' * Since: ${since}\n'
+                ' */\n')
+        template += (
+            '${static}gboolean ${prefix_underscore}_get_${underscore}_bytes (\n'
+            '    ${prefix_camelcase} *self,\n'
+            '    GBytes **${input_variable_name},\n'
+            '    GError **error);\n')
+        hfile.write(utils.substitute_template(template, translations))
+
+        # Emit the getter source
+        template = (
+            '\n'
+            '${static}gboolean\n'
+            '${prefix_underscore}_get_${underscore}_bytes (\n'
+            '    ${prefix_camelcase} *self,\n'
+            '    GBytes **${input_variable_name},\n'
+            '    GError **error)\n'
+            '{\n'
+            '    g_return_val_if_fail (self != NULL, FALSE);\n'
+            '\n'
+            '${lazy_decode}'
+            '    if (!self->${variable_name}_set) {\n'
+            '        g_set_error (error,\n'
+            '                     QMI_CORE_ERROR,\n'
+            '                     QMI_CORE_ERROR_TLV_NOT_FOUND,\n'
+            '                     "Field \'${name}\' was not found in the message");\n'
+            '        return FALSE;\n'
+            '    }\n'
+            '\n'
+            '    if (${input_variable_name})\n'
+            '        *${input_variable_name} = g_bytes_new_with_free_func (self->${variable_name}_view, self->${variable_name}_view_length,\n'
+            '                                                              (GDestroyNotify) qmi_message_unref, qmi_message_ref (self->message));\n'
+            '\n'
+            '    return TRUE;\n'
+            '}\n')
+        cfile.write(utils.substitute_template(template, translations))
 
 
     """
@@ -215,7 +485,7 @@ class Field:
             '    ${prefix_camelcase} *self,\n'
             '${variable_setter_dec}'
             '    GError **error);\n')
-        hfile.write(string.Template(template).substitute(translations))
+        hfile.write(utils.substitute_template(template, translations))
 
         # Emit the setter source
         template = (
@@ -233,7 +503,19 @@ class Field:
             '\n'
             '    return TRUE;\n'
             '}\n')
-        cfile.write(string.Template(template).substitute(translations))
+        cfile.write(utils.substitute_template(template, translations))
+
+
+    """
+    Builds the C expression giving the number of bytes the TLV takes when added
+    to the request, or None if it cannot be known beforehand.
+    """
+    def build_input_tlv_size(self):
+        terms = self.variable.wire_size_terms('input->' + self.variable_name)
+        if terms is None:
+            return None
+        # The TLV header takes 3 bytes: type (1) and length (2)
+        return ' + '.join([ str(3 + terms[0]) ] + terms[1])
 
 
     """
@@ -253,10 +535,17 @@ class Field:
             '${lp}    return NULL;\n'
             '${lp}}\n'
             '\n')
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
 
         # Now, write the contents of the variable into the buffer
-        self.variable.emit_buffer_write(f, line_prefix, self.name, 'input->' + self.variable_name)
+        if self.uses_codec():
+            translations['codec'] = self.build_codec_name()
+            template = (
+                '${lp}if (!qmi_codec_write (self, &${codec}, input, "${name}", error))\n'
+                '${lp}    return NULL;\n')
+            f.write(utils.substitute_template(template, translations))
+        else:
+            self.variable.emit_buffer_write(f, line_prefix, self.name, 'input->' + self.variable_name)
 
         template = (
             '\n'
@@ -264,54 +553,88 @@ class Field:
             '${lp}    g_prefix_error (error, "Cannot complete TLV \'${name}\': ");\n'
             '${lp}    return NULL;\n'
             '${lp}}\n')
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
 
 
     """
-    Emit the code responsible for checking prerequisites in output TLVs
+    Emit the code responsible for checking prerequisites in output TLVs. When
+    reading into the inline storage of a response, the result is already known
+    to be successful, so prerequisites on the result are skipped.
     """
-    def emit_output_prerequisite_check(self, f, line_prefix):
-        if self.prerequisites == []:
+    def emit_output_prerequisite_check(self, f, line_prefix, inline = False):
+        prerequisites = self.prerequisites
+        if inline:
+            prerequisites = [prerequisite for prerequisite in prerequisites if not prerequisite['field'].startswith('Result.')]
+
+        if prerequisites == []:
             f.write('%s/* No Prerequisites for field */\n' % line_prefix)
             return
 
-        for prerequisite in self.prerequisites:
+        for prerequisite in prerequisites:
             translations = { 'lp'                     : line_prefix,
-                             'prerequisite_field'     : utils.build_underscore_name(prerequisite['field']),
+                             'storage'                : 'out->' if inline else 'self->arg_',
+                             'prerequisite_field'     : utils.build_member_name(prerequisite['field']) if inline else utils.build_underscore_name(prerequisite['field']),
                              'prerequisite_operation' : prerequisite['operation'],
                              'prerequisite_value'     : prerequisite['value'] }
             template = (
                 '${lp}/* Prerequisite.... */\n'
-                '${lp}if (!(self->arg_${prerequisite_field} ${prerequisite_operation} ${prerequisite_value}))\n'
+                '${lp}if (!(${storage}${prerequisite_field} ${prerequisite_operation} ${prerequisite_value}))\n'
                 '${lp}    break;\n')
-            f.write(string.Template(template).substitute(translations))
+            f.write(utils.substitute_template(template, translations))
 
 
     """
-    Emit the code responsible for retrieving the TLV from the QMI message
+    Whether the field can be read into the inline storage of a successful
+    response: fields only given in failed responses are skipped.
     """
-    def emit_output_tlv_get(self, f, line_prefix):
+    def inline_supported(self):
+        for prerequisite in self.prerequisites:
+            if prerequisite['field'].startswith('Result.') and \
+               (prerequisite['field'] != 'Result.Error Status' or \
+                prerequisite['operation'] != '==' or \
+                prerequisite['value'] != 'QMI_STATUS_SUCCESS'):
+                return False
+        return True
+
+
+    """
+    Emit the code responsible for retrieving the TLV from the QMI message, given
+    the name of the variable holding the offset where the TLV was found (or 0 if
+    it wasn't found). The TLV is either read into the output container, or into
+    the inline storage given by the caller of a parse_into() method.
+    """
+    def emit_output_tlv_get(self, f, line_prefix, tlv_offset_variable, inline = False):
         tlv_out = utils.build_underscore_name (self.fullname) + '_out'
         error = 'error' if self.mandatory else 'NULL'
         translations = { 'name'                 : self.name,
                          'container_underscore' : utils.build_underscore_name (self.prefix),
                          'tlv_out'              : tlv_out,
                          'tlv_id'               : self.id_enum_name,
+                         'tlv_offset_variable'  : tlv_offset_variable,
                          'variable_name'        : self.variable_name,
+                         'storage'              : 'self->' + self.variable_name,
                          'lp'                   : line_prefix,
                          'error'                : error }
+        if inline:
+            translations['storage'] = 'out->' + utils.build_member_name(self.name)
 
         template = (
             '${lp}gsize offset = 0;\n'
             '${lp}gsize init_offset;\n'
             '\n'
-            '${lp}if ((init_offset = qmi_message_tlv_read_init (message, ${tlv_id}, NULL, ${error})) == 0) {\n')
+            '${lp}if ((init_offset = ${tlv_offset_variable}) == 0) {\n')
 
         if self.mandatory:
             template += (
-                '${lp}    g_prefix_error (${error}, "Couldn\'t get the mandatory ${name} TLV: ");\n'
-                '${lp}    ${container_underscore}_unref (self);\n'
-                '${lp}    return NULL;\n')
+                '${lp}    g_set_error (${error}, QMI_CORE_ERROR, QMI_CORE_ERROR_TLV_NOT_FOUND,\n'
+                '${lp}                 "Couldn\'t get the mandatory ${name} TLV: TLV 0x%02X not found", ${tlv_id});\n')
+            if inline:
+                template += (
+                    '${lp}    return FALSE;\n')
+            else:
+                template += (
+                    '${lp}    ${container_underscore}_unref (self);\n'
+                    '${lp}    return NULL;\n')
         else:
             template += (
                 '${lp}    goto ${tlv_out};\n')
@@ -319,10 +642,37 @@ class Field:
         template += (
             '${lp}}\n')
 
-        f.write(string.Template(template).substitute(translations))
+        # Reject truncated TLVs before reading anything
+        min_size = self.variable.min_wire_size()
+        if min_size > 0:
+            translations['min_size'] = min_size
+            template += (
+                '\n'
+                '${lp}/* Reject the TLV right away if it is too short to be read */\n'
+                '${lp}if (qmi_message_tlv_read_remaining_size (message, init_offset, 0) < ${min_size}) {\n')
+            if self.mandatory:
+                template += (
+                    '${lp}    g_set_error (${error}, QMI_CORE_ERROR, QMI_CORE_ERROR_TLV_TOO_LONG,\n'
+                    '${lp}                 "Couldn\'t get the mandatory ${name} TLV: reading TLV 0x%02X would overflow", ${tlv_id});\n')
+            template += (
+                '${lp}    goto ${tlv_out};\n'
+                '${lp}}\n')
+
+        f.write(utils.substitute_template(template, translations))
 
         # Now, read the contents of the buffer into the variable
-        self.variable.emit_buffer_read(f, line_prefix, tlv_out, error, 'self->' + self.variable_name)
+        if inline:
+            self.variable.emit_buffer_read_inline(f, line_prefix, tlv_out, error, translations['storage'])
+        elif self.zero_copy:
+            self.variable.emit_buffer_read_view(f, line_prefix, tlv_out, error, 'self->' + self.variable_name)
+        elif self.uses_codec():
+            translations['codec'] = self.build_codec_name()
+            template = (
+                '${lp}if (!qmi_codec_read (message, init_offset, &offset, &${codec}, self, ${error}))\n'
+                '${lp}    goto ${tlv_out};\n')
+            f.write(utils.substitute_template(template, translations))
+        else:
+            self.variable.emit_buffer_read(f, line_prefix, tlv_out, error, 'self->' + self.variable_name)
 
         template = (
             '\n'
@@ -331,19 +681,60 @@ class Field:
             '${lp}    g_warning ("Left \'%" G_GSIZE_FORMAT "\' bytes unread when getting the \'${name}\' TLV", offset);\n'
             '${lp}}\n'
             '\n'
-            '${lp}self->${variable_name}_set = TRUE;\n'
+            '${lp}${storage}_set = TRUE;\n'
             '\n'
             '${tlv_out}:\n')
-        if self.mandatory:
+        if self.mandatory and inline:
+            template += (
+                '${lp}if (!${storage}_set)\n'
+                '${lp}    return FALSE;\n')
+        elif self.mandatory:
             template += (
-                '${lp}if (!self->${variable_name}_set) {\n'
+                '${lp}if (!${storage}_set) {\n'
                 '${lp}    ${container_underscore}_unref (self);\n'
                 '${lp}    return NULL;\n'
                 '${lp}}\n')
         else:
             template += (
                 '${lp};\n')
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
+
+
+    """
+    Emit the method responsible for decoding the TLV on demand from the QMI
+    message kept in the output container. It runs at most once per container,
+    see build_lazy_decode().
+    """
+    def emit_output_tlv_decode(self, f):
+        translations = { 'container'     : utils.build_camelcase_name(self.prefix),
+                         'decode'        : self.build_decode_function_name(),
+                         'variable_name' : self.variable_name }
+
+        template = (
+            '\n'
+            'static void\n'
+            '${decode} (${container} *self)\n'
+            '{\n'
+            '    QmiMessage *message;\n'
+            '    gsize ${variable_name}_tlv_offset;\n'
+            '\n'
+            '    message = self->message;\n'
+            '    ${variable_name}_tlv_offset = self->${variable_name}_tlv_offset;\n'
+            '\n'
+            '    do {\n')
+        f.write(utils.substitute_template(template, translations))
+
+        self.emit_output_prerequisite_check(f, '        ')
+
+        f.write(
+            '\n'
+            '        {\n')
+        self.emit_output_tlv_get(f, '            ', self.variable_name + '_tlv_offset')
+        f.write(
+            '\n'
+            '        }\n'
+            '    } while (0);\n'
+            '}\n')
 
 
     """
@@ -375,10 +766,18 @@ class Field:
             '        return NULL;\n'
             '\n'
             '    printable = g_string_new ("");\n')
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
 
         # Now, read the contents of the buffer into the printable representation
-        self.variable.emit_get_printable(f, '    ')
+        if self.codec_emitted:
+            translations['codec'] = self.build_codec_name()
+            template = (
+                '\n'
+                '    if (!qmi_codec_print (message, init_offset, &offset, &${codec}, printable, &error))\n'
+                '        goto out;\n')
+            f.write(utils.substitute_template(template, translations))
+        else:
+            self.variable.emit_get_printable(f, '    ')
 
         template = (
             '\n'
@@ -392,7 +791,7 @@ class Field:
             '    }\n'
             '    return g_string_free (printable, FALSE);\n'
             '}\n')
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
 
 
     """
@@ -410,7 +809,14 @@ class Field:
         # Public methods
         template = (
             '${prefix_underscore}_get_${underscore}\n')
+        if self.zero_copy:
+            if isinstance(self.variable, VariableArray):
+                template += (
+                    '${prefix_underscore}_get_${underscore}_bytes\n')
+            else:
+                template += (
+                    '${prefix_underscore}_get_${underscore}_view\n')
         if self.container_type == 'Input':
             template += (
                 '${prefix_underscore}_set_${underscore}\n')
-        sections['public-methods'] += string.Template(template).substitute(translations)
+        sections['public-methods'] += utils.substitute_template(template, translations)
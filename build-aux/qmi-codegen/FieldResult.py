@@ -18,7 +18,6 @@
 # Copyright (C) 2012-2017 Aleksander Morgado <aleksander@aleksander.es>
 #
 
-import string
 
 import utils
 import TypeFactory
@@ -71,7 +70,7 @@ class FieldResult(Field):
             'gboolean ${prefix_underscore}_get_result (\n'
             '    ${prefix_camelcase} *self,\n'
             '    GError **error);\n')
-        hfile.write(string.Template(template).substitute(translations))
+        hfile.write(utils.substitute_template(template, translations))
 
         # Emit the getter source
         template = (
@@ -106,7 +105,7 @@ class FieldResult(Field):
             '                 qmi_protocol_error_get_string ((QmiProtocolError) self->${variable_name}.error_code));\n'
             '    return FALSE;\n'
             '}\n')
-        cfile.write(string.Template(template).substitute(translations))
+        cfile.write(utils.substitute_template(template, translations))
 
 
     """
@@ -140,7 +139,7 @@ class FieldResult(Field):
             '\n'
             '    return TRUE;\n'
             '}\n')
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
 
         template = (
             '\n'
@@ -167,7 +166,7 @@ class FieldResult(Field):
             '\n'
             '    return g_strdup_printf ("FAILURE: %s", qmi_protocol_error_get_string ((QmiProtocolError) error_code));\n'
             '}\n')
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
 
 
     """
@@ -184,4 +183,4 @@ class FieldResult(Field):
         if self.container_type == 'Input':
             template += (
                 '${prefix_underscore}_set_${underscore}\n')
-        sections['public-methods'] += string.Template(template).substitute(translations)
+        sections['public-methods'] += utils.substitute_template(template, translations)
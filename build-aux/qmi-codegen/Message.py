@@ -18,10 +18,11 @@
 # Copyright (C) 2012-2017 Aleksander Morgado <aleksander@aleksander.es>
 #
 
-import string
 
 import utils
+import Stats
 from Container import Container
+from FieldResult import FieldResult
 
 """
 The Message class takes care of request/response message handling
@@ -47,6 +48,27 @@ class Message:
 
         self.static = True if 'scope' in dictionary and dictionary['scope'] == 'library-only' else False
         self.abort = True if 'abort' in dictionary and dictionary['abort'] == 'yes' else False
+        self.lazy_output = True if 'lazy-output' in dictionary and dictionary['lazy-output'] == 'yes' else False
+        self.arena_output = True if 'arena-output' in dictionary and dictionary['arena-output'] == 'yes' else False
+
+        # Indications may flag which output fields changed since the previous
+        # indication of the same type
+        self.change_mask_since = None
+        if 'change-mask' in dictionary and dictionary['change-mask'] == 'yes':
+            if self.type != 'Indication':
+                raise ValueError('Message ' + self.name + ' cannot have a change mask: only indications are supported')
+            self.change_mask_since = dictionary['change-mask-since'] if 'change-mask-since' in dictionary else None
+            if self.change_mask_since is None:
+                raise ValueError('Message ' + self.name + ' requires a "change-mask-since" tag specifying the version where the change mask was introduced')
+
+        # Responses may also be parsed into plain structs provided by the caller
+        self.parse_into_since = None
+        if 'parse-into' in dictionary and dictionary['parse-into'] == 'yes':
+            if self.type != 'Message' or self.static:
+                raise ValueError('Message ' + self.name + ' cannot be parsed into plain structs: only public responses are supported')
+            self.parse_into_since = dictionary['parse-into-since'] if 'parse-into-since' in dictionary else None
+            if self.parse_into_since is None:
+                raise ValueError('Message ' + self.name + ' requires a "parse-into-since" tag specifying the version where the parse_into() method was introduced')
 
         # libqmi version where the message was introduced
         self.since = dictionary['since'] if 'since' in dictionary else None
@@ -71,30 +93,103 @@ class Message:
         # Create the build symbol name
         self.build_symbol = 'HAVE_' + self.id_enum_name
 
+        # The input/output containers are built lazily, when first needed, as
+        # messages not included in the collection only need the metadata above
+        self.dictionary = dictionary
+        self.common_objects_dictionary = common_objects_dictionary
+        self.containers_built = False
+        self._input = None
+        self._output = None
+
+
+    """
+    Build the input/output containers of the message
+    """
+    def __build_containers(self):
+        self.containers_built = True
+
         # Build output container.
         # Every defined message will have its own output container, which
         # will generate a new Output type and public getters for each output
         # field. This applies to both Request/Response and Indications.
         # Output containers are actually optional in Indications
-        self.output = Container(self.fullname,
-                                'Output',
-                                dictionary['output'] if 'output' in dictionary else None,
-                                common_objects_dictionary,
-                                self.static,
-                                self.since)
-
-        self.input = None
+        self._output = Container(self.fullname,
+                                 'Output',
+                                 self.dictionary['output'] if 'output' in self.dictionary else None,
+                                 self.common_objects_dictionary,
+                                 self.static,
+                                 self.since,
+                                 self.lazy_output,
+                                 self.arena_output,
+                                 self.change_mask_since)
+
+        self._input = None
         if self.type == 'Message':
             # Build input container (Request/Response only).
             # Every defined message will have its own input container, which
             # will generate a new Input type and public getters for each input
             # field
-            self.input = Container(self.fullname,
-                                   'Input',
-                                   dictionary['input'] if 'input' in dictionary else None,
-                                   common_objects_dictionary,
-                                   self.static,
-                                   self.since)
+            self._input = Container(self.fullname,
+                                    'Input',
+                                    self.dictionary['input'] if 'input' in self.dictionary else None,
+                                    self.common_objects_dictionary,
+                                    self.static,
+                                    self.since)
+
+
+    @property
+    def output(self):
+        if not self.containers_built:
+            self.__build_containers()
+        return self._output
+
+
+    @property
+    def input(self):
+        if not self.containers_built:
+            self.__build_containers()
+        return self._input
+
+
+    """
+    Emit method responsible for creating a new request without input TLVs,
+    which is always the same message except for the client and transaction
+    IDs, so it is just copied from a static template
+    """
+    def __emit_request_creator_from_template(self, cfile, translations):
+        if self.service == 'CTL':
+            # Control messages have a 1 byte transaction ID
+            translations['qmux_length'] = '0x0b'
+            translations['transaction'] = '0x00'
+        else:
+            translations['qmux_length'] = '0x0c'
+            translations['transaction'] = '0x00, 0x00'
+
+        template = (
+            '\n'
+            'static const guint8 __${underscore}_request_template[] = {\n'
+            '    QMI_MESSAGE_QMUX_MARKER,\n'
+            '    /* QMUX header: length, flags, service, client */\n'
+            '    ${qmux_length}, 0x00, 0x00, QMI_SERVICE_${service}, 0x00,\n'
+            '    /* QMI header: flags, transaction, message, TLVs length */\n'
+            '    0x00, ${transaction},\n'
+            '    (guint8) (${message_id} & 0xFF), (guint8) (${message_id} >> 8),\n'
+            '    0x00, 0x00\n'
+            '};\n'
+            '\n'
+            'static QmiMessage *\n'
+            '__${underscore}_request_create (\n'
+            '    guint16 transaction_id,\n'
+            '    guint8 cid,\n'
+            '    gpointer unused,\n'
+            '    GError **error)\n'
+            '{\n'
+            '    return qmi_message_new_from_template (__${underscore}_request_template,\n'
+            '                                          sizeof (__${underscore}_request_template),\n'
+            '                                          cid,\n'
+            '                                          transaction_id);\n'
+            '}\n')
+        cfile.write(utils.substitute_template(template, translations))
 
 
     """
@@ -107,79 +202,129 @@ class Message:
                          'underscore' : utils.build_underscore_name (self.fullname),
                          'message_id' : self.id_enum_name }
 
-        input_arg_template = 'gpointer unused' if self.input.fields is None else '${container} *input'
+        if not self.input.fields:
+            self.__emit_request_creator_from_template(cfile, translations)
+            return
+
         template = (
             '\n'
             'static QmiMessage *\n'
             '__${underscore}_request_create (\n'
             '    guint16 transaction_id,\n'
             '    guint8 cid,\n'
-            '    %s,\n'
+            '    ${container} *input,\n'
             '    GError **error)\n'
             '{\n'
             '    g_autoptr(QmiMessage) self = NULL;\n'
-            '\n'
-            '    self = qmi_message_new (QMI_SERVICE_${service},\n'
-            '                            cid,\n'
-            '                            transaction_id,\n'
-            '                            ${message_id});\n' % input_arg_template)
-        cfile.write(string.Template(template).substitute(translations))
-
-        if self.input.fields:
-            # Count how many mandatory fields we have
-            n_mandatory = 0
-            for field in self.input.fields:
-                if field.mandatory:
-                    n_mandatory += 1
+            '    gsize tlvs_size = 0;\n')
+
+        # When the sizes of all TLVs are known beforehand, the final message
+        # length is checked against the precomputed one
+        tlvs_size_known = True
+        for field in self.input.fields:
+            if field.build_input_tlv_size() is None:
+                tlvs_size_known = False
+        if tlvs_size_known:
+            template += (
+                '    gsize header_length;\n')
+        cfile.write(utils.substitute_template(template, translations))
+
+        # Count how many mandatory fields we have
+        n_mandatory = 0
+        for field in self.input.fields:
+            if field.mandatory:
+                n_mandatory += 1
+
+        if n_mandatory == 0:
+            # If we don't have mandatory fields, we do allow to have
+            # a NULL input
+            template = (
+                '\n'
+                '    /* All TLVs are optional, we allow NULL input */\n'
+                '    if (!input)\n'
+                '        return qmi_message_new (QMI_SERVICE_${service},\n'
+                '                                cid,\n'
+                '                                transaction_id,\n'
+                '                                ${message_id});\n')
+            cfile.write(utils.substitute_template(template, translations))
+        else:
+            # If we do have mandatory fields, issue error if no input
+            # given.
+            template = (
+                '\n'
+                '    /* There is at least one mandatory TLV, don\'t allow NULL input */\n'
+                '    if (!input) {\n'
+                '        g_set_error (error,\n'
+                '                     QMI_CORE_ERROR,\n'
+                '                     QMI_CORE_ERROR_INVALID_ARGS,\n'
+                '                     "Message \'${name}\' has mandatory TLVs");\n'
+                '        return NULL;\n'
+                '    }\n')
+            cfile.write(utils.substitute_template(template, translations))
 
-            if n_mandatory == 0:
-                # If we don't have mandatory fields, we do allow to have
-                # a NULL input
-                cfile.write(
-                    '\n'
-                    '    /* All TLVs are optional, we allow NULL input */\n'
-                    '    if (!input)\n'
-                    '        return g_steal_pointer (&self);\n')
+        # Compute the size of all the TLVs to add beforehand, so that the
+        # message is allocated only once
+        cfile.write(
+            '\n'
+            '    /* Compute the size of the TLVs to add, so that the message is allocated once */\n')
+        for field in self.input.fields:
+            translations['variable_name'] = field.variable_name
+            translations['tlv_name'] = field.name
+            translations['tlv_size'] = field.build_input_tlv_size()
+            if translations['tlv_size'] is None:
+                template = (
+                    '    /* Size of the \'${tlv_name}\' TLV not known beforehand */\n')
             else:
-                # If we do have mandatory fields, issue error if no input
-                # given.
                 template = (
-                    '\n'
-                    '    /* There is at least one mandatory TLV, don\'t allow NULL input */\n'
-                    '    if (!input) {\n'
+                    '    if (input->${variable_name}_set)\n'
+                    '        tlvs_size += ${tlv_size};\n')
+            cfile.write(utils.substitute_template(template, translations))
+
+        template = (
+            '\n'
+            '    self = qmi_message_new_sized (QMI_SERVICE_${service},\n'
+            '                                  cid,\n'
+            '                                  transaction_id,\n'
+            '                                  ${message_id},\n'
+            '                                  tlvs_size);\n')
+        if tlvs_size_known:
+            template += (
+                '    header_length = qmi_message_get_length (self);\n')
+        cfile.write(utils.substitute_template(template, translations))
+
+        # Now iterate fields
+        for field in self.input.fields:
+            translations['tlv_name'] = field.name
+            translations['variable_name'] = field.variable_name
+            template = (
+                '\n'
+                '    /* Try to add the \'${tlv_name}\' TLV */\n'
+                '    if (input->${variable_name}_set) {\n')
+            cfile.write(utils.substitute_template(template, translations))
+
+            # Emit the TLV getter
+            with Stats.measure(self.fullname, 'request creator', hfile, cfile, field.fullname):
+                field.emit_input_tlv_add(cfile, '        ')
+
+            if field.mandatory:
+                template = (
+                    '    } else {\n'
                     '        g_set_error (error,\n'
                     '                     QMI_CORE_ERROR,\n'
                     '                     QMI_CORE_ERROR_INVALID_ARGS,\n'
-                    '                     "Message \'${name}\' has mandatory TLVs");\n'
-                    '        return NULL;\n'
-                    '    }\n')
-                cfile.write(string.Template(template).substitute(translations))
+                    '                     "Missing mandatory TLV \'${tlv_name}\' in message \'${name}\'");\n'
+                    '        return NULL;\n')
+                cfile.write(utils.substitute_template(template, translations))
 
-            # Now iterate fields
-            for field in self.input.fields:
-                translations['tlv_name'] = field.name
-                translations['variable_name'] = field.variable_name
-                template = (
-                    '\n'
-                    '    /* Try to add the \'${tlv_name}\' TLV */\n'
-                    '    if (input->${variable_name}_set) {\n')
-                cfile.write(string.Template(template).substitute(translations))
-
-                # Emit the TLV getter
-                field.emit_input_tlv_add(cfile, '        ')
+            cfile.write(
+                '    }\n')
 
-                if field.mandatory:
-                    template = (
-                        '    } else {\n'
-                        '        g_set_error (error,\n'
-                        '                     QMI_CORE_ERROR,\n'
-                        '                     QMI_CORE_ERROR_INVALID_ARGS,\n'
-                        '                     "Missing mandatory TLV \'${tlv_name}\' in message \'${name}\'");\n'
-                        '        return NULL;\n')
-                    cfile.write(string.Template(template).substitute(translations))
+        if tlvs_size_known:
+            cfile.write(
+                '\n'
+                '    /* The message must have been allocated with its exact final size */\n'
+                '    g_warn_if_fail (qmi_message_get_length (self) == header_length + tlvs_size);\n')
 
-                cfile.write(
-                    '    }\n')
         cfile.write(
             '\n'
             '    return g_steal_pointer (&self);\n'
@@ -209,14 +354,70 @@ class Message:
             '    GError **error)\n'
             '{\n'
             '    ${container} *self;\n'
+            '    gsize tlv_offset;\n'
+            '    guint8 tlv_type;\n')
+        cfile.write(utils.substitute_template(template, translations))
+
+        # Fields sharing the same TLV ID (e.g. with different prerequisites)
+        # share the same offset variable
+        tlv_offset_variables = {}
+        tlv_offset_cases = []
+        for field in self.output.fields:
+            tlv_id = int(field.id, 0)
+            if tlv_id not in tlv_offset_variables:
+                tlv_offset_variables[tlv_id] = field.variable_name + '_tlv_offset'
+                tlv_offset_cases.append((field.id_enum_name, tlv_offset_variables[tlv_id]))
+                cfile.write('    gsize %s = 0;\n' % tlv_offset_variables[tlv_id])
+
+        template = (
             '\n'
             '    g_assert_cmphex (qmi_message_get_message_id (message), ==, ${message_id});\n'
             '\n'
-            '    self = g_slice_new0 (${container});\n'
+            '    /* Index all TLVs in a single pass; as with qmi_message_tlv_read_init(),\n'
+            '     * only the first TLV found with a given ID is considered */\n'
+            '    for (tlv_offset = qmi_message_tlv_read_next (message, 0, &tlv_type);\n'
+            '         tlv_offset;\n'
+            '         tlv_offset = qmi_message_tlv_read_next (message, tlv_offset, &tlv_type)) {\n'
+            '        switch (tlv_type) {\n')
+        cfile.write(utils.substitute_template(template, translations))
+
+        for (tlv_id_enum_name, tlv_offset_variable) in tlv_offset_cases:
+            translations['tlv_id'] = tlv_id_enum_name
+            translations['tlv_offset_variable'] = tlv_offset_variable
+            template = (
+                '        case ${tlv_id}:\n'
+                '            if (!${tlv_offset_variable})\n'
+                '                ${tlv_offset_variable} = tlv_offset;\n'
+                '            break;\n')
+            cfile.write(utils.substitute_template(template, translations))
+
+        template = (
+            '        default:\n'
+            '            break;\n'
+            '        }\n'
+            '    }\n'
+            '\n'
+            '    self = qmi_helpers_pool_alloc0 (&${container_underscore}_pool, sizeof (${container}));\n'
             '    self->ref_count = 1;\n')
-        cfile.write(string.Template(template).substitute(translations))
+        if self.output.keeps_message:
+            template += (
+                '    self->message = qmi_message_ref (message);\n')
+        if self.output.arena:
+            # Strings read from the message usually fit in a single arena block
+            # as big as the message itself
+            template += (
+                '    self->arena = g_string_chunk_new (message->len);\n')
+        cfile.write(utils.substitute_template(template, translations))
 
+        # Decode the indexed TLVs in the order given by the container, so that
+        # prerequisites are always read before the fields depending on them.
+        # Fields decoded on demand just keep the offset of their TLV.
         for field in self.output.fields:
+            if field.lazy:
+                cfile.write(
+                    '\n'
+                    '    self->%s_tlv_offset = %s;\n' % (field.variable_name, tlv_offset_variables[int(field.id, 0)]))
+                continue
             cfile.write(
                 '\n'
                 '    do {\n')
@@ -224,7 +425,8 @@ class Message:
             cfile.write(
                 '\n'
                 '        {\n')
-            field.emit_output_tlv_get(cfile, '            ')
+            with Stats.measure(self.fullname, 'parser', hfile, cfile, field.fullname):
+                field.emit_output_tlv_get(cfile, '            ', tlv_offset_variables[int(field.id, 0)])
             cfile.write(
                 '\n'
                 '        }\n')
@@ -236,6 +438,199 @@ class Message:
             '}\n')
 
 
+    """
+    Emit the plain struct with inline storage for all the fields of a
+    successful response, and the method responsible for parsing the response
+    into it
+    """
+    def __emit_response_parse_into(self, hfile, cfile):
+        fields = []
+        result_tlv = None
+        if self.output.fields is not None:
+            for field in self.output.fields:
+                if isinstance(field, FieldResult):
+                    result_tlv = field.id_enum_name
+                    continue
+                if not field.inline_supported():
+                    continue
+                if not field.variable.supports_inline():
+                    raise ValueError('TLV ' + field.fullname + ' cannot be stored inline: only integers, structs of integers, strings with a maximum size and bounded integer arrays are supported')
+                fields.append(field)
+
+        translations = { 'name'           : self.name,
+                         'since'          : self.parse_into_since,
+                         'camelcase'      : utils.build_camelcase_name (self.fullname) + 'Response',
+                         'underscore'     : utils.build_underscore_name (self.fullname),
+                         'service'        : self.service.upper(),
+                         'service_lower'  : self.service.lower(),
+                         'name_underscore': utils.build_underscore_name (self.name),
+                         'message_id'     : self.id_enum_name,
+                         'result_tlv'     : result_tlv }
+
+        # Emit the struct
+        template = (
+            '\n'
+            '/**\n'
+            ' * ${camelcase}:\n')
+        for field in fields:
+            translations['field_name'] = field.name
+            translations['field_underscore'] = utils.build_member_name(field.name)
+            template += utils.substitute_template(
+                ' * @${field_underscore}_set: whether the \'${field_name}\' field was found in the response.\n', translations)
+            template += field.variable.build_inline_documentation(' * ', utils.build_member_name(field.name))
+        template += (
+            ' *\n'
+            ' * A plain struct holding all the fields of a successful \'${name}\' response,\n'
+            ' * filled in by ${underscore}_response_parse_into(). It needs no allocation nor\n'
+            ' * disposal, so it may be kept in the stack and reused.\n'
+            ' *\n'
+            ' * Since: ${since}\n'
+            ' */\n'
+            'typedef struct _${camelcase} {\n')
+        for field in fields:
+            translations['field_underscore'] = utils.build_member_name(field.name)
+            template += utils.substitute_template(
+                '    gboolean ${field_underscore}_set;\n', translations)
+            template += field.variable.build_inline_declaration('    ', utils.build_member_name(field.name))
+        template += (
+            '} ${camelcase};\n')
+
+        # Emit the method header
+        template += (
+            '\n'
+            '/**\n'
+            ' * ${underscore}_response_parse_into:\n'
+            ' * @message: a #QmiMessage with a \'${name}\' response.\n'
+            ' * @out: (out caller-allocates): a #${camelcase} to fill in.\n'
+            ' * @error: Return location for error or %NULL.\n'
+            ' *\n'
+            ' * Parses the \'${name}\' response in @message into @out, without allocating\n'
+            ' * any output container. This is equivalent to getting the output with\n'
+            ' * qmi_client_${service_lower}_${name_underscore}_finish(), checking its result,\n'
+            ' * and reading all its fields.\n'
+            ' *\n'
+            ' * Fails if the QMI operation failed, or if any field doesn\'t fit in the\n'
+            ' * storage of @out.\n'
+            ' *\n'
+            ' * Returns: %TRUE if @out was filled in, %FALSE if @error is set.\n'
+            ' *\n'
+            ' * Since: ${since}\n'
+            ' */\n'
+            'gboolean ${underscore}_response_parse_into (\n'
+            '    QmiMessage *message,\n'
+            '    ${camelcase} *out,\n'
+            '    GError **error);\n')
+        hfile.write(utils.substitute_template(template, translations))
+
+        # Emit the method source; TLVs are indexed in a single pass, as in the
+        # output container parser
+        template = (
+            '\n'
+            'gboolean\n'
+            '${underscore}_response_parse_into (\n'
+            '    QmiMessage *message,\n'
+            '    ${camelcase} *out,\n'
+            '    GError **error)\n'
+            '{\n'
+            '    gsize tlv_offset;\n'
+            '    guint8 tlv_type;\n'
+            '    gsize result_tlv_offset = 0;\n')
+        cfile.write(utils.substitute_template(template, translations))
+
+        tlv_offset_variables = {}
+        tlv_offset_cases = []
+        for field in fields:
+            tlv_id = int(field.id, 0)
+            if tlv_id not in tlv_offset_variables:
+                tlv_offset_variables[tlv_id] = field.variable_name + '_tlv_offset'
+                tlv_offset_cases.append((field.id_enum_name, tlv_offset_variables[tlv_id]))
+                cfile.write('    gsize %s = 0;\n' % tlv_offset_variables[tlv_id])
+
+        template = (
+            '\n'
+            '    g_return_val_if_fail (message != NULL, FALSE);\n'
+            '    g_return_val_if_fail (out != NULL, FALSE);\n'
+            '    g_return_val_if_fail (qmi_message_get_service (message) == QMI_SERVICE_${service}, FALSE);\n'
+            '    g_return_val_if_fail (qmi_message_get_message_id (message) == ${message_id}, FALSE);\n'
+            '\n'
+            '    memset (out, 0, sizeof (${camelcase}));\n'
+            '\n'
+            '    for (tlv_offset = qmi_message_tlv_read_next (message, 0, &tlv_type);\n'
+            '         tlv_offset;\n'
+            '         tlv_offset = qmi_message_tlv_read_next (message, tlv_offset, &tlv_type)) {\n'
+            '        switch (tlv_type) {\n'
+            '        case ${result_tlv}:\n'
+            '            if (!result_tlv_offset)\n'
+            '                result_tlv_offset = tlv_offset;\n'
+            '            break;\n')
+        cfile.write(utils.substitute_template(template, translations))
+
+        for (tlv_id_enum_name, tlv_offset_variable) in tlv_offset_cases:
+            translations['tlv_id'] = tlv_id_enum_name
+            translations['tlv_offset_variable'] = tlv_offset_variable
+            template = (
+                '        case ${tlv_id}:\n'
+                '            if (!${tlv_offset_variable})\n'
+                '                ${tlv_offset_variable} = tlv_offset;\n'
+                '            break;\n')
+            cfile.write(utils.substitute_template(template, translations))
+
+        template = (
+            '        default:\n'
+            '            break;\n'
+            '        }\n'
+            '    }\n'
+            '\n'
+            '    /* Report a missing result or a QMI protocol error right away */\n'
+            '    {\n'
+            '        gsize offset = 0;\n'
+            '        guint16 error_status;\n'
+            '        guint16 error_code;\n'
+            '\n'
+            '        if (!result_tlv_offset) {\n'
+            '            g_set_error (error,\n'
+            '                         QMI_CORE_ERROR,\n'
+            '                         QMI_CORE_ERROR_INVALID_MESSAGE,\n'
+            '                         "No \'Result\' field given in the message");\n'
+            '            return FALSE;\n'
+            '        }\n'
+            '\n'
+            '        if (!qmi_message_tlv_read_guint16 (message, result_tlv_offset, &offset, QMI_ENDIAN_LITTLE, &error_status, error) ||\n'
+            '            !qmi_message_tlv_read_guint16 (message, result_tlv_offset, &offset, QMI_ENDIAN_LITTLE, &error_code, error))\n'
+            '            return FALSE;\n'
+            '\n'
+            '        if (error_status != QMI_STATUS_SUCCESS) {\n'
+            '            g_set_error (error,\n'
+            '                         QMI_PROTOCOL_ERROR,\n'
+            '                         (QmiProtocolError) error_code,\n'
+            '                         "QMI protocol error (%u): \'%s\'",\n'
+            '                         error_code,\n'
+            '                         qmi_protocol_error_get_string ((QmiProtocolError) error_code));\n'
+            '            return FALSE;\n'
+            '        }\n'
+            '    }\n')
+        cfile.write(utils.substitute_template(template, translations))
+
+        for field in fields:
+            cfile.write(
+                '\n'
+                '    do {\n')
+            field.emit_output_prerequisite_check(cfile, '        ', True)
+            cfile.write(
+                '\n'
+                '        {\n')
+            field.emit_output_tlv_get(cfile, '            ', tlv_offset_variables[int(field.id, 0)], True)
+            cfile.write(
+                '\n'
+                '        }\n'
+                '    } while (0);\n')
+
+        cfile.write(
+            '\n'
+            '    return TRUE;\n'
+            '}\n')
+
+
     """
     Emit method responsible for getting a printable representation of the whole
     request/response
@@ -245,12 +640,14 @@ class Message:
         if self.input is not None and self.input.fields is not None:
             need_tlv_printable = True
             for field in self.input.fields:
-                field.emit_tlv_helpers(cfile)
+                with Stats.measure(self.fullname, 'printable helpers', hfile, cfile, field.fullname):
+                    field.emit_tlv_helpers(cfile)
 
         if self.output is not None and self.output.fields is not None:
             need_tlv_printable = True
             for field in self.output.fields:
-                field.emit_tlv_helpers(cfile)
+                with Stats.measure(self.fullname, 'printable helpers', hfile, cfile, field.fullname):
+                    field.emit_tlv_helpers(cfile)
 
         translations = { 'name'       : self.name,
                          'service'    : self.service,
@@ -296,7 +693,7 @@ class Message:
                             '                                   ctx->self,\n'
                             '                                   ctx->line_prefix);\n'
                             '            break;\n')
-                        template += string.Template(field_template).substitute(translations)
+                        template += utils.substitute_template(field_template, translations)
 
                 template += (
                     '        default:\n'
@@ -319,7 +716,7 @@ class Message:
                         '                                   ctx->self,\n'
                         '                                   ctx->line_prefix);\n'
                         '            break;\n')
-                    template += string.Template(field_template).substitute(translations)
+                    template += utils.substitute_template(field_template, translations)
 
             template += (
                 '        default:\n'
@@ -384,7 +781,7 @@ class Message:
             '\n'
             '    return g_string_free (printable, FALSE);\n'
             '}\n')
-        cfile.write(string.Template(template).substitute(translations))
+        cfile.write(utils.substitute_template(template, translations))
 
 
     """
@@ -401,14 +798,21 @@ class Message:
         if self.type == 'Message':
             hfile.write('\n/* --- Input -- */\n');
             cfile.write('\n/* --- Input -- */\n');
-            self.input.emit(hfile, cfile)
-            self.__emit_request_creator(hfile, cfile)
+            with Stats.measure(self.fullname, 'containers', hfile, cfile):
+                self.input.emit(hfile, cfile)
+            with Stats.measure(self.fullname, 'request creator', hfile, cfile):
+                self.__emit_request_creator(hfile, cfile)
 
         hfile.write('\n/* --- Output -- */\n');
         cfile.write('\n/* --- Output -- */\n');
-        self.output.emit(hfile, cfile)
-        self.__emit_helpers(hfile, cfile)
-        self.__emit_response_or_indication_parser(hfile, cfile)
+        with Stats.measure(self.fullname, 'containers', hfile, cfile):
+            self.output.emit(hfile, cfile)
+        with Stats.measure(self.fullname, 'printable helpers', hfile, cfile):
+            self.__emit_helpers(hfile, cfile)
+        with Stats.measure(self.fullname, 'parser', hfile, cfile):
+            self.__emit_response_or_indication_parser(hfile, cfile)
+            if self.parse_into_since is not None:
+                self.__emit_response_parse_into(hfile, cfile)
 
     """
     Emit the sections
@@ -440,7 +844,14 @@ class Message:
                 '<SUBSECTION ${camelcase}ClientMethods>\n'
                 'qmi_client_${service}_${name_underscore}\n'
                 'qmi_client_${service}_${name_underscore}_finish\n')
-            sections['public-methods'] += string.Template(template).substitute(translations)
+            sections['public-methods'] += utils.substitute_template(template, translations)
+            if self.parse_into_since is not None:
+                template = (
+                    '${camelcase}Response\n')
+                sections['public-types'] += utils.substitute_template(template, translations)
+                template = (
+                    '${fullname_underscore}_response_parse_into\n')
+                sections['public-methods'] += utils.substitute_template(template, translations)
             translations['message_type'] = 'request'
         elif self.type == 'Indication':
             translations['message_type'] = 'indication'
@@ -463,4 +874,4 @@ class Message:
             '${standard}'
             '</SECTION>\n'
             '\n')
-        sfile.write(string.Template(template).substitute(translations))
+        sfile.write(utils.substitute_template(template, translations))
@@ -18,7 +18,6 @@
 # Copyright (C) 2012-2017 Aleksander Morgado <aleksander@aleksander.es>
 #
 
-import string
 
 from Message import Message
 import utils
@@ -74,11 +73,11 @@ class MessageList:
         for message in self.request_list:
             translations = { 'build_symbol' : message.build_symbol }
             message_template = '#define ${build_symbol}\n'
-            template += string.Template(message_template).substitute(translations)
+            template += utils.substitute_template(message_template, translations)
         for message in self.indication_list:
             translations = { 'build_symbol' : message.build_symbol }
             message_template = '#define ${build_symbol}\n'
-            template += string.Template(message_template).substitute(translations)
+            template += utils.substitute_template(message_template, translations)
         if len(self.unsupported_list) > 0:
             template += (
                 '\n'
@@ -86,8 +85,8 @@ class MessageList:
             for message in self.unsupported_list:
                 translations = { 'build_symbol' : message.build_symbol }
                 message_template = '/* ${build_symbol} */\n'
-                template += string.Template(message_template).substitute(translations)
-        f.write(string.Template(template).substitute(translations))
+                template += utils.substitute_template(message_template, translations)
+        f.write(utils.substitute_template(template, translations))
 
     """
     Emit the enumeration of the messages found in the specific service
@@ -110,12 +109,12 @@ class MessageList:
                 translations['vendor'] = message.vendor
                 enum_template = (
                     '    ${enum_name} = ${enum_value}, /* vendor ${vendor} */\n')
-            template += string.Template(enum_template).substitute(translations)
+            template += utils.substitute_template(enum_template, translations)
 
         template += (
             '} ${enum_type};\n'
             '\n')
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
 
     """
     Emit the enumeration of the indications found in the specific service
@@ -133,166 +132,84 @@ class MessageList:
             translations['enum_value'] = message.id
             enum_template = (
                 '    ${enum_name} = ${enum_value},\n')
-            template += string.Template(enum_template).substitute(translations)
+            template += utils.substitute_template(enum_template, translations)
 
         template += (
             '} ${enum_type};\n'
             '\n')
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
 
 
     """
-    Emit the method responsible for getting a printable representation of all
-    messages of a given service.
+    Emit the table of descriptors of all messages of a given service, sorted by
+    the (indication, vendor id, message id) key so that qmi-message.c can
+    resolve any message with a single binary search.
     """
-    def __emit_get_printable(self, hfile, cfile):
-        translations = { 'service'    : self.service.lower() }
+    def __emit_descriptors(self, hfile, cfile):
+        translations = { 'service' : self.service.lower() }
 
         template = (
             '\n'
             '#if defined (LIBQMI_GLIB_COMPILATION)\n'
             '\n'
             'G_GNUC_INTERNAL\n'
-            'gchar *__qmi_message_${service}_get_printable (\n'
-            '    QmiMessage *self,\n'
-            '    QmiMessageContext *context,\n'
-            '    const gchar *line_prefix);\n'
+            'const QmiMessageDescriptor *__qmi_message_${service}_get_descriptors (\n'
+            '    guint *n_descriptors);\n'
             '\n'
             '#endif\n'
             '\n')
-        hfile.write(string.Template(template).substitute(translations))
+        hfile.write(utils.substitute_template(template, translations))
+
+        entries = []
+        for message in self.request_list + self.indication_list:
+            indication = (message.type != 'Message')
+            vendor = 0 if (indication or message.vendor is None) else int(message.vendor, 0)
+            entries.append(((1 if indication else 0, vendor, int(message.id, 0)), message))
+        entries.sort(key=lambda entry: entry[0])
+
+        for i in range(1, len(entries)):
+            if entries[i][0] == entries[i - 1][0]:
+                raise ValueError('Messages \'%s\' and \'%s\' have the same ID' % (entries[i - 1][1].name, entries[i][1].name))
 
         template = (
             '\n'
-            'gchar *\n'
-            '__qmi_message_${service}_get_printable (\n'
-            '    QmiMessage *self,\n'
-            '    QmiMessageContext *context,\n'
-            '    const gchar *line_prefix)\n'
-            '{\n'
-            '    if (qmi_message_is_indication (self)) {\n'
-            '        switch (qmi_message_get_message_id (self)) {\n')
-
-        for message in self.indication_list:
+            'static const QmiMessageDescriptor ${service}_descriptors[] = {\n')
+        for (key, message) in entries:
+            translations['name'] = message.name
             translations['enum_name'] = message.id_enum_name
-            translations['message_underscore'] = utils.build_underscore_name (message.name)
+            translations['vendor'] = 'QMI_MESSAGE_VENDOR_GENERIC' if key[1] == 0 else message.vendor
+            translations['indication'] = 'TRUE' if key[0] else 'FALSE'
+            translations['abortable'] = 'TRUE' if message.abort else 'FALSE'
+            translations['printable'] = '%s_%s_get_printable' % ('indication' if key[0] else 'message',
+                                                                 utils.build_underscore_name (message.name))
+            if message.output is not None and message.output.fields is not None:
+                translations['parse'] = '(QmiMessageParseFunc)__%s_%s_parse' % (utils.build_underscore_name (message.fullname),
+                                                                                'indication' if key[0] else 'response')
+            else:
+                translations['parse'] = 'NULL'
             inner_template = (
-                '        case ${enum_name}:\n'
-                '            return indication_${message_underscore}_get_printable (self, line_prefix);\n')
-            template += string.Template(inner_template).substitute(translations)
-
-        template += (
-            '        default:\n'
-            '             return NULL;\n'
-            '        }\n'
-            '    } else {\n'
-            '        guint16 vendor_id;\n'
-            '\n'
-            '        vendor_id = (context ? qmi_message_context_get_vendor_id (context) : QMI_MESSAGE_VENDOR_GENERIC);\n'
-            '        if (vendor_id == QMI_MESSAGE_VENDOR_GENERIC) {\n'
-            '            switch (qmi_message_get_message_id (self)) {\n')
-
-        for message in self.request_list:
-            if message.vendor is None:
-                translations['enum_name'] = message.id_enum_name
-                translations['message_underscore'] = utils.build_underscore_name (message.name)
-                inner_template = (
-                    '            case ${enum_name}:\n'
-                    '                return message_${message_underscore}_get_printable (self, line_prefix);\n')
-                template += string.Template(inner_template).substitute(translations)
-
-        template += (
-            '             default:\n'
-            '                 return NULL;\n'
-            '            }\n'
-            '        } else {\n')
-
-        for message in self.request_list:
-            if message.vendor is not None:
-                translations['enum_name'] = message.id_enum_name
-                translations['message_underscore'] = utils.build_underscore_name (message.name)
-                translations['message_vendor'] = message.vendor
-                inner_template = (
-                    '            if (vendor_id == ${message_vendor} && (qmi_message_get_message_id (self) == ${enum_name}))\n'
-                    '                return message_${message_underscore}_get_printable (self, line_prefix);\n')
-                template += string.Template(inner_template).substitute(translations)
+                '    {\n'
+                '        .name          = "${name}",\n'
+                '        .parse         = ${parse},\n'
+                '        .get_printable = ${printable},\n'
+                '        .message_id    = ${enum_name},\n'
+                '        .vendor_id     = ${vendor},\n'
+                '        .indication    = ${indication},\n'
+                '        .abortable     = ${abortable},\n'
+                '    },\n')
+            template += utils.substitute_template(inner_template, translations)
 
         template += (
-            '            return NULL;\n'
-            '        }\n'
-            '    }\n'
-            '}\n')
-        cfile.write(string.Template(template).substitute(translations))
-
-
-    """
-    Emit the method responsible for checking whether a given message is abortable
-    """
-    def __emit_is_abortable(self, hfile, cfile):
-        # do nothing if no abortable messages in service
-        for message in self.request_list:
-            if message.abort:
-                break
-        else:
-            return
-
-        translations = { 'service'    : self.service.lower() }
-
-        template = (
-            '\n'
-            '#if defined (LIBQMI_GLIB_COMPILATION)\n'
-            '\n'
-            'G_GNUC_INTERNAL\n'
-            'gboolean __qmi_message_${service}_is_abortable (\n'
-            '    QmiMessage *self,\n'
-            '    QmiMessageContext *context);\n'
-            '\n'
-            '#endif\n'
-            '\n')
-        hfile.write(string.Template(template).substitute(translations))
-
-        template = (
+            '};\n'
             '\n'
-            'gboolean\n'
-            '__qmi_message_${service}_is_abortable (\n'
-            '    QmiMessage *self,\n'
-            '    QmiMessageContext *context)\n'
+            'const QmiMessageDescriptor *\n'
+            '__qmi_message_${service}_get_descriptors (\n'
+            '    guint *n_descriptors)\n'
             '{\n'
-            '    guint16 vendor_id;\n'
-            '\n'
-            '    vendor_id = (context ? qmi_message_context_get_vendor_id (context) : QMI_MESSAGE_VENDOR_GENERIC);\n'
-            '    if (vendor_id == QMI_MESSAGE_VENDOR_GENERIC) {\n'
-            '        switch (qmi_message_get_message_id (self)) {\n')
-
-        for message in self.request_list:
-            if message.vendor is None and message.abort:
-                translations['enum_name'] = message.id_enum_name
-                inner_template = (
-                    '        case ${enum_name}:\n'
-                    '            return TRUE;\n')
-                template += string.Template(inner_template).substitute(translations)
-
-        template += (
-            '        default:\n'
-            '            return FALSE;\n'
-            '        }\n'
-            '    } else {\n')
-
-        for message in self.request_list:
-            if message.vendor is not None and message.abort:
-                translations['enum_name'] = message.id_enum_name
-                translations['message_vendor'] = message.vendor
-                inner_template = (
-                    '        if (vendor_id == ${message_vendor} && (qmi_message_get_message_id (self) == ${enum_name})) {\n'
-                    '            return TRUE;\n'
-                    '        }\n')
-                template += string.Template(inner_template).substitute(translations)
-
-        template += (
-            '        return FALSE;\n'
-            '    }\n'
+            '    *n_descriptors = G_N_ELEMENTS (${service}_descriptors);\n'
+            '    return ${service}_descriptors;\n'
             '}\n')
-        cfile.write(string.Template(template).substitute(translations))
+        cfile.write(utils.substitute_template(template, translations))
 
 
     """
@@ -320,8 +237,7 @@ class MessageList:
         # First, emit common class code
         utils.add_separator(hfile, 'Service-specific utils', self.service);
         utils.add_separator(cfile, 'Service-specific utils', self.service);
-        self.__emit_get_printable(hfile, cfile)
-        self.__emit_is_abortable(hfile, cfile)
+        self.__emit_descriptors(hfile, cfile)
 
     """
     Emit the sections
@@ -0,0 +1,208 @@
+# -*- Mode: python; tab-width: 4; indent-tabs-mode: nil -*-
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2 of the License, or (at your option) any
+# later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Copyright (C) 2012-2017 Aleksander Morgado <aleksander@aleksander.es>
+#
+
+import time
+
+"""
+Whether statistics are being collected for the service currently being
+generated.
+"""
+enabled = False
+
+"""
+Name of the service currently being generated.
+"""
+service = None
+
+"""
+Statistics of each message, in the order they were first measured.
+"""
+messages = []
+messages_by_name = {}
+
+"""
+Entries of the measurements currently running, innermost last.
+"""
+active_entries = []
+
+"""
+Number of types registered in the service, among all messages.
+"""
+n_types = 0
+
+
+"""
+Measurement of the time spent and the bytes written to the source and header
+files while emitting a given phase of a message or field.
+"""
+class Measurement:
+
+    """
+    Constructor
+    """
+    def __init__(self, entry, phase, hfile, cfile):
+        self.entry = entry
+        self.phase = phase
+        self.hfile = hfile
+        self.cfile = cfile
+
+    def start(self):
+        self.c_size = self.cfile.size
+        # Static containers write to the source file in place of the header
+        self.h_size = self.hfile.size if self.hfile is not self.cfile else 0
+        active_entries.append(self.entry)
+        self.start_time = time.time()
+
+    def stop(self):
+        active_entries.pop()
+        elapsed = time.time() - self.start_time
+        phases = self.entry['phases']
+        phases[self.phase] = phases.get(self.phase, 0.0) + elapsed
+        self.entry['c-bytes'] += self.cfile.size - self.c_size
+        if self.hfile is not self.cfile:
+            self.entry['h-bytes'] += self.hfile.size - self.h_size
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+
+"""
+Measurement used when statistics are disabled, doing nothing.
+"""
+class NoMeasurement:
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+no_measurement = NoMeasurement()
+
+
+"""
+Starts collecting statistics (or not) for the given service.
+"""
+def reset(service_name, enable):
+    global enabled
+    global service
+    global n_types
+    enabled = enable
+    service = service_name
+    n_types = 0
+    del messages[:]
+    messages_by_name.clear()
+    del active_entries[:]
+
+
+"""
+Records that a new type was registered, accounting it to the message or field
+currently being measured.
+"""
+def type_registered(type_name):
+    global n_types
+    if not enabled:
+        return
+    n_types += 1
+    if active_entries:
+        active_entries[-1]['types'] += 1
+
+
+"""
+Builds a new empty statistics entry for a message or field
+"""
+def build_entry(name):
+    return { 'name'    : name,
+             'phases'  : {},
+             'c-bytes' : 0,
+             'h-bytes' : 0,
+             'types'   : 0 }
+
+
+"""
+Gets the statistics entry of the given message, or of one of its fields if a
+field name is given, creating it if needed.
+"""
+def get_entry(message_name, field_name):
+    message = messages_by_name.get(message_name)
+    if message is None:
+        message = build_entry(message_name)
+        message['fields'] = []
+        message['fields-by-name'] = {}
+        messages.append(message)
+        messages_by_name[message_name] = message
+    if field_name is None:
+        return message
+    field = message['fields-by-name'].get(field_name)
+    if field is None:
+        field = build_entry(field_name)
+        message['fields'].append(field)
+        message['fields-by-name'][field_name] = field
+    return field
+
+
+"""
+Returns a context manager measuring the given emit phase of a message, or of
+one of its fields if a field name is given.
+"""
+def measure(message_name, phase, hfile, cfile, field_name = None):
+    if not enabled:
+        return no_measurement
+    return Measurement(get_entry(message_name, field_name), phase, hfile, cfile)
+
+
+"""
+Builds the report of the collected statistics, suitable to be serialized as
+JSON.
+"""
+def build_report():
+    report_messages = []
+    for message in messages:
+        report_fields = []
+        # Types registered while measuring the message itself or any of its
+        # fields
+        n_message_types = message['types']
+        for field in message['fields']:
+            report_fields.append({ 'name'           : field['name'],
+                                   'phases'         : field['phases'],
+                                   'c-bytes'        : field['c-bytes'],
+                                   'h-bytes'        : field['h-bytes'],
+                                   'distinct-types' : field['types'] })
+            n_message_types += field['types']
+        report_messages.append({ 'name'           : message['name'],
+                                 'phases'         : message['phases'],
+                                 'c-bytes'        : message['c-bytes'],
+                                 'h-bytes'        : message['h-bytes'],
+                                 'distinct-types' : n_message_types,
+                                 'fields'         : report_fields })
+
+    return { 'service'        : service,
+             'distinct-types' : n_types,
+             'messages'       : report_messages }
@@ -18,82 +18,154 @@
 # Copyright (C) 2012-2017 Aleksander Morgado <aleksander@aleksander.es>
 #
 
+import Stats
 
 """
-List to keep track of types already emitted to the source/header files.
+Registry keeping track of the types, type-specific helpers and sections already
+emitted to the source/header files of a given service.
 """
-emitted_types = []
+class TypeRegistry:
+
+    """
+    Constructor
+    """
+    def __init__(self, service):
+        self.service = service
+        self.emitted_types = set()
+        self.emitted_helpers = set()
+        self.emitted_sections = set()
+
+
+    """
+    Checks whether a given type has already been emitted.
+    """
+    def is_type_emitted(self, type_name):
+        return type_name in self.emitted_types
+
+
+    """
+    Sets the given type as already emitted.
+    """
+    def set_type_emitted(self, type_name):
+        if type_name in self.emitted_types:
+            return False
+        self.emitted_types.add(type_name)
+        Stats.type_registered(type_name)
+        return True
+
+
+    """
+    Checks whether a given type-specific helpers have already been emitted.
+    """
+    def helpers_emitted(self, type_name):
+        return type_name in self.emitted_helpers
+
+
+    """
+    Sets the given type-specific get_printable() as already emitted.
+    """
+    def set_helpers_emitted(self, type_name):
+        if type_name in self.emitted_helpers:
+            return False
+        self.emitted_helpers.add(type_name)
+        return True
+
+
+    """
+    Checks whether a given section has already been emitted.
+    """
+    def is_section_emitted(self, section_name):
+        return section_name in self.emitted_sections
+
+
+    """
+    Sets the given section as already emitted.
+    """
+    def set_section_emitted(self, section_name):
+        if section_name in self.emitted_sections:
+            return False
+        self.emitted_sections.add(section_name)
+        return True
+
 
 """
-Checks whether a given type has already been emitted.
+Service which first emitted each type, among all the services generated in the
+same run. The types emitted by each service are merged in the order in which
+the services were given, so that the owners don't depend on how services were
+distributed among worker processes.
 """
-def is_type_emitted(type_name):
-    for i in emitted_types:
-        if i == type_name:
-            return True
-    else:
-        return False
+type_owners = {}
 
 """
-Sets the given type as already emitted.
+Sets the given service as the owner of those of the given types not emitted by
+a previous service.
 """
-def set_type_emitted(type_name):
-    if is_type_emitted(type_name):
-        return False
-    else:
-        emitted_types.append(type_name)
-        return True
+def add_type_owners(service, type_names):
+    for type_name in type_names:
+        if type_name not in type_owners:
+            type_owners[type_name] = service
 
+"""
+Returns the service which first emitted the given type, or None if the type
+hasn't been emitted yet.
+"""
+def get_type_owner(type_name):
+    return type_owners.get(type_name)
 
 
 """
-List to keep track of type-specific helper methods already emitted to
-the source/header files.
+Registry of the service currently being generated.
 """
-emitted_helpers = []
+registry = TypeRegistry(None)
 
 """
-Checks whether a given type-specific helpers have already been emitted.
+Starts a new registry for the given service, so that a new set of output files
+can be generated.
 """
-def helpers_emitted(type_name):
-    for i in emitted_helpers:
-        if i == type_name:
-            return True
-    else:
-        return False
+def reset(service = None):
+    global registry
+    registry = TypeRegistry(service)
+
 
 """
-Sets the given type-specific get_printable() as already emitted.
+Returns the sorted list of types emitted by the service currently being
+generated.
 """
-def set_helpers_emitted(type_name):
-    if helpers_emitted(type_name):
-        return False
-    else:
-        emitted_helpers.append(type_name)
-        return True
+def get_emitted_types():
+    return sorted(registry.emitted_types)
 
+"""
+Checks whether a given type has already been emitted.
+"""
+def is_type_emitted(type_name):
+    return registry.is_type_emitted(type_name)
 
 """
-List to keep track of sections already emitted to the source/header files.
+Sets the given type as already emitted.
 """
-emitted_sections = []
+def set_type_emitted(type_name):
+    return registry.set_type_emitted(type_name)
+
+"""
+Checks whether a given type-specific helpers have already been emitted.
+"""
+def helpers_emitted(type_name):
+    return registry.helpers_emitted(type_name)
+
+"""
+Sets the given type-specific get_printable() as already emitted.
+"""
+def set_helpers_emitted(type_name):
+    return registry.set_helpers_emitted(type_name)
 
 """
 Checks whether a given section has already been emitted.
 """
 def is_section_emitted(section_name):
-    for i in emitted_sections:
-        if i == section_name:
-            return True
-    else:
-        return False
+    return registry.is_section_emitted(section_name)
 
 """
 Sets the given section as already emitted.
 """
 def set_section_emitted(section_name):
-    if is_section_emitted(section_name):
-        return False
-    else:
-        emitted_sections.append(section_name)
-        return True
+    return registry.set_section_emitted(section_name)
@@ -92,6 +92,101 @@ class Variable:
         pass
 
 
+    """
+    Returns the number of bytes the variable takes in the raw byte stream if
+    it is always the same, or None otherwise.
+    """
+    def fixed_wire_size(self):
+        return None
+
+
+    """
+    Returns the minimum number of bytes the variable takes in the raw byte
+    stream.
+    """
+    def min_wire_size(self):
+        return 0
+
+
+    """
+    Returns how many bytes writing the variable takes in the raw byte stream,
+    as a tuple with the constant number of bytes and a list of C expressions
+    giving the bytes only known at runtime; or None if it cannot be known
+    beforehand.
+    """
+    def wire_size_terms(self, variable_name):
+        size = self.fixed_wire_size()
+        if size is None:
+            return None
+        return (size, [])
+
+
+    """
+    Whether the variable can be read without copying it, as a view of the
+    message data.
+    """
+    def supports_zero_copy(self):
+        return False
+
+
+    """
+    Whether the variable can be read, written and printed with the
+    table-driven codec.
+    """
+    def supports_codec(self):
+        return False
+
+
+    """
+    Builds the members of the codec descriptor of the variable, as a list of
+    (key, value) tuples, given the type holding the variable and its name in
+    that type. Any nested descriptor table required is added to the given
+    tables.
+    """
+    def build_codec_members(self, tables, type_name, variable_name):
+        raise RuntimeError('Variable of format \'%s\' not supported by the codec' % self.format)
+
+
+    """
+    Whether the variable can be stored inline, with a fixed capacity, in the
+    plain structs filled in by the parse_into() methods.
+    """
+    def supports_inline(self):
+        return False
+
+
+    """
+    Builds the declaration of the inline storage of the variable.
+    """
+    def build_inline_declaration(self, line_prefix, variable_name):
+        return ''
+
+
+    """
+    Builds the documentation of the inline storage of the variable.
+    """
+    def build_inline_documentation(self, line_prefix, variable_name):
+        return ''
+
+
+    """
+    Emits the code involved in reading the variable from the raw byte stream
+    into its inline storage. Data exceeding the capacity of the storage makes
+    the whole parse_into() method fail.
+    """
+    def emit_buffer_read_inline(self, f, line_prefix, tlv_out, error, variable_name):
+        pass
+
+
+    """
+    Emits the code involved in decoding the variable from a pointer to raw
+    data which is already known to hold fixed_wire_size() bytes, so no
+    overflow checks are needed.
+    """
+    def emit_buffer_read_raw(self, f, line_prefix, ptr, variable_name):
+        pass
+
+
     """
     Emits the code involved in writing the variable to the raw byte stream
     from the specific private format.
@@ -100,6 +195,14 @@ class Variable:
         pass
 
 
+    """
+    Emits the code setting the given 'changed' flag to TRUE if the values of the
+    two given variables of this kind differ.
+    """
+    def emit_compare(self, f, line_prefix, variable_name_a, variable_name_b, changed):
+        raise RuntimeError('Variable of format \'%s\' cannot be compared' % self.format)
+
+
     """
     Emits the code to get the contents of the given variable as a printable string.
     """
@@ -171,3 +274,11 @@ class Variable:
     """
     def flag_public(self):
         self.public = True
+
+    """
+    Flag as being stored in the given arena, so that the data doesn't need to
+    be disposed on its own. Returns True if the variable stores any data in
+    the arena.
+    """
+    def flag_arena(self, arena):
+        return False
@@ -18,9 +18,10 @@
 # Copyright (C) 2012-2017 Aleksander Morgado <aleksander@aleksander.es>
 #
 
-import string
 import utils
+import Codec
 from Variable import Variable
+from VariableInteger import VariableInteger
 import VariableFactory
 
 """
@@ -81,6 +82,185 @@ class VariableArray(Variable):
             self.array_sequence_element = ''
 
 
+    """
+    Whether the array elements are plain integers with the same size in the
+    wire and in memory, so that the whole array can be read or written at once
+    """
+    def is_integer_array(self):
+        return isinstance(self.array_element, VariableInteger) and \
+               self.array_element.format in [ 'guint8', 'gint8', 'guint16', 'gint16', 'guint32', 'gint32', 'guint64', 'gint64' ] and \
+               self.array_element.private_format == self.array_element.public_format
+
+
+    """
+    Endianness to use when reading or writing integer arrays
+    """
+    def integer_array_endian(self):
+        if self.array_element.private_format in ('guint8', 'gint8'):
+            return 'QMI_ENDIAN_LITTLE'
+        return self.array_element.endian
+
+
+    """
+    Whether the array elements have a fixed size in the raw byte stream, so
+    that the whole array can be checked for overflow at once
+    """
+    def is_fixed_element_array(self):
+        return self.array_element.fixed_wire_size() is not None
+
+
+    """
+    Fixed-size arrays take at least the minimum size of all their elements,
+    while arrays with a size prefix (and sequence) may be empty.
+    """
+    def min_wire_size(self):
+        if self.fixed_size:
+            return int(self.fixed_size) * self.array_element.min_wire_size()
+        size = self.array_size_element.min_wire_size()
+        # The sequence is read with the same format as the size prefix
+        if self.array_sequence_element != '':
+            size += self.array_size_element.min_wire_size()
+        return size
+
+
+    """
+    Arrays take the size prefix and sequence, if any, plus the size of all
+    their elements, which is only known beforehand if all elements have the
+    same size.
+    """
+    def wire_size_terms(self, variable_name):
+        element_size = self.array_element.fixed_wire_size()
+        if element_size is None:
+            return None
+        size = 0
+        if not self.fixed_size:
+            size += self.array_size_element.fixed_wire_size()
+        if self.array_sequence_element != '':
+            size += self.array_sequence_element.fixed_wire_size()
+        if element_size == 1:
+            return (size, [ '%s->len' % variable_name ])
+        return (size, [ '(%s->len * %u)' % (variable_name, element_size) ])
+
+
+    """
+    Arrays of bytes may be read without copying them.
+    """
+    def supports_zero_copy(self):
+        return self.is_integer_array() and \
+               self.array_element.format == 'guint8' and \
+               self.array_sequence_element == ''
+
+
+    """
+    Arrays are supported by the codec if their elements are, as long as each
+    element is a single value in memory.
+    """
+    def supports_codec(self):
+        if self.array_element.format == 'sequence':
+            return False
+        if self.array_element.format == 'array' and self.array_element.array_sequence_element != '':
+            return False
+        if self.array_element.format == 'string' and self.array_element.is_fixed_size:
+            return False
+        return self.array_element.supports_codec()
+
+
+    """
+    Arrays are described by their size prefix (or fixed size) and sequence,
+    if any, and by the descriptor of the element type.
+    """
+    def build_codec_members(self, tables, type_name, variable_name):
+        element_members = self.array_element.build_codec_members(tables, None, None)
+        Codec.set_member(element_members, 'value_size', 'sizeof (%s)' % self.array_element.public_format)
+
+        members = [ ('kind', 'QMI_CODEC_KIND_ARRAY') ]
+        if self.fixed_size:
+            members.append(('size', self.fixed_size))
+        else:
+            members.append(('n_size_prefix_bytes', self.array_size_element.fixed_wire_size()))
+        if self.array_sequence_element != '':
+            members += [ ('flags',           'QMI_CODEC_FLAG_SEQUENCE'),
+                         ('sequence_format', 'QMI_CODEC_FORMAT_' + self.array_sequence_element.private_format.upper()),
+                         ('sequence_offset', Codec.build_offset(type_name, variable_name + '_sequence')) ]
+        members += [ ('offset',     Codec.build_offset(type_name, variable_name)),
+                     ('n_children', 1),
+                     ('children',   tables.add([ element_members ])) ]
+        # Elements are read in place, so they are cleared with the array
+        if self.array_element.needs_dispose and self.container_type != 'Input':
+            members.append(('helper', '(GCallback) %s_clear' % self.clear_func_name()))
+        return members
+
+
+    """
+    Declaration of the view of the array in the message data
+    """
+    def build_view_declaration(self, line_prefix, variable_name):
+        translations = { 'lp'   : line_prefix,
+                         'name' : variable_name }
+
+        template = (
+            '${lp}const guint8 *${name}_view;\n'
+            '${lp}gsize ${name}_view_length;\n')
+        return utils.substitute_template(template, translations)
+
+
+    """
+    Builds the GArray copy of the view of the array. Several threads may read
+    the same container, so the copy is filled and published only once.
+    """
+    def build_view_copy(self, line_prefix, variable_name):
+        translations = { 'lp'   : line_prefix,
+                         'name' : variable_name }
+
+        template = (
+            '${lp}if (g_once_init_enter (&${name})) {\n'
+            '${lp}    GArray *copy;\n'
+            '\n'
+            '${lp}    copy = g_array_sized_new (FALSE, FALSE, sizeof (guint8), (guint)${name}_view_length);\n'
+            '${lp}    g_array_append_vals (copy, ${name}_view, (guint)${name}_view_length);\n'
+            '${lp}    g_once_init_leave (&${name}, copy);\n'
+            '${lp}}\n')
+        return utils.substitute_template(template, translations)
+
+
+    """
+    Reading an array of bytes without copying it is just about reading the
+    number of items and validating that all of them are available.
+    """
+    def emit_buffer_read_view(self, f, line_prefix, tlv_out, error, variable_name):
+        common_var_prefix = utils.build_underscore_name(self.name)
+        translations = { 'lp'                : line_prefix,
+                         'tlv_out'           : tlv_out,
+                         'error'             : error,
+                         'variable_name'     : variable_name,
+                         'common_var_prefix' : common_var_prefix }
+
+        if self.fixed_size:
+            translations['fixed_size'] = self.fixed_size
+            template = (
+                '${lp}{\n'
+                '${lp}    guint16 ${common_var_prefix}_n_items = ${fixed_size};\n'
+                '\n')
+            f.write(utils.substitute_template(template, translations))
+        else:
+            translations['array_size_element_format'] = self.array_size_element.public_format
+            template = (
+                '${lp}{\n'
+                '${lp}    ${array_size_element_format} ${common_var_prefix}_n_items;\n'
+                '\n'
+                '${lp}    /* Read number of items in the array */\n')
+            f.write(utils.substitute_template(template, translations))
+            self.array_size_element.emit_buffer_read(f, line_prefix + '    ', tlv_out, error, common_var_prefix + '_n_items')
+            f.write('\n')
+
+        template = (
+            '${lp}    if (!(${variable_name}_view = qmi_message_tlv_read_block (message, init_offset, &offset, (guint)${common_var_prefix}_n_items, 1, ${error})))\n'
+            '${lp}        goto ${tlv_out};\n'
+            '${lp}    ${variable_name}_view_length = ${common_var_prefix}_n_items;\n'
+            '${lp}}\n')
+        f.write(utils.substitute_template(template, translations))
+
+
     """
     Emit the type for the array element
     """
@@ -126,7 +306,7 @@ class VariableArray(Variable):
             '{\n'
             '$dispose_contents'
             '}\n')
-        cfile.write(string.Template(template).substitute(translations))
+        cfile.write(utils.substitute_template(template, translations))
 
 
     """
@@ -143,9 +323,14 @@ class VariableArray(Variable):
                          'common_var_prefix'           : common_var_prefix }
 
         template = (
-            '${lp}{\n'
-            '${lp}    guint ${common_var_prefix}_i;\n')
-        f.write(string.Template(template).substitute(translations))
+            '${lp}{\n')
+        if not self.is_integer_array():
+            template += (
+                '${lp}    guint ${common_var_prefix}_i;\n')
+            if self.is_fixed_element_array():
+                template += (
+                    '${lp}    const guint8 *${common_var_prefix}_ptr;\n')
+        f.write(utils.substitute_template(template, translations))
 
         if self.fixed_size:
             translations['fixed_size'] = self.fixed_size
@@ -153,7 +338,7 @@ class VariableArray(Variable):
             template = (
                 '${lp}    guint16 ${common_var_prefix}_n_items = ${fixed_size};\n'
                 '\n')
-            f.write(string.Template(template).substitute(translations))
+            f.write(utils.substitute_template(template, translations))
         else:
             translations['array_size_element_format'] = self.array_size_element.public_format
             template = (
@@ -167,20 +352,20 @@ class VariableArray(Variable):
             template += (
                 '\n'
                 '${lp}    /* Read number of items in the array */\n')
-            f.write(string.Template(template).substitute(translations))
+            f.write(utils.substitute_template(template, translations))
             self.array_size_element.emit_buffer_read(f, line_prefix + '    ', tlv_out, error, common_var_prefix + '_n_items')
 
             if self.array_sequence_element != '':
                 template = (
                     '\n'
                     '${lp}    /* Read sequence in the array */\n')
-                f.write(string.Template(template).substitute(translations))
+                f.write(utils.substitute_template(template, translations))
                 self.array_size_element.emit_buffer_read(f, line_prefix + '    ', tlv_out, error, common_var_prefix + '_sequence')
 
                 template = (
                     '\n'
                     '${lp}    ${variable_name}_sequence = ${common_var_prefix}_sequence;\n')
-                f.write(string.Template(template).substitute(translations))
+                f.write(utils.substitute_template(template, translations))
 
         template = (
             '\n'
@@ -191,6 +376,56 @@ class VariableArray(Variable):
             '${lp}        (guint)${common_var_prefix}_n_items);\n'
             '\n')
 
+        # Integer arrays are read all at once, with a single overflow check
+        if self.is_integer_array():
+            translations['tlv_out'] = tlv_out
+            translations['error'] = error
+            translations['endian'] = self.integer_array_endian()
+            template += (
+                '${lp}    g_array_set_size (${variable_name}, (guint)${common_var_prefix}_n_items);\n'
+                '${lp}    if (!qmi_message_tlv_read_integer_array (message, init_offset, &offset, ${endian},\n'
+                '${lp}                                             sizeof (${public_array_element_format}),\n'
+                '${lp}                                             (guint)${common_var_prefix}_n_items,\n'
+                '${lp}                                             ${variable_name}->data,\n'
+                '${lp}                                             ${error}))\n'
+                '${lp}        goto ${tlv_out};\n'
+                '${lp}}\n')
+            f.write(utils.substitute_template(template, translations))
+            return
+
+        # Arrays of fixed-size elements are checked for overflow all at once,
+        # and then each element is decoded from the raw data
+        if self.is_fixed_element_array():
+            translations['tlv_out'] = tlv_out
+            translations['error'] = error
+            translations['element_size'] = self.array_element.fixed_wire_size()
+            template = (
+                '\n'
+                '${lp}    if (!(${common_var_prefix}_ptr = qmi_message_tlv_read_block (message, init_offset, &offset, (guint)${common_var_prefix}_n_items, ${element_size}, ${error})))\n'
+                '${lp}        goto ${tlv_out};\n'
+                '\n'
+                '${lp}    ${variable_name} = g_array_sized_new (\n'
+                '${lp}        FALSE,\n'
+                '${lp}        FALSE,\n'
+                '${lp}        sizeof (${public_array_element_format}),\n'
+                '${lp}        (guint)${common_var_prefix}_n_items);\n'
+                '\n'
+                '${lp}    for (${common_var_prefix}_i = 0; ${common_var_prefix}_i < ${common_var_prefix}_n_items; ${common_var_prefix}_i++) {\n'
+                '${lp}        ${public_array_element_format} ${common_var_prefix}_aux;\n'
+                '\n')
+            f.write(utils.substitute_template(template, translations))
+
+            self.array_element.emit_buffer_read_raw(f, line_prefix + '        ',
+                                                    '%s_ptr + (%s_i * %u)' % (common_var_prefix, common_var_prefix, translations['element_size']),
+                                                    common_var_prefix + '_aux')
+
+            template = (
+                '${lp}        g_array_insert_val (${variable_name}, ${common_var_prefix}_i, ${common_var_prefix}_aux);\n'
+                '${lp}    }\n'
+                '${lp}}\n')
+            f.write(utils.substitute_template(template, translations))
+            return
+
         if self.array_element.needs_dispose == True:
             template += (
                 '${lp}    g_array_set_clear_func (${variable_name},\n'
@@ -201,7 +436,7 @@ class VariableArray(Variable):
             '${lp}    for (${common_var_prefix}_i = 0; ${common_var_prefix}_i < ${common_var_prefix}_n_items; ${common_var_prefix}_i++) {\n'
             '${lp}        ${public_array_element_format} ${common_var_prefix}_aux;\n'
             '\n')
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
 
         self.array_element.emit_buffer_read(f, line_prefix + '        ', tlv_out, error, common_var_prefix + '_aux')
 
@@ -209,7 +444,7 @@ class VariableArray(Variable):
             '${lp}        g_array_insert_val (${variable_name}, ${common_var_prefix}_i, ${common_var_prefix}_aux);\n'
             '${lp}    }\n'
             '${lp}}\n')
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
 
 
     """
@@ -223,9 +458,11 @@ class VariableArray(Variable):
                          'common_var_prefix' : common_var_prefix }
 
         template = (
-            '${lp}{\n'
-            '${lp}    guint ${common_var_prefix}_i;\n')
-        f.write(string.Template(template).substitute(translations))
+            '${lp}{\n')
+        if not self.is_integer_array():
+            template += (
+                '${lp}    guint ${common_var_prefix}_i;\n')
+        f.write(utils.substitute_template(template, translations))
 
         if self.fixed_size == 0:
             translations['array_size_element_format'] = self.array_size_element.private_format
@@ -235,25 +472,43 @@ class VariableArray(Variable):
                 '\n'
                 '${lp}    /* Write the number of items in the array first */\n'
                 '${lp}    ${common_var_prefix}_n_items = (${array_size_element_format}) ${variable_name}->len;\n')
-            f.write(string.Template(template).substitute(translations))
+            f.write(utils.substitute_template(template, translations))
 
             self.array_size_element.emit_buffer_write(f, line_prefix + '    ', tlv_name, common_var_prefix + '_n_items')
 
         if self.array_sequence_element != '':
             self.array_sequence_element.emit_buffer_write(f, line_prefix + '    ', tlv_name, variable_name + '_sequence')
 
+        # Integer arrays are written all at once, with a single overflow check
+        if self.is_integer_array():
+            translations['tlv_name'] = tlv_name
+            translations['endian'] = self.integer_array_endian()
+            translations['public_array_element_format'] = self.array_element.public_format
+            template = (
+                '\n'
+                '${lp}    if (!qmi_message_tlv_write_integer_array (self, ${endian},\n'
+                '${lp}                                              sizeof (${public_array_element_format}),\n'
+                '${lp}                                              ${variable_name}->len,\n'
+                '${lp}                                              ${variable_name}->data,\n'
+                '${lp}                                              error)) {\n'
+                '${lp}        g_prefix_error (error, "Cannot write integer array in TLV \'${tlv_name}\': ");\n'
+                '${lp}        return NULL;\n'
+                '${lp}    }\n'
+                '${lp}}\n')
+            f.write(utils.substitute_template(template, translations))
+            return
 
         template = (
             '\n'
             '${lp}    for (${common_var_prefix}_i = 0; ${common_var_prefix}_i < ${variable_name}->len; ${common_var_prefix}_i++) {\n')
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
 
         self.array_element.emit_buffer_write(f, line_prefix + '        ', tlv_name, 'g_array_index (' + variable_name + ', ' + self.array_element.public_format + ',' + common_var_prefix + '_i)')
 
         template = (
             '${lp}    }\n'
             '${lp}}\n')
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
 
 
     """
@@ -268,7 +523,7 @@ class VariableArray(Variable):
         template = (
             '${lp}{\n'
             '${lp}    guint ${common_var_prefix}_i;\n')
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
 
         if self.fixed_size:
             translations['fixed_size'] = self.fixed_size
@@ -276,7 +531,7 @@ class VariableArray(Variable):
             template = (
                 '${lp}    guint16 ${common_var_prefix}_n_items = ${fixed_size};\n'
                 '\n')
-            f.write(string.Template(template).substitute(translations))
+            f.write(utils.substitute_template(template, translations))
         else:
             translations['array_size_element_format'] = self.array_size_element.public_format
             template = (
@@ -290,19 +545,19 @@ class VariableArray(Variable):
             template += (
                 '\n'
                 '${lp}    /* Read number of items in the array */\n')
-            f.write(string.Template(template).substitute(translations))
+            f.write(utils.substitute_template(template, translations))
             self.array_size_element.emit_buffer_read(f, line_prefix + '    ', 'out', '&error', common_var_prefix + '_n_items')
 
             if self.array_sequence_element != '':
                 template = (
                     '\n'
                     '${lp}    /* Read sequence */\n')
-                f.write(string.Template(template).substitute(translations))
+                f.write(utils.substitute_template(template, translations))
                 self.array_sequence_element.emit_buffer_read(f, line_prefix + '    ', 'out', '&error', common_var_prefix + '_sequence')
                 template = (
                     '\n'
                     '${lp}    g_string_append_printf (printable, "[[Seq:%u]] ", ${common_var_prefix}_sequence);\n')
-                f.write(string.Template(template).substitute(translations))
+                f.write(utils.substitute_template(template, translations))
 
         template = (
             '\n'
@@ -310,7 +565,7 @@ class VariableArray(Variable):
             '\n'
             '${lp}    for (${common_var_prefix}_i = 0; ${common_var_prefix}_i < ${common_var_prefix}_n_items; ${common_var_prefix}_i++) {\n'
             '${lp}        g_string_append_printf (printable, " [%u] = \'", ${common_var_prefix}_i);\n')
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
 
         self.array_element.emit_get_printable(f, line_prefix + '        ');
 
@@ -320,7 +575,148 @@ class VariableArray(Variable):
             '\n'
             '${lp}    g_string_append (printable, "}");\n'
             '${lp}}')
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
+
+
+    """
+    Only arrays of integers with a known maximum number of elements can be
+    stored inline: fixed-size arrays and arrays with a guint8 size prefix.
+    """
+    def supports_inline(self):
+        if not isinstance(self.array_element, VariableInteger):
+            return False
+        return self.fixed_size or self.array_size_element.private_format == 'guint8'
+
+
+    """
+    Number of items (or characters) that fit in the inline storage
+    """
+    def __inline_capacity(self):
+        return int(self.fixed_size) if self.fixed_size else 255
+
+
+    """
+    Inline storage declaration
+    """
+    def build_inline_declaration(self, line_prefix, variable_name):
+        translations = { 'lp'             : line_prefix,
+                         'name'           : variable_name,
+                         'element_format' : self.array_element.public_format,
+                         'capacity'       : self.__inline_capacity() }
+
+        template = ''
+        if self.array_sequence_element != '':
+            translations['array_sequence_element_format'] = self.array_sequence_element.public_format
+            template += (
+                '${lp}${array_sequence_element_format} ${name}_sequence;\n')
+        template += (
+            '${lp}guint ${name}_n_items;\n'
+            '${lp}${element_format} ${name}[${capacity}];\n')
+        return utils.substitute_template(template, translations)
+
+
+    """
+    Documentation for the inline storage
+    """
+    def build_inline_documentation(self, line_prefix, variable_name):
+        translations = { 'lp'             : line_prefix,
+                         'name'           : variable_name,
+                         'element_format' : self.array_element.public_format,
+                         'capacity'       : self.__inline_capacity() }
+
+        template = ''
+        if self.array_sequence_element != '':
+            template += (
+                '${lp}@${name}_sequence: the sequence number of @${name}.\n')
+        template += (
+            '${lp}@${name}_n_items: the number of items in @${name}.\n'
+            '${lp}@${name}: an array of at most ${capacity} #${element_format} items.\n')
+        return utils.substitute_template(template, translations)
+
+
+    """
+    Read the variable into its inline storage
+    """
+    def emit_buffer_read_inline(self, f, line_prefix, tlv_out, error, variable_name):
+        common_var_prefix = utils.build_underscore_name(self.name)
+        translations = { 'lp'                : line_prefix,
+                         'variable_name'     : variable_name,
+                         'common_var_prefix' : common_var_prefix }
+
+        template = (
+            '${lp}{\n'
+            '${lp}    guint ${common_var_prefix}_i;\n')
+        if self.fixed_size:
+            translations['fixed_size'] = self.fixed_size
+            template += (
+                '${lp}    guint16 ${common_var_prefix}_n_items = ${fixed_size};\n'
+                '\n')
+            f.write(utils.substitute_template(template, translations))
+        else:
+            translations['array_size_element_format'] = self.array_size_element.public_format
+            template += (
+                '${lp}    ${array_size_element_format} ${common_var_prefix}_n_items;\n'
+                '\n'
+                '${lp}    /* Read number of items in the array */\n')
+            f.write(utils.substitute_template(template, translations))
+            self.array_size_element.emit_buffer_read(f, line_prefix + '    ', tlv_out, error, common_var_prefix + '_n_items')
+
+        if self.array_sequence_element != '':
+            template = (
+                '\n'
+                '${lp}    /* Read sequence */\n')
+            f.write(utils.substitute_template(template, translations))
+            self.array_sequence_element.emit_buffer_read(f, line_prefix + '    ', tlv_out, error, variable_name + '_sequence')
+
+        template = (
+            '\n'
+            '${lp}    for (${common_var_prefix}_i = 0; ${common_var_prefix}_i < ${common_var_prefix}_n_items; ${common_var_prefix}_i++) {\n')
+        f.write(utils.substitute_template(template, translations))
+
+        self.array_element.emit_buffer_read(f, line_prefix + '        ', tlv_out, error, variable_name + '[' + common_var_prefix + '_i]')
+
+        template = (
+            '${lp}    }\n'
+            '${lp}    ${variable_name}_n_items = ${common_var_prefix}_n_items;\n'
+            '${lp}}\n')
+        f.write(utils.substitute_template(template, translations))
+
+
+    """
+    Arrays differ if their sequences or their number of elements differ, or
+    otherwise as soon as one element differs.
+    """
+    def emit_compare(self, f, line_prefix, variable_name_a, variable_name_b, changed):
+        common_var_prefix = utils.build_underscore_name(self.name)
+        translations = { 'lp'                : line_prefix,
+                         'a'                 : variable_name_a,
+                         'b'                 : variable_name_b,
+                         'changed'           : changed,
+                         'common_var_prefix' : common_var_prefix }
+
+        template = ''
+        if self.array_sequence_element != '':
+            template += (
+                '${lp}if (${a}_sequence != ${b}_sequence)\n'
+                '${lp}    ${changed} = TRUE;\n')
+        template += (
+            '${lp}if (${a}->len != ${b}->len)\n'
+            '${lp}    ${changed} = TRUE;\n'
+            '${lp}else {\n'
+            '${lp}    guint ${common_var_prefix}_i;\n'
+            '\n'
+            '${lp}    for (${common_var_prefix}_i = 0; !${changed} && ${common_var_prefix}_i < ${a}->len; ${common_var_prefix}_i++) {\n')
+        f.write(utils.substitute_template(template, translations))
+
+        self.array_element.emit_compare(f, line_prefix + '        ',
+                                        'g_array_index (' + variable_name_a + ', ' + self.array_element.public_format + ', ' + common_var_prefix + '_i)',
+                                        'g_array_index (' + variable_name_b + ', ' + self.array_element.public_format + ', ' + common_var_prefix + '_i)',
+                                        changed)
+
+        template = (
+            '${lp}    }\n'
+            '${lp}}\n')
+        f.write(utils.substitute_template(template, translations))
 
 
     """
@@ -338,7 +734,7 @@ class VariableArray(Variable):
 
         template += (
             '${lp}GArray *${name};\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
@@ -359,7 +755,7 @@ class VariableArray(Variable):
 
         template += (
             '${lp}GArray **${name},\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
@@ -381,7 +777,7 @@ class VariableArray(Variable):
 
         template += (
             '${lp}@${name}: (out)(element-type ${public_array_element_type})(transfer none): a placeholder for the output #GArray of #${public_array_element_format} elements, or %NULL if not required. Do not free it, it is owned by @self.\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
@@ -409,7 +805,7 @@ class VariableArray(Variable):
             template += (
                 '${lp}${to} = ${from};\n')
 
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
@@ -430,7 +826,7 @@ class VariableArray(Variable):
 
         template += (
             '${lp}GArray *${name},\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
@@ -452,7 +848,7 @@ class VariableArray(Variable):
 
         template += (
             '${lp}@${name}: (in)(element-type ${public_array_element_type}): a #GArray of #${public_array_element_format} elements. A new reference to @${name} will be taken.\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
@@ -475,7 +871,7 @@ class VariableArray(Variable):
             '${lp}if (${to})\n'
             '${lp}    g_array_unref (${to});\n'
             '${lp}${to} = g_array_ref (${from});\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
@@ -493,7 +889,7 @@ class VariableArray(Variable):
 
         template += (
             '${lp}@${name}: a #GArray of #${public_array_element_format} elements.\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
@@ -506,7 +902,7 @@ class VariableArray(Variable):
         template = (
             '${lp}if (${variable_name})\n'
             '${lp}    g_array_unref (${variable_name});\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
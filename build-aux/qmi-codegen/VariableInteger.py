@@ -18,8 +18,8 @@
 # Copyright (C) 2012-2017 Aleksander Morgado <aleksander@aleksander.es>
 #
 
-import string
 import utils
+import Codec
 from Variable import Variable
 
 """
@@ -93,7 +93,122 @@ class VariableInteger(Variable):
                 '${lp}        goto ${tlv_out};\n'
                 '${lp}    ${variable_name} = (${public_format})tmp;\n'
                 '${lp}}\n')
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
+
+
+    """
+    Integers and floating point numbers have a fixed size in the raw byte
+    stream, except for sized integers.
+    """
+    def fixed_wire_size(self):
+        if self.private_format == 'gfloat':
+            return 4
+        if self.private_format == 'gdouble':
+            return 8
+        if self.format == 'guint-sized':
+            return None
+        return VariableInteger.fixed_type_byte_size(self.private_format)
+
+
+    """
+    Sized integers take exactly the given number of bytes, all other integers
+    take their fixed size.
+    """
+    def min_wire_size(self):
+        if self.format == 'guint-sized':
+            return int(self.guint_sized_size)
+        return self.fixed_wire_size()
+
+
+    """
+    Sized integers are always written with the given number of bytes.
+    """
+    def wire_size_terms(self, variable_name):
+        if self.format == 'guint-sized':
+            return (int(self.guint_sized_size), [])
+        return (self.fixed_wire_size(), [])
+
+
+    """
+    All integers and floating point numbers are supported by the codec.
+    """
+    def supports_codec(self):
+        return True
+
+
+    """
+    Integers are described by their format in the raw byte stream and their
+    size in memory, along with how they should be printed.
+    """
+    def build_codec_members(self, tables, type_name, variable_name):
+        members = [ ('kind',   'QMI_CODEC_KIND_INTEGER'),
+                    ('format', 'QMI_CODEC_FORMAT_' + self.private_format.upper()) ]
+        if self.format == 'guint-sized':
+            members[0] = ('kind', 'QMI_CODEC_KIND_SIZED_INTEGER')
+            members.append(('size', self.guint_sized_size))
+        if self.endian != 'QMI_ENDIAN_LITTLE':
+            members.append(('endian', self.endian))
+        # Integers in public structs are stored in their public format, while
+        # those in containers are stored in their private format
+        members.append(('value_size', 'sizeof (%s)' % (self.public_format if self.public else self.private_format)))
+        members.append(('offset', Codec.build_offset(type_name, variable_name)))
+
+        if self.public_format == 'gboolean':
+            members.append(('print', 'QMI_CODEC_PRINT_BOOLEAN'))
+        elif self.public_format != self.private_format:
+            public_type_underscore = utils.build_underscore_name_from_camelcase(self.public_format)
+            members += [ '#if defined __%s_IS_ENUM__' % public_type_underscore.upper(),
+                         ('print',  'QMI_CODEC_PRINT_ENUM'),
+                         ('helper', '(GCallback) %s_get_string' % public_type_underscore),
+                         '#elif defined __%s_IS_FLAGS__' % public_type_underscore.upper(),
+                         ('print',  'QMI_CODEC_PRINT_FLAGS'),
+                         ('helper', '(GCallback) %s_build_string_from_mask' % public_type_underscore),
+                         '#else',
+                         '# error unexpected public format: %s' % self.public_format,
+                         '#endif' ]
+        return members
+
+
+    """
+    Decode a single integer from raw data
+    """
+    def emit_buffer_read_raw(self, f, line_prefix, ptr, variable_name):
+        translations = { 'lp'             : line_prefix,
+                         'ptr'            : ptr,
+                         'variable_name'  : variable_name,
+                         'private_format' : self.private_format,
+                         'size'           : self.fixed_wire_size() }
+
+        if self.private_format == self.public_format:
+            translations['cast'] = ''
+        else:
+            translations['cast'] = '(' + self.public_format + ') '
+
+        if self.private_format in ('guint8', 'gint8'):
+            if ' ' in ptr:
+                translations['ptr'] = '(' + ptr + ')'
+            template = (
+                '${lp}${variable_name} = ${cast}(${private_format}) ${ptr}[0];\n')
+            f.write(utils.substitute_template(template, translations))
+            return
+
+        if self.endian == 'QMI_ENDIAN_BIG':
+            suffix = '_FROM_BE'
+        else:
+            suffix = '_FROM_LE'
+        if self.private_format in ('gfloat', 'gdouble'):
+            translations['swap'] = 'QMI_' + self.private_format.upper() + suffix
+        else:
+            translations['swap'] = self.private_format.upper() + suffix
+
+        template = (
+            '${lp}{\n'
+            '${lp}    ${private_format} tmp;\n'
+            '\n'
+            '${lp}    memcpy (&tmp, ${ptr}, ${size});\n'
+            '${lp}    ${variable_name} = ${cast}${swap} (tmp);\n'
+            '${lp}}\n')
+        f.write(utils.substitute_template(template, translations))
 
 
     """
@@ -160,7 +275,50 @@ class VariableInteger(Variable):
                 '${lp}        return NULL;\n'
                 '${lp}    }\n'
                 '${lp}}\n')
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
+
+
+    """
+    Integers are stored inline in their public format.
+    """
+    def supports_inline(self):
+        return True
+
+
+    """
+    Inline storage declaration
+    """
+    def build_inline_declaration(self, line_prefix, variable_name):
+        return self.build_variable_declaration(True, line_prefix, variable_name)
+
+
+    """
+    Documentation for the inline storage
+    """
+    def build_inline_documentation(self, line_prefix, variable_name):
+        return self.build_struct_field_documentation(line_prefix, variable_name)
+
+
+    """
+    Read the variable into its inline storage
+    """
+    def emit_buffer_read_inline(self, f, line_prefix, tlv_out, error, variable_name):
+        self.emit_buffer_read(f, line_prefix, tlv_out, error, variable_name)
+
+
+    """
+    Integers are compared by value.
+    """
+    def emit_compare(self, f, line_prefix, variable_name_a, variable_name_b, changed):
+        translations = { 'lp'      : line_prefix,
+                         'a'       : variable_name_a,
+                         'b'       : variable_name_b,
+                         'changed' : changed }
+
+        template = (
+            '${lp}if (${a} != ${b})\n'
+            '${lp}    ${changed} = TRUE;\n')
+        f.write(utils.substitute_template(template, translations))
 
 
     """
@@ -249,7 +407,7 @@ class VariableInteger(Variable):
         template += (
             '${lp}}\n')
 
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
 
 
     """
@@ -267,7 +425,7 @@ class VariableInteger(Variable):
         else:
             template += (
                 '${lp}${private_format} ${name};\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
@@ -283,7 +441,7 @@ class VariableInteger(Variable):
 
         template = (
             '${lp}${public_format} *${name},\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
@@ -299,7 +457,7 @@ class VariableInteger(Variable):
 
         template = (
             '${lp}@${name}: (out): a placeholder for the output #${public_format}, or %NULL if not required.\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
     """
     Builds the Integer getter implementation
@@ -319,11 +477,11 @@ class VariableInteger(Variable):
             template = (
                 '${lp}if (${to})\n'
                 '${lp}    *${to} = ${cast_ini}${from}${cast_end};\n')
-            return string.Template(template).substitute(translations)
+            return utils.substitute_template(template, translations)
         else:
             template = (
                 '${lp}${to} = ${cast_ini}${from}${cast_end};\n')
-            return string.Template(template).substitute(translations)
+            return utils.substitute_template(template, translations)
 
 
     """
@@ -339,7 +497,7 @@ class VariableInteger(Variable):
 
         template = (
             '${lp}${public_format} ${name},\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
@@ -355,7 +513,7 @@ class VariableInteger(Variable):
 
         template = (
             '${lp}@${name}: a #${public_format}.\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
@@ -374,7 +532,7 @@ class VariableInteger(Variable):
 
         template = (
             '${lp}${to} = ${cast_ini}${from}${cast_end};\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
@@ -387,4 +545,4 @@ class VariableInteger(Variable):
 
         template = (
             '${lp}@${name}: a #${public_format}.\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
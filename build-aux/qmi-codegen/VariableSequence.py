@@ -18,7 +18,6 @@
 # Copyright (C) 2012-2017 Aleksander Morgado <aleksander@aleksander.es>
 #
 
-import string
 import utils
 from Variable import Variable
 import VariableFactory
@@ -71,6 +70,58 @@ class VariableSequence(Variable):
             member['object'].emit_helper_methods(hfile, cfile)
 
 
+    """
+    Sequences take at least the sum of the minimum sizes of their members.
+    """
+    def min_wire_size(self):
+        size = 0
+        for member in self.members:
+            size += member['object'].min_wire_size()
+        return size
+
+
+    """
+    Sequences take the sum of the sizes of their members.
+    """
+    def wire_size_terms(self, variable_name):
+        size = 0
+        expressions = []
+        for member in self.members:
+            member_terms = member['object'].wire_size_terms(variable_name + '_' + member['name'])
+            if member_terms is None:
+                return None
+            size += member_terms[0]
+            expressions += member_terms[1]
+        return (size, expressions)
+
+
+    """
+    Sequences are supported by the codec if all their members are.
+    """
+    def supports_codec(self):
+        for member in self.members:
+            if not member['object'].supports_codec():
+                return False
+        return True
+
+
+    """
+    Sequences are described as structs whose members are each at its own
+    offset within the type holding the sequence, as they are stored as
+    independent variables.
+    """
+    def build_codec_members(self, tables, type_name, variable_name):
+        descriptors = []
+        for member in self.members:
+            member_members = [ ('name', '"%s"' % member['name']) ]
+            member_members += member['object'].build_codec_members(tables, type_name, variable_name + '_' + member['name'])
+            descriptors.append(member_members)
+
+        return [ ('kind',       'QMI_CODEC_KIND_STRUCT'),
+                 ('n_children', len(descriptors)),
+                 ('children',   tables.add(descriptors)) ]
+
+
     """
     Reading the contents of a sequence is just about reading each of the sequence
     fields one by one.
@@ -98,23 +149,88 @@ class VariableSequence(Variable):
 
         template = (
             '${lp}g_string_append (printable, "[");\n')
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
 
         for member in self.members:
             translations['variable_name'] = member['name']
             template = (
                 '${lp}g_string_append (printable, " ${variable_name} = \'");\n')
-            f.write(string.Template(template).substitute(translations))
+            f.write(utils.substitute_template(template, translations))
 
             member['object'].emit_get_printable(f, line_prefix)
 
             template = (
                 '${lp}g_string_append (printable, "\'");\n')
-            f.write(string.Template(template).substitute(translations))
+            f.write(utils.substitute_template(template, translations))
 
         template = (
             '${lp}g_string_append (printable, " ]");\n')
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
+
+
+    """
+    Sequences are stored inline as independent variables, one per member.
+    """
+    def supports_inline(self):
+        for member in self.members:
+            if not member['object'].supports_inline():
+                return False
+        return True
+
+
+    """
+    Inline storage declaration
+    """
+    def build_inline_declaration(self, line_prefix, variable_name):
+        built = ''
+        for member in self.members:
+            built += member['object'].build_inline_declaration(line_prefix, variable_name + '_' + member['name'])
+        return built
+
+
+    """
+    Documentation for the inline storage
+    """
+    def build_inline_documentation(self, line_prefix, variable_name):
+        built = ''
+        for member in self.members:
+            built += member['object'].build_inline_documentation(line_prefix, variable_name + '_' + member['name'])
+        return built
+
+
+    """
+    Read the variable into its inline storage
+    """
+    def emit_buffer_read_inline(self, f, line_prefix, tlv_out, error, variable_name):
+        for member in self.members:
+            member['object'].emit_buffer_read_inline(f, line_prefix, tlv_out, error, variable_name + '_' +  member['name'])
+
+
+    """
+    Comparing two sequences is just about comparing each of the sequence fields
+    one by one.
+    """
+    def emit_compare(self, f, line_prefix, variable_name_a, variable_name_b, changed):
+        for member in self.members:
+            member['object'].emit_compare(f, line_prefix,
+                                          variable_name_a + '_' + member['name'],
+                                          variable_name_b + '_' + member['name'],
+                                          changed)
+
+
+    """
+    Flag all members as being stored in an arena, so that only those members
+    not in the arena need to be disposed.
+    """
+    def flag_arena(self, arena):
+        used = False
+        self.needs_dispose = False
+        for member in self.members:
+            if member['object'].flag_arena(arena):
+                used = True
+            if member['object'].needs_dispose:
+                self.needs_dispose = True
+        return used
 
 
     """
@@ -18,8 +18,8 @@
 # Copyright (C) 2012-2015 Aleksander Morgado <aleksander@aleksander.es>
 #
 
-import string
 import utils
+import Codec
 from Variable import Variable
 
 """
@@ -39,6 +39,9 @@ class VariableString(Variable):
         self.public_format = self.private_format
         self.element_type = 'utf8'
 
+        # Strings may be stored in an arena owned by the container
+        self.arena = None
+
         if 'fixed-size' in dictionary:
             self.is_fixed_size = True
             # Fixed-size strings
@@ -73,6 +76,25 @@ class VariableString(Variable):
             self.max_size = dictionary['max-size'] if 'max-size' in dictionary else ''
 
 
+    """
+    Fixed-size strings take exactly their size, and strings with a length
+    prefix take at least the prefix.
+    """
+    def min_wire_size(self):
+        if self.is_fixed_size:
+            return int(self.fixed_size)
+        return self.n_size_prefix_bytes
+
+
+    """
+    Strings with a length prefix take the prefix plus the string length.
+    """
+    def wire_size_terms(self, variable_name):
+        if self.is_fixed_size:
+            return (int(self.fixed_size), [])
+        return (self.n_size_prefix_bytes, [ '(%s ? strlen (%s) : 0)' % (variable_name, variable_name) ])
+
+
     """
     Read a string from the raw byte buffer.
     """
@@ -82,6 +104,10 @@ class VariableString(Variable):
                          'variable_name' : variable_name,
                          'error'         : error }
 
+        if self.arena is not None:
+            self.__emit_buffer_read_arena(f, translations)
+            return
+
         if self.is_fixed_size:
             translations['fixed_size'] = self.fixed_size
 
@@ -108,7 +134,123 @@ class VariableString(Variable):
             template = (
                 '${lp}if (!qmi_message_tlv_read_string (message, init_offset, &offset, ${n_size_prefix_bytes}, ${max_size}, &(${variable_name}), ${error}))\n'
                 '${lp}    goto ${tlv_out};\n')
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
+
+
+    """
+    Read a string from the raw byte buffer into the arena.
+    """
+    def __emit_buffer_read_arena(self, f, translations):
+        translations['arena'] = self.arena
+
+        if self.is_fixed_size:
+            translations['fixed_size'] = self.fixed_size
+            translations['fixed_size_plus_one'] = int(self.fixed_size) + 1
+            template = (
+                '${lp}{\n'
+                '${lp}    gchar tmp[${fixed_size_plus_one}];\n'
+                '\n'
+                '${lp}    if (!qmi_message_tlv_read_fixed_size_string (message, init_offset, &offset, ${fixed_size}, &tmp[0], ${error}))\n'
+                '${lp}        goto ${tlv_out};\n'
+                '${lp}    tmp[${fixed_size}] = \'\\0\';\n'
+                '${lp}    ${variable_name} = g_string_chunk_insert (${arena}, tmp);\n'
+                '${lp}}\n')
+        else:
+            translations['n_size_prefix_bytes'] = self.n_size_prefix_bytes
+            translations['max_size'] = self.max_size if self.max_size != '' else '0'
+            template = (
+                '${lp}{\n'
+                '${lp}    const gchar *view;\n'
+                '${lp}    gsize view_length;\n'
+                '${lp}    g_autofree gchar *converted = NULL;\n'
+                '\n'
+                '${lp}    if (!qmi_message_tlv_read_string_view (message, init_offset, &offset, ${n_size_prefix_bytes}, ${max_size},\n'
+                '${lp}                                           &view, &view_length, &converted, ${error}))\n'
+                '${lp}        goto ${tlv_out};\n'
+                '${lp}    ${variable_name} = g_string_chunk_insert_len (${arena}, view, (gssize) view_length);\n'
+                '${lp}}\n')
+        f.write(utils.substitute_template(template, translations))
+
+
+    """
+    Variable-length strings may be read without copying them.
+    """
+    def supports_zero_copy(self):
+        return not self.is_fixed_size
+
+
+    """
+    All strings are supported by the codec.
+    """
+    def supports_codec(self):
+        return True
+
+
+    """
+    Strings are described by their fixed size or by their size prefix.
+    Fixed-size strings not in the public header are stored inline.
+    """
+    def build_codec_members(self, tables, type_name, variable_name):
+        members = [ ('kind', 'QMI_CODEC_KIND_STRING') ]
+        if self.is_fixed_size:
+            members.append(('size', self.fixed_size))
+            if not self.public:
+                members.append(('flags', 'QMI_CODEC_FLAG_INLINE'))
+        else:
+            if self.n_size_prefix_bytes:
+                members.append(('n_size_prefix_bytes', self.n_size_prefix_bytes))
+            if self.max_size != '':
+                members.append(('max_size', self.max_size))
+        members.append(('offset', Codec.build_offset(type_name, variable_name)))
+        return members
+
+
+    """
+    Declaration of the view of the string in the message data
+    """
+    def build_view_declaration(self, line_prefix, variable_name):
+        translations = { 'lp'   : line_prefix,
+                         'name' : variable_name }
+
+        template = (
+            '${lp}const gchar *${name}_view;\n'
+            '${lp}gsize ${name}_view_length;\n')
+        return utils.substitute_template(template, translations)
+
+
+    """
+    Builds the NUL-terminated copy of the view of the string. Several threads
+    may read the same container, so the copy is made and published only once.
+    """
+    def build_view_copy(self, line_prefix, variable_name):
+        translations = { 'lp'   : line_prefix,
+                         'name' : variable_name }
+
+        template = (
+            '${lp}if (g_once_init_enter (&${name}))\n'
+            '${lp}    g_once_init_leave (&${name}, g_strndup (${name}_view, ${name}_view_length));\n')
+        return utils.substitute_template(template, translations)
+
+
+    """
+    Read a string from the raw byte buffer without copying it, so that it
+    points to the message data. Strings which need a conversion to UTF-8 are
+    still copied.
+    """
+    def emit_buffer_read_view(self, f, line_prefix, tlv_out, error, variable_name):
+        translations = { 'lp'                  : line_prefix,
+                         'tlv_out'             : tlv_out,
+                         'variable_name'       : variable_name,
+                         'error'               : error,
+                         'n_size_prefix_bytes' : self.n_size_prefix_bytes,
+                         'max_size'            : self.max_size if self.max_size != '' else '0' }
+
+        template = (
+            '${lp}if (!qmi_message_tlv_read_string_view (message, init_offset, &offset, ${n_size_prefix_bytes}, ${max_size},\n'
+            '${lp}                                       &(${variable_name}_view), &(${variable_name}_view_length), &(${variable_name}),\n'
+            '${lp}                                       ${error}))\n'
+            '${lp}    goto ${tlv_out};\n')
+        f.write(utils.substitute_template(template, translations))
 
 
     """
@@ -127,7 +269,7 @@ class VariableString(Variable):
             '${lp}    return NULL;\n'
             '${lp}}\n')
 
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
 
 
     """
@@ -162,7 +304,105 @@ class VariableString(Variable):
                 '${lp}    g_string_append (printable, tmp);\n'
                 '${lp}}\n')
 
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
+
+
+    """
+    Only strings with a known maximum size can be stored inline, in a buffer
+    with room for the NUL terminator.
+    """
+    def supports_inline(self):
+        return self.is_fixed_size or self.max_size != ''
+
+
+    """
+    Number of items (or characters) that fit in the inline storage
+    """
+    def __inline_capacity(self):
+        return int(self.fixed_size) if self.is_fixed_size else int(self.max_size)
+
+
+    """
+    Inline storage declaration
+    """
+    def build_inline_declaration(self, line_prefix, variable_name):
+        translations = { 'lp'                : line_prefix,
+                         'name'              : variable_name,
+                         'capacity_plus_one' : self.__inline_capacity() + 1 }
+
+        template = (
+            '${lp}gchar ${name}[${capacity_plus_one}];\n')
+        return utils.substitute_template(template, translations)
+
+
+    """
+    Documentation for the inline storage
+    """
+    def build_inline_documentation(self, line_prefix, variable_name):
+        translations = { 'lp'       : line_prefix,
+                         'name'     : variable_name,
+                         'capacity' : self.__inline_capacity() }
+
+        if self.is_fixed_size:
+            template = (
+                '${lp}@${name}: a NUL-terminated string of exactly ${capacity} characters.\n')
+        else:
+            template = (
+                '${lp}@${name}: a NUL-terminated string of at most ${capacity} bytes.\n')
+        return utils.substitute_template(template, translations)
+
+
+    """
+    Read the variable into its inline storage
+    """
+    def emit_buffer_read_inline(self, f, line_prefix, tlv_out, error, variable_name):
+        translations = { 'lp'                  : line_prefix,
+                         'tlv_out'             : tlv_out,
+                         'variable_name'       : variable_name,
+                         'error'               : error,
+                         'capacity'            : self.__inline_capacity(),
+                         'n_size_prefix_bytes' : self.n_size_prefix_bytes }
+
+        if self.is_fixed_size:
+            template = (
+                '${lp}if (!qmi_message_tlv_read_fixed_size_string (message, init_offset, &offset, ${capacity}, &${variable_name}[0], ${error}))\n'
+                '${lp}    goto ${tlv_out};\n'
+                '${lp}${variable_name}[${capacity}] = \'\\0\';\n')
+        else:
+            # Strings not in UTF-8 may grow when converted, so they may still
+            # not fit even if their raw size is within limits
+            template = (
+                '${lp}{\n'
+                '${lp}    const gchar *view;\n'
+                '${lp}    gsize view_length;\n'
+                '${lp}    g_autofree gchar *converted = NULL;\n'
+                '\n'
+                '${lp}    if (!qmi_message_tlv_read_string_view (message, init_offset, &offset, ${n_size_prefix_bytes}, ${capacity}, &view, &view_length, &converted, ${error}))\n'
+                '${lp}        goto ${tlv_out};\n'
+                '${lp}    if (view_length > ${capacity}) {\n'
+                '${lp}        g_set_error (error, QMI_CORE_ERROR, QMI_CORE_ERROR_TLV_TOO_LONG,\n'
+                '${lp}                     "String of %" G_GSIZE_FORMAT " bytes exceeds the storage capacity (${capacity})", view_length);\n'
+                '${lp}        return FALSE;\n'
+                '${lp}    }\n'
+                '${lp}    memcpy (${variable_name}, view, view_length);\n'
+                '${lp}    ${variable_name}[view_length] = \'\\0\';\n'
+                '${lp}}\n')
+        f.write(utils.substitute_template(template, translations))
+
+
+    """
+    Strings are compared by contents, either if they're fixed-size or not.
+    """
+    def emit_compare(self, f, line_prefix, variable_name_a, variable_name_b, changed):
+        translations = { 'lp'      : line_prefix,
+                         'a'       : variable_name_a,
+                         'b'       : variable_name_b,
+                         'changed' : changed }
+
+        template = (
+            '${lp}if (g_strcmp0 (${a}, ${b}) != 0)\n'
+            '${lp}    ${changed} = TRUE;\n')
+        f.write(utils.substitute_template(template, translations))
 
 
     """
@@ -185,7 +425,7 @@ class VariableString(Variable):
         else:
             template = (
                 '${lp}gchar *${name};\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
@@ -200,7 +440,7 @@ class VariableString(Variable):
 
         template = (
             '${lp}const gchar **${name},\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
@@ -215,7 +455,7 @@ class VariableString(Variable):
 
         template = (
             '${lp}@${name}: (out): a placeholder for the output constant string, or %NULL if not required.\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
@@ -233,11 +473,11 @@ class VariableString(Variable):
             template = (
                 '${lp}if (${to})\n'
                 '${lp}    *${to} = ${from};\n')
-            return string.Template(template).substitute(translations)
+            return utils.substitute_template(template, translations)
         else:
             template = (
                 '${lp}${to} = ${from};\n')
-            return string.Template(template).substitute(translations)
+            return utils.substitute_template(template, translations)
 
 
     """
@@ -252,7 +492,7 @@ class VariableString(Variable):
 
         template = (
             '${lp}const gchar *${name},\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
@@ -276,7 +516,7 @@ class VariableString(Variable):
         else:
             template = (
                 '${lp}@${name}: a constant string.\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
@@ -318,7 +558,7 @@ class VariableString(Variable):
                 '${lp}g_free (${to});\n'
                 '${lp}${to} = g_strdup (${from} ? ${from} : "");\n')
 
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
@@ -339,7 +579,7 @@ class VariableString(Variable):
         else:
             template = (
                 '${lp}@${name}: a string.\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
@@ -350,12 +590,16 @@ class VariableString(Variable):
         if self.is_fixed_size and not self.public:
             return ''
 
+        # Strings in an arena are disposed along with the arena
+        if self.arena is not None:
+            return ''
+
         translations = { 'lp'            : line_prefix,
                          'variable_name' : variable_name }
 
         template = (
             '${lp}g_free (${variable_name});\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
@@ -367,3 +611,14 @@ class VariableString(Variable):
         # Fixed-sized strings will need dispose if they are in the public header
         if self.is_fixed_size:
             self.needs_dispose = True
+
+    """
+    Flag as being stored in an arena
+    """
+    def flag_arena(self, arena):
+        # Fixed-sized strings not in the public header are stored inline
+        if self.is_fixed_size and not self.public:
+            return False
+        self.arena = arena
+        self.needs_dispose = False
+        return True
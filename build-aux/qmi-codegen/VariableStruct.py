@@ -18,8 +18,8 @@
 # Copyright (C) 2012-2017 Aleksander Morgado <aleksander@aleksander.es>
 #
 
-import string
 import utils
+import Codec
 from Variable import Variable
 import VariableFactory
 
@@ -70,14 +70,14 @@ class VariableStruct(Variable):
         translations = { 'format' : self.public_format,
                          'since'  : since }
         template = '\n'
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
 
         if static == False:
             template = (
                 '\n'
                 '/**\n'
                 ' * ${format}:\n')
-            f.write(string.Template(template).substitute(translations))
+            f.write(utils.substitute_template(template, translations))
             for member in self.members:
                 f.write(member['object'].build_struct_field_documentation(' * ', member['name']))
             template = (
@@ -86,17 +86,17 @@ class VariableStruct(Variable):
                 ' *\n'
                 ' * Since: ${since}\n'
                 ' */\n')
-            f.write(string.Template(template).substitute(translations))
+            f.write(utils.substitute_template(template, translations))
 
         template = (
             'typedef struct _${format} {\n')
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
 
         for member in self.members:
             f.write(member['object'].build_variable_declaration(True, '    ', member['name']))
 
         template = ('} ${format};\n')
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
 
 
     """
@@ -108,13 +108,115 @@ class VariableStruct(Variable):
             member['object'].emit_helper_methods(hfile, cfile)
 
 
+    """
+    Structs have a fixed size in the raw byte stream only if all their members
+    have it.
+    """
+    def fixed_wire_size(self):
+        size = 0
+        for member in self.members:
+            member_size = member['object'].fixed_wire_size()
+            if member_size is None:
+                return None
+            size += member_size
+        return size
+
+
+    """
+    Structs take at least the sum of the minimum sizes of their members.
+    """
+    def min_wire_size(self):
+        size = 0
+        for member in self.members:
+            size += member['object'].min_wire_size()
+        return size
+
+
+    """
+    Structs take the sum of the sizes of their members.
+    """
+    def wire_size_terms(self, variable_name):
+        size = 0
+        expressions = []
+        for member in self.members:
+            member_terms = member['object'].wire_size_terms(variable_name + '.' + member['name'])
+            if member_terms is None:
+                return None
+            size += member_terms[0]
+            expressions += member_terms[1]
+        return (size, expressions)
+
+
+    """
+    Structs are supported by the codec if all their members are.
+    """
+    def supports_codec(self):
+        for member in self.members:
+            if not member['object'].supports_codec():
+                return False
+        return True
+
+
+    """
+    Structs are described by the table of descriptors of their members, each
+    at its own offset within the struct.
+    """
+    def build_codec_members(self, tables, type_name, variable_name):
+        descriptors = []
+        for member in self.members:
+            member_members = [ ('name', '"%s"' % member['name']) ]
+            member_members += member['object'].build_codec_members(tables, self.public_format, member['name'])
+            descriptors.append(member_members)
+
+        return [ ('kind',       'QMI_CODEC_KIND_STRUCT'),
+                 ('offset',     Codec.build_offset(type_name, variable_name)),
+                 ('n_children', len(descriptors)),
+                 ('children',   tables.add(descriptors)) ]
+
+
+    """
+    Decoding a struct from raw data is just about decoding each of the struct
+    fields one by one, each at its own offset.
+    """
+    def emit_buffer_read_raw(self, f, line_prefix, ptr, variable_name):
+        offset = 0
+        for member in self.members:
+            member_ptr = ptr if offset == 0 else '%s + %u' % (ptr, offset)
+            member['object'].emit_buffer_read_raw(f, line_prefix, member_ptr, variable_name + '.' +  member['name'])
+            offset += member['object'].fixed_wire_size()
+
+
     """
     Reading the contents of a struct is just about reading each of the struct
-    fields one by one.
+    fields one by one. If the struct has a fixed size, the whole struct is
+    checked for overflow at once and then decoded from the raw data.
     """
     def emit_buffer_read(self, f, line_prefix, tlv_out, error, variable_name):
-        for member in self.members:
-            member['object'].emit_buffer_read(f, line_prefix, tlv_out, error, variable_name + '.' +  member['name'])
+        size = self.fixed_wire_size()
+        if size is None:
+            for member in self.members:
+                member['object'].emit_buffer_read(f, line_prefix, tlv_out, error, variable_name + '.' +  member['name'])
+            return
+
+        translations = { 'lp'      : line_prefix,
+                         'tlv_out' : tlv_out,
+                         'error'   : error,
+                         'size'    : size }
+
+        template = (
+            '${lp}{\n'
+            '${lp}    const guint8 *ptr;\n'
+            '\n'
+            '${lp}    if (!(ptr = qmi_message_tlv_read_block (message, init_offset, &offset, 1, ${size}, ${error})))\n'
+            '${lp}        goto ${tlv_out};\n'
+            '\n')
+        f.write(utils.substitute_template(template, translations))
+
+        self.emit_buffer_read_raw(f, line_prefix + '    ', 'ptr', variable_name)
+
+        template = (
+            '${lp}}\n')
+        f.write(utils.substitute_template(template, translations))
 
 
     """
@@ -135,23 +237,69 @@ class VariableStruct(Variable):
 
         template = (
             '${lp}g_string_append (printable, "[");\n')
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
 
         for member in self.members:
             translations['variable_name'] = member['name']
             template = (
                 '${lp}g_string_append (printable, " ${variable_name} = \'");\n')
-            f.write(string.Template(template).substitute(translations))
+            f.write(utils.substitute_template(template, translations))
 
             member['object'].emit_get_printable(f, line_prefix)
 
             template = (
                 '${lp}g_string_append (printable, "\'");\n')
-            f.write(string.Template(template).substitute(translations))
+            f.write(utils.substitute_template(template, translations))
 
         template = (
             '${lp}g_string_append (printable, " ]");\n')
-        f.write(string.Template(template).substitute(translations))
+        f.write(utils.substitute_template(template, translations))
+
+
+    """
+    Structs are stored inline as they are, as long as none of their members
+    needs to be allocated in heap.
+    """
+    def supports_inline(self):
+        if self.needs_dispose:
+            return False
+        for member in self.members:
+            if not member['object'].supports_inline():
+                return False
+        return True
+
+
+    """
+    Inline storage declaration
+    """
+    def build_inline_declaration(self, line_prefix, variable_name):
+        return self.build_variable_declaration(True, line_prefix, variable_name)
+
+
+    """
+    Documentation for the inline storage
+    """
+    def build_inline_documentation(self, line_prefix, variable_name):
+        return self.build_struct_field_documentation(line_prefix, variable_name)
+
+
+    """
+    Read the variable into its inline storage
+    """
+    def emit_buffer_read_inline(self, f, line_prefix, tlv_out, error, variable_name):
+        self.emit_buffer_read(f, line_prefix, tlv_out, error, variable_name)
+
+
+    """
+    Comparing two structs is just about comparing each of the struct fields one
+    by one.
+    """
+    def emit_compare(self, f, line_prefix, variable_name_a, variable_name_b, changed):
+        for member in self.members:
+            member['object'].emit_compare(f, line_prefix,
+                                          variable_name_a + '.' + member['name'],
+                                          variable_name_b + '.' + member['name'],
+                                          changed)
 
 
     """
@@ -164,7 +312,7 @@ class VariableStruct(Variable):
 
         template = (
             '${lp}${format} ${name};\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
@@ -181,7 +329,7 @@ class VariableStruct(Variable):
 
         template = (
             '${lp}${format} *${name},\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
@@ -197,7 +345,7 @@ class VariableStruct(Variable):
 
         template = (
             '${lp}@${name}: (out): a placeholder for the output constant #${format}, or %NULL if not required.\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
@@ -215,11 +363,11 @@ class VariableStruct(Variable):
             template = (
                 '${lp}if (${to})\n'
                 '${lp}    *${to} = ${from};\n')
-            return string.Template(template).substitute(translations)
+            return utils.substitute_template(template, translations)
         else:
             template = (
                 '${lp}${to} = ${from};\n')
-            return string.Template(template).substitute(translations)
+            return utils.substitute_template(template, translations)
 
 
     """
@@ -236,7 +384,7 @@ class VariableStruct(Variable):
 
         template = (
             '${lp}const ${format} *${name},\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
@@ -252,7 +400,7 @@ class VariableStruct(Variable):
 
         template = (
             '${lp}@${name}: the address of the #${format} to set.\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
     """
     Builds the Struct setter implementation
@@ -279,7 +427,7 @@ class VariableStruct(Variable):
 
         template = (
             '${lp}@${name}: a #${format} struct.\n')
-        return string.Template(template).substitute(translations)
+        return utils.substitute_template(template, translations)
 
 
     """
@@ -293,6 +441,21 @@ class VariableStruct(Variable):
         return built
 
 
+    """
+    Flag all members as being stored in an arena, so that only those members
+    not in the arena need to be disposed.
+    """
+    def flag_arena(self, arena):
+        used = False
+        self.needs_dispose = False
+        for member in self.members:
+            if member['object'].flag_arena(arena):
+                used = True
+            if member['object'].needs_dispose:
+                self.needs_dispose = True
+        return used
+
+
     """
     Add sections
     """
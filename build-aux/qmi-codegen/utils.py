@@ -18,8 +18,13 @@
 # Copyright (C) 2012-2017 Aleksander Morgado <aleksander@aleksander.es>
 #
 
+import os
+import sys
 import string
 import re
+import json
+import pickle
+import hashlib
 
 """
 Add the common copyright header to the given file
@@ -57,6 +62,56 @@ Build a header guard string based on the given filename
 def build_header_guard(output_name):
     return "__LIBQMI_GLIB_" + output_name.replace('-', '_').upper() + "__"
 
+"""
+Registry of compiled templates, keyed by the template string.
+
+Each template is parsed only once into a list of literal chunks and placeholder
+names, so that substituting it afterwards is just about joining the chunks.
+"""
+compiled_templates = {}
+
+"""
+Parse the template string into a list of (literal, placeholder name) tuples,
+following the same syntax as string.Template
+"""
+def compile_template(template):
+    compiled = []
+    pattern = string.Template.pattern
+    last = 0
+    literal = ''
+    for match in pattern.finditer(template):
+        literal += template[last:match.start()]
+        last = match.end()
+        if match.group('escaped') is not None:
+            literal += string.Template.delimiter
+            continue
+        name = match.group('named') or match.group('braced')
+        if name is None:
+            # Let string.Template report the invalid placeholder
+            string.Template(template).substitute({})
+        compiled.append((literal, name))
+        literal = ''
+    compiled.append((literal + template[last:], None))
+    compiled_templates[template] = compiled
+    return compiled
+
+"""
+Substitute the placeholders in the template string with the given translations,
+as string.Template.substitute() does, compiling the template only the first
+time it is used.
+"""
+def substitute_template(template, translations):
+    compiled = compiled_templates.get(template)
+    if compiled is None:
+        compiled = compile_template(template)
+    out = []
+    for (literal, name) in compiled:
+        out.append(literal)
+        if name is not None:
+            out.append('%s' % (translations[name],))
+    return ''.join(out)
+
+
 """
 Write the common header start chunk
 """
@@ -148,6 +203,18 @@ def build_underscore_name(name):
     return name.replace(' ', '_').lower()
 
 
+"""
+Build the name of a struct member from the given full name, which must be a
+valid C identifier even if the name starts with a digit
+e.g.: "5G Signal Strength" --> "value_5g_signal_strength"
+"""
+def build_member_name(name):
+    underscore = build_underscore_name(name)
+    if underscore[0].isdigit():
+        return 'value_' + underscore
+    return underscore
+
+
 """
 Build an underscore uppercase name from the given full name
 e.g.: "This is a message" --> "THIS_IS_A_MESSAGE"
@@ -194,18 +261,111 @@ Read the contents of the JSON file, skipping lines prefixed with '//', which are
 considered comments.
 """
 def read_json_file(path):
-    f = open(path)
-    out = ''
-    for line in f.readlines():
-        stripped = line.strip()
-        if stripped.startswith('//'):
-            # Skip this line
-            # We add an empty line instead so that errors when parsing the JSON
-            # report the proper line number
-            out += "\n"
-        else:
-            out += line
-    return out
+    out = []
+    with open(path) as f:
+        for line in f:
+            if line.lstrip().startswith('//'):
+                # Skip this line
+                # We add an empty line instead so that errors when parsing the JSON
+                # report the proper line number
+                out.append("\n")
+            else:
+                out.append(line)
+    return ''.join(out)
+
+
+"""
+Load and parse the given JSON file, skipping comments as read_json_file() does.
+
+If a cache directory is given, the parsed contents are stored there, keyed by
+the hash of the file contents and the full interpreter version, and loaded from
+there in subsequent calls for the same contents, so that the JSON parsing is
+skipped. Cache files that cannot be loaded are ignored and rewritten.
+"""
+def load_json_file(path, cache_dir = None):
+    if cache_dir is None:
+        return json.loads(read_json_file(path))
+
+    with open(path, 'rb') as f:
+        contents_hash = hashlib.sha256(f.read()).hexdigest()
+    # The highest pickle protocol depends on the interpreter, so the cache
+    # must never be shared among different interpreter versions
+    cache_path = os.path.join(cache_dir, '%s-py%d.%d.%d.pickle' % ((contents_hash, ) + tuple(sys.version_info[:3])))
+
+    try:
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except (IOError, EOFError, ValueError, pickle.UnpicklingError):
+        # Missing, truncated or written with an unsupported protocol
+        pass
+
+    parsed = json.loads(read_json_file(path))
+
+    # Write the cache file atomically, as it may be shared among several
+    # generator processes running in parallel
+    if not os.path.isdir(cache_dir):
+        try:
+            os.makedirs(cache_dir)
+        except OSError:
+            if not os.path.isdir(cache_dir):
+                raise
+    tmp_path = '%s.%d.tmp' % (cache_path, os.getpid())
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(parsed, f, pickle.HIGHEST_PROTOCOL)
+    os.rename(tmp_path, cache_path)
+
+    return parsed
+
+
+"""
+Output file which keeps all the contents written in memory, and only replaces
+the file on disk when closed, if the new contents are different. The file is
+replaced atomically, so that readers never see a partially written file, and
+its modification time is left untouched if nothing changed.
+"""
+class OutputFile:
+
+    def __init__(self, path):
+        self.path = path
+        self.chunks = []
+        self.size = 0
+
+    def write(self, data):
+        self.chunks.append(data)
+        self.size += len(data)
+
+    def close(self):
+        contents = ''.join(self.chunks)
+        self.chunks = []
+
+        try:
+            with open(self.path) as f:
+                if f.read() == contents:
+                    return False
+        except IOError:
+            pass
+
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(contents)
+        os.rename(tmp_path, self.path)
+        return True
+
+
+"""
+Build a hash of the contents of all the given files. The file paths are also
+hashed, so that passing the same contents in a different order or under a
+different name results in a different hash.
+"""
+def build_files_hash(paths):
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(path.encode('utf-8'))
+        h.update(b'\0')
+        with open(path, 'rb') as f:
+            h.update(f.read())
+        h.update(b'\0')
+    return h.hexdigest()
 
 
 """
@@ -0,0 +1,696 @@
+/* -*- Mode: C; tab-width: 4; indent-tabs-mode: nil; c-basic-offset: 4 -*- */
+
+/*
+ * libqmi-glib -- GLib/GIO based library to control QMI devices
+ *
+ * This library is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU Lesser General Public
+ * License as published by the Free Software Foundation; either
+ * version 2 of the License, or (at your option) any later version.
+ *
+ * This library is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ * Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public
+ * License along with this library; if not, write to the
+ * Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
+ * Boston, MA 02110-1301 USA.
+ *
+ * Copyright (C) 2012-2017 Aleksander Morgado <aleksander@aleksander.es>
+ */
+
+#include "qmi-codec.h"
+#include "qmi-errors.h"
+#include "qmi-error-types.h"
+
+/*****************************************************************************/
+
+static const guint8 format_sizes[] = {
+    [QMI_CODEC_FORMAT_GUINT8]  = 1,
+    [QMI_CODEC_FORMAT_GUINT16] = 2,
+    [QMI_CODEC_FORMAT_GUINT32] = 4,
+    [QMI_CODEC_FORMAT_GUINT64] = 8,
+    [QMI_CODEC_FORMAT_GINT8]   = 1,
+    [QMI_CODEC_FORMAT_GINT16]  = 2,
+    [QMI_CODEC_FORMAT_GINT32]  = 4,
+    [QMI_CODEC_FORMAT_GINT64]  = 8,
+    [QMI_CODEC_FORMAT_GFLOAT]  = 4,
+    [QMI_CODEC_FORMAT_GDOUBLE] = 8,
+};
+
+static gboolean
+format_is_signed (guint8 format)
+{
+    return (format == QMI_CODEC_FORMAT_GINT8  ||
+            format == QMI_CODEC_FORMAT_GINT16 ||
+            format == QMI_CODEC_FORMAT_GINT32 ||
+            format == QMI_CODEC_FORMAT_GINT64);
+}
+
+static gboolean
+format_is_float (guint8 format)
+{
+    return (format == QMI_CODEC_FORMAT_GFLOAT ||
+            format == QMI_CODEC_FORMAT_GDOUBLE);
+}
+
+/* Integer arrays are read and written all at once */
+static gboolean
+field_is_integer_array (const QmiCodecField *field)
+{
+    const QmiCodecField *element;
+
+    element = &field->children[0];
+    return (element->kind == QMI_CODEC_KIND_INTEGER &&
+            element->print == QMI_CODEC_PRINT_NUMBER &&
+            !format_is_float (element->format) &&
+            element->value_size == format_sizes[element->format]);
+}
+
+static QmiEndian
+field_get_endian (const QmiCodecField *field)
+{
+    /* Single bytes are always read as little endian */
+    if (format_sizes[field->format] == 1)
+        return QMI_ENDIAN_LITTLE;
+    return (QmiEndian) field->endian;
+}
+
+/*****************************************************************************/
+/* Values in memory */
+
+static void
+store_integer (gpointer ptr,
+               guint    value_size,
+               guint64  value)
+{
+    switch (value_size) {
+    case 1:
+        *((guint8 *) ptr) = (guint8) value;
+        break;
+    case 2:
+        *((guint16 *) ptr) = (guint16) value;
+        break;
+    case 4:
+        *((guint32 *) ptr) = (guint32) value;
+        break;
+    case 8:
+        *((guint64 *) ptr) = value;
+        break;
+    default:
+        g_assert_not_reached ();
+    }
+}
+
+static guint64
+load_integer (gconstpointer ptr,
+              guint         value_size,
+              gboolean      is_signed)
+{
+    switch (value_size) {
+    case 1:
+        return is_signed ? (guint64) *((const gint8 *) ptr) : (guint64) *((const guint8 *) ptr);
+    case 2:
+        return is_signed ? (guint64) *((const gint16 *) ptr) : (guint64) *((const guint16 *) ptr);
+    case 4:
+        return is_signed ? (guint64) *((const gint32 *) ptr) : (guint64) *((const guint32 *) ptr);
+    case 8:
+        return *((const guint64 *) ptr);
+    default:
+        g_assert_not_reached ();
+    }
+    return 0;
+}
+
+/*****************************************************************************/
+/* Integers in the raw byte stream */
+
+/* Reads unsigned little endian integers, as used in size prefixes and
+ * sequences */
+static gboolean
+read_unsigned (QmiMessage  *message,
+               gsize        init_offset,
+               gsize       *offset,
+               guint        n_bytes,
+               guint64     *out,
+               GError     **error)
+{
+    return qmi_message_tlv_read_sized_guint (message, init_offset, offset, n_bytes, QMI_ENDIAN_LITTLE, out, error);
+}
+
+static gboolean
+write_unsigned (QmiMessage  *self,
+                guint        n_bytes,
+                guint64      in,
+                GError     **error)
+{
+    switch (n_bytes) {
+    case 1:
+        return qmi_message_tlv_write_guint8 (self, (guint8) in, error);
+    case 2:
+        return qmi_message_tlv_write_guint16 (self, QMI_ENDIAN_LITTLE, (guint16) in, error);
+    case 4:
+        return qmi_message_tlv_write_guint32 (self, QMI_ENDIAN_LITTLE, (guint32) in, error);
+    default:
+        g_assert_not_reached ();
+    }
+    return FALSE;
+}
+
+/* Reads a non floating point integer, sign extended to 64 bits if signed */
+static gboolean
+read_integer (QmiMessage           *message,
+              gsize                 init_offset,
+              gsize                *offset,
+              const QmiCodecField  *field,
+              guint64              *out,
+              GError              **error)
+{
+    QmiEndian endian;
+
+    endian = field_get_endian (field);
+
+    if (field->kind == QMI_CODEC_KIND_SIZED_INTEGER)
+        return qmi_message_tlv_read_sized_guint (message, init_offset, offset, field->size, endian, out, error);
+
+    switch (field->format) {
+    case QMI_CODEC_FORMAT_GUINT8: {
+        guint8 tmp;
+
+        if (!qmi_message_tlv_read_guint8 (message, init_offset, offset, &tmp, error))
+            return FALSE;
+        *out = tmp;
+        return TRUE;
+    }
+    case QMI_CODEC_FORMAT_GUINT16: {
+        guint16 tmp;
+
+        if (!qmi_message_tlv_read_guint16 (message, init_offset, offset, endian, &tmp, error))
+            return FALSE;
+        *out = tmp;
+        return TRUE;
+    }
+    case QMI_CODEC_FORMAT_GUINT32: {
+        guint32 tmp;
+
+        if (!qmi_message_tlv_read_guint32 (message, init_offset, offset, endian, &tmp, error))
+            return FALSE;
+        *out = tmp;
+        return TRUE;
+    }
+    case QMI_CODEC_FORMAT_GUINT64:
+        return qmi_message_tlv_read_guint64 (message, init_offset, offset, endian, out, error);
+    case QMI_CODEC_FORMAT_GINT8: {
+        gint8 tmp;
+
+        if (!qmi_message_tlv_read_gint8 (message, init_offset, offset, &tmp, error))
+            return FALSE;
+        *out = (guint64) tmp;
+        return TRUE;
+    }
+    case QMI_CODEC_FORMAT_GINT16: {
+        gint16 tmp;
+
+        if (!qmi_message_tlv_read_gint16 (message, init_offset, offset, endian, &tmp, error))
+            return FALSE;
+        *out = (guint64) tmp;
+        return TRUE;
+    }
+    case QMI_CODEC_FORMAT_GINT32: {
+        gint32 tmp;
+
+        if (!qmi_message_tlv_read_gint32 (message, init_offset, offset, endian, &tmp, error))
+            return FALSE;
+        *out = (guint64) tmp;
+        return TRUE;
+    }
+    case QMI_CODEC_FORMAT_GINT64: {
+        gint64 tmp;
+
+        if (!qmi_message_tlv_read_gint64 (message, init_offset, offset, endian, &tmp, error))
+            return FALSE;
+        *out = (guint64) tmp;
+        return TRUE;
+    }
+    default:
+        g_assert_not_reached ();
+    }
+    return FALSE;
+}
+
+static gboolean
+write_integer (QmiMessage           *self,
+               const QmiCodecField  *field,
+               guint64               in,
+               GError              **error)
+{
+    QmiEndian endian;
+
+    endian = field_get_endian (field);
+
+    if (field->kind == QMI_CODEC_KIND_SIZED_INTEGER)
+        return qmi_message_tlv_write_sized_guint (self, field->size, endian, in, error);
+
+    switch (field->format) {
+    case QMI_CODEC_FORMAT_GUINT8:
+        return qmi_message_tlv_write_guint8 (self, (guint8) in, error);
+    case QMI_CODEC_FORMAT_GUINT16:
+        return qmi_message_tlv_write_guint16 (self, endian, (guint16) in, error);
+    case QMI_CODEC_FORMAT_GUINT32:
+        return qmi_message_tlv_write_guint32 (self, endian, (guint32) in, error);
+    case QMI_CODEC_FORMAT_GUINT64:
+        return qmi_message_tlv_write_guint64 (self, endian, in, error);
+    case QMI_CODEC_FORMAT_GINT8:
+        return qmi_message_tlv_write_gint8 (self, (gint8) in, error);
+    case QMI_CODEC_FORMAT_GINT16:
+        return qmi_message_tlv_write_gint16 (self, endian, (gint16) in, error);
+    case QMI_CODEC_FORMAT_GINT32:
+        return qmi_message_tlv_write_gint32 (self, endian, (gint32) in, error);
+    case QMI_CODEC_FORMAT_GINT64:
+        return qmi_message_tlv_write_gint64 (self, endian, (gint64) in, error);
+    case QMI_CODEC_FORMAT_GFLOAT:
+    case QMI_CODEC_FORMAT_GDOUBLE:
+        g_set_error (error,
+                     QMI_CORE_ERROR,
+                     QMI_CORE_ERROR_UNSUPPORTED,
+                     "Writing floating point numbers is unsupported");
+        return FALSE;
+    default:
+        g_assert_not_reached ();
+    }
+    return FALSE;
+}
+
+static gboolean
+read_float (QmiMessage           *message,
+            gsize                 init_offset,
+            gsize                *offset,
+            const QmiCodecField  *field,
+            gdouble              *out,
+            GError              **error)
+{
+    if (field->format == QMI_CODEC_FORMAT_GFLOAT) {
+        gfloat tmp;
+
+        if (!qmi_message_tlv_read_gfloat_endian (message, init_offset, offset, (QmiEndian) field->endian, &tmp, error))
+            return FALSE;
+        *out = (gdouble) tmp;
+        return TRUE;
+    }
+
+    return qmi_message_tlv_read_gdouble (message, init_offset, offset, (QmiEndian) field->endian, out, error);
+}
+
+static void
+print_integer (const QmiCodecField *field,
+               guint64              value,
+               GString             *printable)
+{
+    switch (field->print) {
+    case QMI_CODEC_PRINT_BOOLEAN:
+        g_string_append_printf (printable, "%s", value ? "yes" : "no");
+        return;
+    case QMI_CODEC_PRINT_ENUM:
+        g_string_append_printf (printable, "%s", ((const gchar *(*) (gint)) field->helper) ((gint) value));
+        return;
+    case QMI_CODEC_PRINT_FLAGS: {
+        g_autofree gchar *flags_str = NULL;
+
+        if (field->value_size == 8)
+            flags_str = ((gchar *(*) (guint64)) field->helper) (value);
+        else
+            flags_str = ((gchar *(*) (guint)) field->helper) ((guint) value);
+        g_string_append_printf (printable, "%s", flags_str);
+        return;
+    }
+    case QMI_CODEC_PRINT_NUMBER:
+        break;
+    default:
+        g_assert_not_reached ();
+    }
+
+    switch (field->format) {
+    case QMI_CODEC_FORMAT_GUINT8:
+        g_string_append_printf (printable, "%u", (guint) value);
+        break;
+    case QMI_CODEC_FORMAT_GUINT16:
+        g_string_append_printf (printable, "%" G_GUINT16_FORMAT, (guint16) value);
+        break;
+    case QMI_CODEC_FORMAT_GUINT32:
+        g_string_append_printf (printable, "%" G_GUINT32_FORMAT, (guint32) value);
+        break;
+    case QMI_CODEC_FORMAT_GUINT64:
+        g_string_append_printf (printable, "%" G_GUINT64_FORMAT, value);
+        break;
+    case QMI_CODEC_FORMAT_GINT8:
+        g_string_append_printf (printable, "%d", (gint) (gint64) value);
+        break;
+    case QMI_CODEC_FORMAT_GINT16:
+        g_string_append_printf (printable, "%" G_GINT16_FORMAT, (gint16) (gint64) value);
+        break;
+    case QMI_CODEC_FORMAT_GINT32:
+        g_string_append_printf (printable, "%" G_GINT32_FORMAT, (gint32) (gint64) value);
+        break;
+    case QMI_CODEC_FORMAT_GINT64:
+        g_string_append_printf (printable, "%" G_GINT64_FORMAT, (gint64) value);
+        break;
+    default:
+        g_assert_not_reached ();
+    }
+}
+
+/*****************************************************************************/
+/* Reader */
+
+static gboolean
+read_fixed_size_string (QmiMessage           *message,
+                        gsize                 init_offset,
+                        gsize                *offset,
+                        const QmiCodecField  *field,
+                        gpointer              ptr,
+                        GError              **error)
+{
+    gchar *str;
+
+    /* Fixed sized strings exposed in public fields are allocated in heap */
+    if (field->flags & QMI_CODEC_FLAG_INLINE)
+        str = (gchar *) ptr;
+    else
+        str = g_malloc (field->size + 1);
+
+    if (!qmi_message_tlv_read_fixed_size_string (message, init_offset, offset, field->size, str, error)) {
+        if (!(field->flags & QMI_CODEC_FLAG_INLINE))
+            g_free (str);
+        return FALSE;
+    }
+    str[field->size] = '\0';
+
+    if (!(field->flags & QMI_CODEC_FLAG_INLINE))
+        *((gchar **) ptr) = str;
+    return TRUE;
+}
+
+static gboolean
+read_array (QmiMessage           *message,
+            gsize                 init_offset,
+            gsize                *offset,
+            const QmiCodecField  *field,
+            gpointer              base,
+            GError              **error)
+{
+    const QmiCodecField  *element;
+    GArray              **array;
+    guint64               n_items;
+    guint                 i;
+
+    element = &field->children[0];
+    array = (GArray **) ((guint8 *) base + field->offset);
+
+    if (!field->n_size_prefix_bytes)
+        n_items = field->size;
+    else if (!read_unsigned (message, init_offset, offset, field->n_size_prefix_bytes, &n_items, error))
+        return FALSE;
+
+    if (field->flags & QMI_CODEC_FLAG_SEQUENCE) {
+        guint64 sequence;
+
+        if (!read_unsigned (message, init_offset, offset, format_sizes[field->sequence_format], &sequence, error))
+            return FALSE;
+        store_integer ((guint8 *) base + field->sequence_offset, format_sizes[field->sequence_format], sequence);
+    }
+
+    *array = g_array_sized_new (FALSE, TRUE, element->value_size, (guint) n_items);
+
+    if (field_is_integer_array (field)) {
+        g_array_set_size (*array, (guint) n_items);
+        return qmi_message_tlv_read_integer_array (message, init_offset, offset, field_get_endian (element),
+                                                   element->value_size, (guint) n_items, (*array)->data, error);
+    }
+
+    if (field->helper)
+        g_array_set_clear_func (*array, (GDestroyNotify) field->helper);
+
+    /* Elements are added before being read, so that they're cleared along
+     * with the array if they're only partially read */
+    for (i = 0; i < n_items; i++) {
+        g_array_set_size (*array, i + 1);
+        if (!qmi_codec_read (message, init_offset, offset, element, (*array)->data + (i * element->value_size), error))
+            return FALSE;
+    }
+
+    return TRUE;
+}
+
+gboolean
+qmi_codec_read (QmiMessage           *message,
+                gsize                 init_offset,
+                gsize                *offset,
+                const QmiCodecField  *field,
+                gpointer              base,
+                GError              **error)
+{
+    gpointer ptr;
+    guint    i;
+
+    ptr = (guint8 *) base + field->offset;
+
+    switch (field->kind) {
+    case QMI_CODEC_KIND_INTEGER:
+    case QMI_CODEC_KIND_SIZED_INTEGER: {
+        guint64 value;
+
+        if (format_is_float (field->format)) {
+            gdouble tmp;
+
+            if (!read_float (message, init_offset, offset, field, &tmp, error))
+                return FALSE;
+            if (field->format == QMI_CODEC_FORMAT_GFLOAT)
+                *((gfloat *) ptr) = (gfloat) tmp;
+            else
+                *((gdouble *) ptr) = tmp;
+            return TRUE;
+        }
+
+        if (!read_integer (message, init_offset, offset, field, &value, error))
+            return FALSE;
+        store_integer (ptr, field->value_size, value);
+        return TRUE;
+    }
+    case QMI_CODEC_KIND_STRING:
+        if (field->size)
+            return read_fixed_size_string (message, init_offset, offset, field, ptr, error);
+        return qmi_message_tlv_read_string (message, init_offset, offset, field->n_size_prefix_bytes, field->max_size, (gchar **) ptr, error);
+    case QMI_CODEC_KIND_STRUCT:
+        for (i = 0; i < field->n_children; i++) {
+            if (!qmi_codec_read (message, init_offset, offset, &field->children[i], ptr, error))
+                return FALSE;
+        }
+        return TRUE;
+    case QMI_CODEC_KIND_ARRAY:
+        return read_array (message, init_offset, offset, field, base, error);
+    default:
+        g_assert_not_reached ();
+    }
+    return FALSE;
+}
+
+/*****************************************************************************/
+/* Writer */
+
+static gboolean
+write_array (QmiMessage           *self,
+             const QmiCodecField  *field,
+             gconstpointer         base,
+             const gchar          *tlv_name,
+             GError              **error)
+{
+    const QmiCodecField *element;
+    GArray              *array;
+    guint                i;
+
+    element = &field->children[0];
+    array = *((GArray * const *) ((const guint8 *) base + field->offset));
+
+    if (field->n_size_prefix_bytes &&
+        !write_unsigned (self, field->n_size_prefix_bytes, array->len, error)) {
+        g_prefix_error (error, "Cannot write integer in TLV '%s': ", tlv_name);
+        return FALSE;
+    }
+
+    if ((field->flags & QMI_CODEC_FLAG_SEQUENCE) &&
+        !write_unsigned (self,
+                         format_sizes[field->sequence_format],
+                         load_integer ((const guint8 *) base + field->sequence_offset, format_sizes[field->sequence_format], FALSE),
+                         error)) {
+        g_prefix_error (error, "Cannot write integer in TLV '%s': ", tlv_name);
+        return FALSE;
+    }
+
+    if (field_is_integer_array (field)) {
+        if (!qmi_message_tlv_write_integer_array (self, field_get_endian (element), element->value_size, array->len, array->data, error)) {
+            g_prefix_error (error, "Cannot write integer array in TLV '%s': ", tlv_name);
+            return FALSE;
+        }
+        return TRUE;
+    }
+
+    for (i = 0; i < array->len; i++) {
+        if (!qmi_codec_write (self, element, array->data + (i * element->value_size), tlv_name, error))
+            return FALSE;
+    }
+
+    return TRUE;
+}
+
+gboolean
+qmi_codec_write (QmiMessage           *self,
+                 const QmiCodecField  *field,
+                 gconstpointer         base,
+                 const gchar          *tlv_name,
+                 GError              **error)
+{
+    gconstpointer ptr;
+    guint         i;
+
+    ptr = (const guint8 *) base + field->offset;
+
+    switch (field->kind) {
+    case QMI_CODEC_KIND_INTEGER:
+    case QMI_CODEC_KIND_SIZED_INTEGER:
+        if (!write_integer (self, field, load_integer (ptr, field->value_size, format_is_signed (field->format)), error)) {
+            g_prefix_error (error, "Cannot write %s in TLV '%s': ",
+                            (field->kind == QMI_CODEC_KIND_SIZED_INTEGER ? "sized integer" :
+                             (field->print != QMI_CODEC_PRINT_NUMBER ? "enum" : "integer")),
+                            tlv_name);
+            return FALSE;
+        }
+        return TRUE;
+    case QMI_CODEC_KIND_STRING: {
+        const gchar *str;
+
+        if (field->flags & QMI_CODEC_FLAG_INLINE)
+            str = (const gchar *) ptr;
+        else
+            str = *((const gchar * const *) ptr);
+
+        if (!qmi_message_tlv_write_string (self, field->n_size_prefix_bytes, str, field->size ? field->size : -1, error)) {
+            g_prefix_error (error, "Cannot write string in TLV '%s': ", tlv_name);
+            return FALSE;
+        }
+        return TRUE;
+    }
+    case QMI_CODEC_KIND_STRUCT:
+        for (i = 0; i < field->n_children; i++) {
+            if (!qmi_codec_write (self, &field->children[i], ptr, tlv_name, error))
+                return FALSE;
+        }
+        return TRUE;
+    case QMI_CODEC_KIND_ARRAY:
+        return write_array (self, field, base, tlv_name, error);
+    default:
+        g_assert_not_reached ();
+    }
+    return FALSE;
+}
+
+/*****************************************************************************/
+/* Printer */
+
+static gboolean
+print_array (QmiMessage           *message,
+             gsize                 init_offset,
+             gsize                *offset,
+             const QmiCodecField  *field,
+             GString              *printable,
+             GError              **error)
+{
+    guint64 n_items;
+    guint   i;
+
+    if (!field->n_size_prefix_bytes)
+        n_items = field->size;
+    else if (!read_unsigned (message, init_offset, offset, field->n_size_prefix_bytes, &n_items, error))
+        return FALSE;
+
+    if (field->flags & QMI_CODEC_FLAG_SEQUENCE) {
+        guint64 sequence;
+
+        if (!read_unsigned (message, init_offset, offset, format_sizes[field->sequence_format], &sequence, error))
+            return FALSE;
+        g_string_append_printf (printable, "[[Seq:%u]] ", (guint) sequence);
+    }
+
+    g_string_append (printable, "{");
+
+    for (i = 0; i < n_items; i++) {
+        g_string_append_printf (printable, " [%u] = '", i);
+        if (!qmi_codec_print (message, init_offset, offset, &field->children[0], printable, error))
+            return FALSE;
+        g_string_append (printable, " '");
+    }
+
+    g_string_append (printable, "}");
+    return TRUE;
+}
+
+gboolean
+qmi_codec_print (QmiMessage           *message,
+                 gsize                 init_offset,
+                 gsize                *offset,
+                 const QmiCodecField  *field,
+                 GString              *printable,
+                 GError              **error)
+{
+    guint i;
+
+    switch (field->kind) {
+    case QMI_CODEC_KIND_INTEGER:
+    case QMI_CODEC_KIND_SIZED_INTEGER: {
+        guint64 value;
+
+        if (format_is_float (field->format)) {
+            gdouble tmp;
+
+            if (!read_float (message, init_offset, offset, field, &tmp, error))
+                return FALSE;
+            g_string_append_printf (printable, "%lf", tmp);
+            return TRUE;
+        }
+
+        if (!read_integer (message, init_offset, offset, field, &value, error))
+            return FALSE;
+        print_integer (field, value, printable);
+        return TRUE;
+    }
+    case QMI_CODEC_KIND_STRING: {
+        g_autofree gchar *tmp = NULL;
+
+        if (field->size) {
+            tmp = g_malloc (field->size + 1);
+            if (!qmi_message_tlv_read_fixed_size_string (message, init_offset, offset, field->size, tmp, error))
+                return FALSE;
+            tmp[field->size] = '\0';
+        } else if (!qmi_message_tlv_read_string (message, init_offset, offset, field->n_size_prefix_bytes, field->max_size, &tmp, error))
+            return FALSE;
+        g_string_append (printable, tmp);
+        return TRUE;
+    }
+    case QMI_CODEC_KIND_STRUCT:
+        g_string_append (printable, "[");
+        for (i = 0; i < field->n_children; i++) {
+            g_string_append_printf (printable, " %s = '", field->children[i].name);
+            if (!qmi_codec_print (message, init_offset, offset, &field->children[i], printable, error))
+                return FALSE;
+            g_string_append (printable, "'");
+        }
+        g_string_append (printable, " ]");
+        return TRUE;
+    case QMI_CODEC_KIND_ARRAY:
+        return print_array (message, init_offset, offset, field, printable, error);
+    default:
+        g_assert_not_reached ();
+    }
+    return FALSE;
+}
@@ -0,0 +1,135 @@
+/* -*- Mode: C; tab-width: 4; indent-tabs-mode: nil; c-basic-offset: 4 -*- */
+
+/*
+ * libqmi-glib -- GLib/GIO based library to control QMI devices
+ *
+ * This library is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU Lesser General Public
+ * License as published by the Free Software Foundation; either
+ * version 2 of the License, or (at your option) any later version.
+ *
+ * This library is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ * Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public
+ * License along with this library; if not, write to the
+ * Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
+ * Boston, MA 02110-1301 USA.
+ *
+ * Copyright (C) 2012-2017 Aleksander Morgado <aleksander@aleksander.es>
+ */
+
+#ifndef _LIBQMI_GLIB_QMI_CODEC_H_
+#define _LIBQMI_GLIB_QMI_CODEC_H_
+
+#include <glib.h>
+
+#include "qmi-message.h"
+
+G_BEGIN_DECLS
+
+/*
+ * Table-driven codec, used by the generated code instead of the fully
+ * unrolled readers, writers and printers when qmi-codegen is run with
+ * --codec-tables. Each TLV is described by a constant tree of QmiCodecField
+ * descriptors, and values are read from and written to the memory at the
+ * given offsets of the base pointer given.
+ */
+
+typedef enum {
+    QMI_CODEC_KIND_INTEGER,
+    QMI_CODEC_KIND_SIZED_INTEGER,
+    QMI_CODEC_KIND_STRING,
+    QMI_CODEC_KIND_STRUCT,
+    QMI_CODEC_KIND_ARRAY
+} QmiCodecKind;
+
+/* Format of the value in the raw byte stream */
+typedef enum {
+    QMI_CODEC_FORMAT_GUINT8,
+    QMI_CODEC_FORMAT_GUINT16,
+    QMI_CODEC_FORMAT_GUINT32,
+    QMI_CODEC_FORMAT_GUINT64,
+    QMI_CODEC_FORMAT_GINT8,
+    QMI_CODEC_FORMAT_GINT16,
+    QMI_CODEC_FORMAT_GINT32,
+    QMI_CODEC_FORMAT_GINT64,
+    QMI_CODEC_FORMAT_GFLOAT,
+    QMI_CODEC_FORMAT_GDOUBLE
+} QmiCodecFormat;
+
+/* How integers are printed */
+typedef enum {
+    QMI_CODEC_PRINT_NUMBER,
+    QMI_CODEC_PRINT_BOOLEAN,
+    QMI_CODEC_PRINT_ENUM,
+    QMI_CODEC_PRINT_FLAGS
+} QmiCodecPrint;
+
+/* Fixed-size strings stored as arrays, not as heap-allocated pointers */
+#define QMI_CODEC_FLAG_INLINE   (1 << 0)
+/* Arrays with a sequence number before the elements */
+#define QMI_CODEC_FLAG_SEQUENCE (1 << 1)
+
+typedef struct _QmiCodecField QmiCodecField;
+
+struct _QmiCodecField {
+    /* Name of the member, used when printing structs */
+    const gchar *name;
+    /* Members of structs, or the single element of arrays */
+    const QmiCodecField *children;
+    /* Enum or flags to string method, or array element clear method */
+    GCallback helper;
+    /* Offsets in memory of the value, and of the array sequence */
+    guint32 offset;
+    guint32 sequence_offset;
+    /* Size of sized integers, and of fixed-size strings and arrays */
+    guint16 size;
+    /* Maximum length of strings, 0 if unlimited */
+    guint16 max_size;
+    /* Size in memory of integers, and of array elements */
+    guint16 value_size;
+    guint16 n_children;
+    /* QmiCodecKind */
+    guint8 kind;
+    /* QmiCodecFormat of integers, and of array sequences */
+    guint8 format;
+    guint8 sequence_format;
+    /* QmiEndian of integers */
+    guint8 endian;
+    /* QmiCodecPrint of integers */
+    guint8 print;
+    /* Size prefix of strings and arrays, 0 if none */
+    guint8 n_size_prefix_bytes;
+    /* QMI_CODEC_FLAG_* */
+    guint8 flags;
+};
+
+G_GNUC_INTERNAL
+gboolean qmi_codec_read (QmiMessage           *message,
+                         gsize                 init_offset,
+                         gsize                *offset,
+                         const QmiCodecField  *field,
+                         gpointer              base,
+                         GError              **error);
+
+G_GNUC_INTERNAL
+gboolean qmi_codec_write (QmiMessage           *self,
+                          const QmiCodecField  *field,
+                          gconstpointer         base,
+                          const gchar          *tlv_name,
+                          GError              **error);
+
+G_GNUC_INTERNAL
+gboolean qmi_codec_print (QmiMessage           *message,
+                          gsize                 init_offset,
+                          gsize                *offset,
+                          const QmiCodecField  *field,
+                          GString              *printable,
+                          GError              **error);
+
+G_END_DECLS
+
+#endif /* _LIBQMI_GLIB_QMI_CODEC_H_ */
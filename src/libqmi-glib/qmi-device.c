@@ -155,6 +155,9 @@ typedef struct {
     gulong                  cancellable_id;
     TransactionWaitContext *wait_ctx;
 
+    /* resolved once when the transaction is created */
+    const QmiMessageDescriptor *descriptor;
+
     /* abortable support */
     GError                                   *abort_error;
     GCancellable                             *abort_cancellable;
@@ -177,6 +180,7 @@ transaction_new (QmiDevice           *self,
     tr = g_slice_new0 (Transaction);
     tr->message = qmi_message_ref (message);
     tr->message_context = (message_context ? qmi_message_context_ref (message_context) : NULL);
+    tr->descriptor = __qmi_message_lookup (message, message_context);
     tr->result = g_simple_async_result_new (G_OBJECT (self),
                                             callback,
                                             user_data,
@@ -345,7 +349,7 @@ transaction_abort (QmiDevice   *self,
 
     /* If the command is not abortable, we'll return the error right away
      * to the user. */
-    if (!__qmi_message_is_abortable (tr->message, tr->message_context)) {
+    if (!tr->descriptor || !tr->descriptor->abortable) {
         g_debug ("transaction 0x%x aborted, but message is not abortable", transaction_id);
         device_release_transaction (self, tr->wait_ctx->key);
         transaction_complete_and_free (tr, NULL, abort_error_take);
@@ -2854,7 +2858,7 @@ qmi_device_command_abortable (QmiDevice                                *self,
     }
 
     /* If message is not abortable, we should not allow using the abortable() interface */
-    if (!__qmi_message_is_abortable (message, message_context)) {
+    if (!tr->descriptor || !tr->descriptor->abortable) {
         if (abort_build_request_fn || abort_parse_response_fn) {
             error = g_error_new (QMI_CORE_ERROR,
                                  QMI_CORE_ERROR_FAILED,
@@ -33,6 +33,7 @@
 #include <errno.h>
 
 #include "qmi-helpers.h"
+#include "qmi-utils.h"
 #include "qmi-error-types.h"
 
 /*****************************************************************************/
@@ -692,6 +693,91 @@ qmi_helpers_list_links (GFile         *sysfs_file,
     return TRUE;
 }
 
+/*****************************************************************************/
+
+/* Free blocks are linked through their first bytes */
+typedef struct _PoolItem PoolItem;
+struct _PoolItem {
+    PoolItem *next;
+};
+
+gpointer
+qmi_helpers_pool_alloc0 (QmiHelpersPool *pool,
+                         gsize           block_size)
+{
+    PoolItem *item;
+
+    g_assert (block_size >= sizeof (PoolItem));
+
+    g_mutex_lock (&pool->mutex);
+    item = pool->free_list;
+    if (item) {
+        pool->free_list = item->next;
+        pool->n_free--;
+    }
+    pool->n_in_use++;
+    if (pool->n_in_use > pool->peak_in_use)
+        pool->peak_in_use = pool->n_in_use;
+    g_mutex_unlock (&pool->mutex);
+
+    if (!item)
+        return g_slice_alloc0 (block_size);
+
+    memset (item, 0, block_size);
+    return item;
+}
+
+void
+qmi_helpers_pool_free (QmiHelpersPool *pool,
+                       gsize           block_size,
+                       gpointer        mem)
+{
+    PoolItem *item = mem;
+    PoolItem *released = NULL;
+    guint     max_free;
+
+    /* Free blocks needed to serve the peak usage again, given that the ones
+     * still in use will also be returned */
+    max_free = qmi_utils_get_container_pool_max_items ();
+
+    g_mutex_lock (&pool->mutex);
+    g_assert (pool->n_in_use > 0);
+    pool->n_in_use--;
+
+    if (pool->n_free < MIN (max_free, pool->peak_in_use - pool->n_in_use)) {
+        item->next = pool->free_list;
+        pool->free_list = item;
+        pool->n_free++;
+    } else {
+        item->next = released;
+        released = item;
+    }
+
+    /* Periodically trim the blocks not needed for the recent peak usage, and
+     * start measuring it again */
+    if (++pool->n_frees >= QMI_HELPERS_POOL_TRIM_PERIOD) {
+        while (pool->n_free > MIN (max_free, pool->peak_in_use - pool->n_in_use)) {
+            PoolItem *trimmed;
+
+            trimmed = pool->free_list;
+            pool->free_list = trimmed->next;
+            pool->n_free--;
+            trimmed->next = released;
+            released = trimmed;
+        }
+        pool->peak_in_use = pool->n_in_use;
+        pool->n_frees = 0;
+    }
+    g_mutex_unlock (&pool->mutex);
+
+    /* Release outside of the lock */
+    while (released) {
+        item = released;
+        released = item->next;
+        g_slice_free1 (block_size, item);
+    }
+}
+
 #if !GLIB_CHECK_VERSION(2,54,0)
 
 gboolean
@@ -90,6 +90,40 @@ gboolean qmi_helpers_list_links (GFile         *sysfs_file,
                                  GPtrArray    **out_links,
                                  GError       **error);
 
+/* Default maximum number of freed items kept in each pool, see
+ * qmi_utils_set_container_pool_max_items() */
+#define QMI_HELPERS_POOL_DEFAULT_MAX_ITEMS 128
+
+/* Number of items returned to a pool between two trims */
+#define QMI_HELPERS_POOL_TRIM_PERIOD 1024
+
+/* Bounded free list of same-sized memory blocks, e.g. the output containers
+ * of a given message, so that messages parsed at a high rate don't need a new
+ * allocation every time.
+ *
+ * The pool is sized from the workload: it keeps only as many free blocks as
+ * needed to serve again the peak number of blocks used at the same time, up
+ * to the configured maximum. Every QMI_HELPERS_POOL_TRIM_PERIOD frees, the
+ * blocks not needed for the peak seen since the previous trim are released.
+ *
+ * Pools must be allocated statically, so that they are zero-initialized. */
+typedef struct {
+    GMutex   mutex;
+    gpointer free_list;
+    guint    n_free;
+    guint    n_in_use;
+    guint    peak_in_use;
+    guint    n_frees;
+} QmiHelpersPool;
+
+G_GNUC_INTERNAL
+gpointer qmi_helpers_pool_alloc0 (QmiHelpersPool *pool,
+                                  gsize           block_size);
+G_GNUC_INTERNAL
+void     qmi_helpers_pool_free   (QmiHelpersPool *pool,
+                                  gsize           block_size,
+                                  gpointer        mem);
+
 static inline gfloat
 QMI_GFLOAT_SWAP_LE_BE (gfloat in)
 {
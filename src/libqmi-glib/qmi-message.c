@@ -403,6 +403,16 @@ qmi_message_new (QmiService service,
                  guint8 client_id,
                  guint16 transaction_id,
                  guint16 message_id)
+{
+    return qmi_message_new_sized (service, client_id, transaction_id, message_id, 0);
+}
+
+QmiMessage *
+qmi_message_new_sized (QmiService service,
+                       guint8     client_id,
+                       guint16    transaction_id,
+                       guint16    message_id,
+                       gsize      tlvs_size)
 {
     GByteArray *self;
     struct full_message *buffer;
@@ -424,8 +434,10 @@ qmi_message_new (QmiService service,
      * https://bugzilla.gnome.org/show_bug.cgi?id=738170
      */
 
-    /* Create the GByteArray with buffer_len bytes preallocated */
-    self = g_byte_array_sized_new (buffer_len);
+    /* Create the GByteArray with buffer_len bytes preallocated, plus the size
+     * of the TLVs that will be added afterwards, so that the array doesn't
+     * need to be reallocated while writing them. */
+    self = g_byte_array_sized_new (buffer_len + tlvs_size);
     /* Actually flag as all the buffer_len bytes being used. */
     g_byte_array_set_size (self, buffer_len);
 
@@ -455,6 +467,37 @@ qmi_message_new (QmiService service,
     return (QmiMessage *)self;
 }
 
+QmiMessage *
+qmi_message_new_from_template (const guint8 *data,
+                               gsize         data_len,
+                               guint8        client_id,
+                               guint16       transaction_id)
+{
+    GByteArray *self;
+    struct full_message *buffer;
+
+    g_return_val_if_fail (data_len >= (1 + sizeof (struct qmux) + sizeof (struct control_header)), NULL);
+
+    /* Transaction ID in the control service is 8bit only */
+    g_return_val_if_fail ((((const struct full_message *)data)->qmux.service != QMI_SERVICE_CTL ||
+                           transaction_id <= G_MAXUINT8),
+                          NULL);
+
+    /* The template is already a complete and valid message, so just copy it
+     * and update the client and transaction IDs */
+    self = g_byte_array_sized_new (data_len);
+    g_byte_array_append (self, data, data_len);
+
+    buffer = (struct full_message *)(self->data);
+    buffer->qmux.client = client_id;
+    if (buffer->qmux.service == QMI_SERVICE_CTL)
+        buffer->qmi.control.header.transaction = (guint8)transaction_id;
+    else
+        buffer->qmi.service.header.transaction = GUINT16_TO_LE (transaction_id);
+
+    return (QmiMessage *)self;
+}
+
 QmiMessage *
 qmi_message_new_from_data (QmiService   service,
                            guint8       client_id,
@@ -579,6 +622,59 @@ qmi_message_get_data (QmiMessage *self,
     return (guint8 *)(&((struct full_message *)(self->data))->qmi);
 }
 
+/*****************************************************************************/
+/* Integer array helpers */
+
+/* Converts in place the given number of integers of the given size from/to
+ * host byte order; byte swapping is its own inverse, so the same method is
+ * used in both directions. The data may be unaligned (e.g. when it is within
+ * a message), so each item is accessed with memcpy(), which the compiler
+ * turns into plain loads and stores where possible. */
+#define INTEGER_ARRAY_SWAP_ENDIAN(data, n_items, endian, type, from_be, from_le) do { \
+        type   item;                                                                    \
+        guint8 *ptr;                                                                    \
+        guint   i;                                                                      \
+                                                                                        \
+        if (endian == QMI_ENDIAN_BIG) {                                                 \
+            for (i = 0, ptr = data; i < n_items; i++, ptr += sizeof (type)) {           \
+                memcpy (&item, ptr, sizeof (type));                                     \
+                item = from_be (item);                                                  \
+                memcpy (ptr, &item, sizeof (type));                                     \
+            }                                                                           \
+        } else {                                                                        \
+            for (i = 0, ptr = data; i < n_items; i++, ptr += sizeof (type)) {           \
+                memcpy (&item, ptr, sizeof (type));                                     \
+                item = from_le (item);                                                  \
+                memcpy (ptr, &item, sizeof (type));                                     \
+            }                                                                           \
+        }                                                                               \
+    } while (0)
+
+static void
+integer_array_swap_endian (guint8    *data,
+                           guint      n_items,
+                           guint      element_size,
+                           QmiEndian  endian)
+{
+    switch (element_size) {
+    case 1:
+        break;
+    case 2:
+        INTEGER_ARRAY_SWAP_ENDIAN (data, n_items, endian, guint16, GUINT16_FROM_BE, GUINT16_FROM_LE);
+        break;
+    case 4:
+        INTEGER_ARRAY_SWAP_ENDIAN (data, n_items, endian, guint32, GUINT32_FROM_BE, GUINT32_FROM_LE);
+        break;
+    case 8:
+        INTEGER_ARRAY_SWAP_ENDIAN (data, n_items, endian, guint64, GUINT64_FROM_BE, GUINT64_FROM_LE);
+        break;
+    default:
+        g_assert_not_reached ();
+    }
+}
+
+#undef INTEGER_ARRAY_SWAP_ENDIAN
+
 /*****************************************************************************/
 /* TLV builder & writer */
 
@@ -910,6 +1006,32 @@ qmi_message_tlv_write_string (QmiMessage   *self,
     return TRUE;
 }
 
+gboolean
+qmi_message_tlv_write_integer_array (QmiMessage     *self,
+                                     QmiEndian       endian,
+                                     guint           element_size,
+                                     guint           n_items,
+                                     gconstpointer   in,
+                                     GError        **error)
+{
+    gsize len;
+    guint old_len;
+
+    g_return_val_if_fail (self != NULL, FALSE);
+    g_return_val_if_fail (in != NULL || n_items == 0, FALSE);
+
+    len = (gsize) n_items * element_size;
+
+    /* Check for overflow of message size, once for all items */
+    if (!tlv_error_if_write_overflow (self, len, error))
+        return FALSE;
+
+    old_len = self->len;
+    g_byte_array_append (self, (const guint8 *)in, len);
+    integer_array_swap_endian (&self->data[old_len], n_items, element_size, endian);
+    return TRUE;
+}
+
 /*****************************************************************************/
 /* TLV reader */
 
@@ -950,6 +1072,34 @@ qmi_message_tlv_read_init (QmiMessage  *self,
     return (((guint8 *)tlv) - self->data);
 }
 
+gsize
+qmi_message_tlv_read_next (QmiMessage *self,
+                           gsize       tlv_offset,
+                           guint8     *out_type)
+{
+    struct tlv *tlv;
+
+    g_return_val_if_fail (self != NULL, 0);
+    g_return_val_if_fail (self->len > 0, 0);
+
+    if (!tlv_offset)
+        tlv = qmi_tlv_first (self);
+    else
+        tlv = qmi_tlv_next (self, (struct tlv *) &(self->data[tlv_offset]));
+
+    /* Stop iterating when there are no more TLVs, or if the header or the
+     * value of the next one would overflow the message */
+    if (!tlv ||
+        ((guint8 *) tlv) + sizeof (struct tlv) > (guint8 *) qmi_end (self) ||
+        ((guint8 *) tlv_next (tlv)) > ((guint8 *) qmi_end (self)))
+        return 0;
+
+    if (out_type)
+        *out_type = tlv->type;
+
+    return (((guint8 *)tlv) - self->data);
+}
+
 static const guint8 *
 tlv_error_if_read_overflow (QmiMessage  *self,
                             gsize        tlv_offset,
@@ -1266,30 +1416,26 @@ qmi_message_tlv_read_gdouble (QmiMessage  *self,
     return TRUE;
 }
 
-gboolean
-qmi_message_tlv_read_string (QmiMessage  *self,
-                             gsize        tlv_offset,
-                             gsize       *offset,
-                             guint8       n_size_prefix_bytes,
-                             guint16      max_size,
-                             gchar      **out,
-                             GError     **error)
+static const guint8 *
+tlv_read_string_data (QmiMessage  *self,
+                      gsize        tlv_offset,
+                      gsize       *offset,
+                      guint8       n_size_prefix_bytes,
+                      guint16      max_size,
+                      guint16     *out_string_length,
+                      guint16     *out_valid_string_length,
+                      GError     **error)
 {
     const guint8 *ptr;
     guint16 string_length;
     guint16 valid_string_length;
 
-    g_return_val_if_fail (self != NULL, FALSE);
-    g_return_val_if_fail (offset != NULL, FALSE);
-    g_return_val_if_fail (out != NULL, FALSE);
-    g_return_val_if_fail (n_size_prefix_bytes <= 2, FALSE);
-
     switch (n_size_prefix_bytes) {
     case 0: {
         struct tlv *tlv;
 
         if (!tlv_error_if_read_overflow (self, tlv_offset, *offset, 0, error))
-            return FALSE;
+            return NULL;
 
         /* If no length prefix given, read the remaining TLV buffer into a string */
         tlv = (struct tlv *) &(self->data[tlv_offset]);
@@ -1300,52 +1446,136 @@ qmi_message_tlv_read_string (QmiMessage  *self,
         guint8 string_length_8;
 
         if (!qmi_message_tlv_read_guint8 (self, tlv_offset, offset, &string_length_8, error))
-            return FALSE;
+            return NULL;
         string_length = (guint16) string_length_8;
         break;
     }
     case 2:
         if (!qmi_message_tlv_read_guint16 (self, tlv_offset, offset, QMI_ENDIAN_LITTLE, &string_length, error))
-            return FALSE;
+            return NULL;
         break;
     default:
         g_assert_not_reached ();
     }
 
-    if (string_length == 0) {
-        *out = g_strdup ("");
-        return TRUE;
-    }
-
     if (max_size > 0 && string_length > max_size)
         valid_string_length = max_size;
     else
         valid_string_length = string_length;
 
     if (!(ptr = tlv_error_if_read_overflow (self, tlv_offset, *offset, valid_string_length, error)))
-        return FALSE;
+        return NULL;
+
+    *out_string_length = string_length;
+    *out_valid_string_length = valid_string_length;
+    return ptr;
+}
+
+static gchar *
+string_to_utf8 (const guint8  *ptr,
+                guint16        length,
+                GError       **error)
+{
+    gchar *out;
 
     /* Perform a quick UTF-8 validation check first. This check isn't perfect,
      * because there may be GSM-7 encoded strings that are valid UTF-8 as well,
      * but hey, the strings read using this method should all really be ASCII-7
      * and we're trying to do our best to overcome modem firmware problems...
      */
-    if (qmi_helpers_string_utf8_validate_printable (ptr, valid_string_length)) {
-        *out = g_malloc (valid_string_length + 1);
-        memcpy (*out, ptr, valid_string_length);
-        (*out)[valid_string_length] = '\0';
+    if (qmi_helpers_string_utf8_validate_printable (ptr, length)) {
+        out = g_malloc (length + 1);
+        memcpy (out, ptr, length);
+        out[length] = '\0';
+        return out;
+    }
+
+    /* Otherwise, attempt GSM-7 */
+    out = qmi_helpers_string_utf8_from_gsm7 (ptr, length);
+    if (out)
+        return out;
+
+    /* Otherwise, attempt UCS-2 */
+    out = qmi_helpers_string_utf8_from_ucs2le (ptr, length);
+    if (out)
+        return out;
+
+    /* Otherwise, error */
+    g_set_error (error, QMI_CORE_ERROR, QMI_CORE_ERROR_INVALID_DATA, "invalid string");
+    return NULL;
+}
+
+gboolean
+qmi_message_tlv_read_string (QmiMessage  *self,
+                             gsize        tlv_offset,
+                             gsize       *offset,
+                             guint8       n_size_prefix_bytes,
+                             guint16      max_size,
+                             gchar      **out,
+                             GError     **error)
+{
+    const guint8 *ptr;
+    guint16 string_length;
+    guint16 valid_string_length;
+
+    g_return_val_if_fail (self != NULL, FALSE);
+    g_return_val_if_fail (offset != NULL, FALSE);
+    g_return_val_if_fail (out != NULL, FALSE);
+    g_return_val_if_fail (n_size_prefix_bytes <= 2, FALSE);
+
+    if (!(ptr = tlv_read_string_data (self, tlv_offset, offset, n_size_prefix_bytes, max_size,
+                                      &string_length, &valid_string_length, error)))
+        return FALSE;
+
+    if (string_length == 0) {
+        *out = g_strdup ("");
+        return TRUE;
+    }
+
+    if (!(*out = string_to_utf8 (ptr, valid_string_length, error)))
+        return FALSE;
+
+    *offset = (*offset + string_length);
+    return TRUE;
+}
+
+gboolean
+qmi_message_tlv_read_string_view (QmiMessage   *self,
+                                  gsize         tlv_offset,
+                                  gsize        *offset,
+                                  guint8        n_size_prefix_bytes,
+                                  guint16       max_size,
+                                  const gchar **out_view,
+                                  gsize        *out_view_length,
+                                  gchar       **out_converted,
+                                  GError      **error)
+{
+    const guint8 *ptr;
+    guint16 string_length;
+    guint16 valid_string_length;
+
+    g_return_val_if_fail (self != NULL, FALSE);
+    g_return_val_if_fail (offset != NULL, FALSE);
+    g_return_val_if_fail (out_view != NULL, FALSE);
+    g_return_val_if_fail (out_view_length != NULL, FALSE);
+    g_return_val_if_fail (out_converted != NULL, FALSE);
+    g_return_val_if_fail (n_size_prefix_bytes <= 2, FALSE);
+
+    if (!(ptr = tlv_read_string_data (self, tlv_offset, offset, n_size_prefix_bytes, max_size,
+                                      &string_length, &valid_string_length, error)))
+        return FALSE;
+
+    /* Valid UTF-8 strings are given directly from the message data; all others
+     * need to be converted, so they're copied */
+    if (valid_string_length == 0 || qmi_helpers_string_utf8_validate_printable (ptr, valid_string_length)) {
+        *out_view = (const gchar *) ptr;
+        *out_view_length = valid_string_length;
+        *out_converted = NULL;
     } else {
-        /* Otherwise, attempt GSM-7 */
-        *out =qmi_helpers_string_utf8_from_gsm7 (ptr, valid_string_length);
-        if (*out == NULL) {
-            /* Otherwise, attempt UCS-2 */
-            *out = qmi_helpers_string_utf8_from_ucs2le (ptr, valid_string_length);
-            if (*out == NULL) {
-                /* Otherwise, error */
-                g_set_error (error, QMI_CORE_ERROR, QMI_CORE_ERROR_INVALID_DATA, "invalid string");
-                return FALSE;
-            }
-        }
+        if (!(*out_converted = string_to_utf8 (ptr, valid_string_length, error)))
+            return FALSE;
+        *out_view = *out_converted;
+        *out_view_length = strlen (*out_converted);
     }
 
     *offset = (*offset + string_length);
@@ -1393,6 +1623,64 @@ qmi_message_tlv_read_fixed_size_string (QmiMessage  *self,
     return FALSE;
 }
 
+const guint8 *
+qmi_message_tlv_read_block (QmiMessage  *self,
+                            gsize        tlv_offset,
+                            gsize       *offset,
+                            guint        n_items,
+                            guint        item_size,
+                            GError     **error)
+{
+    const guint8 *ptr;
+
+    g_return_val_if_fail (self != NULL, NULL);
+    g_return_val_if_fail (offset != NULL, NULL);
+    g_return_val_if_fail (item_size > 0, NULL);
+
+    /* No TLV can be longer than this, and this also ensures the block size
+     * computation below cannot overflow */
+    if (n_items > G_MAXUINT16 / item_size) {
+        g_set_error (error,
+                     QMI_CORE_ERROR,
+                     QMI_CORE_ERROR_TLV_TOO_LONG,
+                     "Reading TLV would overflow");
+        return NULL;
+    }
+
+    if (!(ptr = tlv_error_if_read_overflow (self, tlv_offset, *offset, n_items * item_size, error)))
+        return NULL;
+
+    *offset = *offset + (n_items * item_size);
+    return ptr;
+}
+
+gboolean
+qmi_message_tlv_read_integer_array (QmiMessage  *self,
+                                    gsize        tlv_offset,
+                                    gsize       *offset,
+                                    QmiEndian    endian,
+                                    guint        element_size,
+                                    guint        n_items,
+                                    gpointer     out,
+                                    GError     **error)
+{
+    const guint8 *ptr;
+
+    g_return_val_if_fail (out != NULL || n_items == 0, FALSE);
+
+    /* Check for overflow of the TLV size, once for all items */
+    if (!(ptr = qmi_message_tlv_read_block (self, tlv_offset, offset, n_items, element_size, error)))
+        return FALSE;
+
+    /* Empty arrays may not have any storage to copy to */
+    if (n_items == 0)
+        return TRUE;
+
+    memcpy (out, ptr, (gsize) n_items * element_size);
+    integer_array_swap_endian ((guint8 *) out, n_items, element_size, endian);
+    return TRUE;
+}
+
 guint16
 qmi_message_tlv_read_remaining_size (QmiMessage *self,
                                      gsize       tlv_offset,
@@ -1594,6 +1882,7 @@ qmi_message_get_printable_full (QmiMessage        *self,
     GString *printable;
     gchar *qmi_flags_str;
     gchar *contents;
+    const QmiMessageDescriptor *descriptor;
 
     g_return_val_if_fail (self != NULL, NULL);
 
@@ -1629,91 +1918,105 @@ qmi_message_get_printable_full (QmiMessage        *self,
                             line_prefix, get_all_tlvs_length (self));
     g_free (qmi_flags_str);
 
-    contents = NULL;
-    switch (qmi_message_get_service (self)) {
+    descriptor = __qmi_message_lookup (self, context);
+    contents = (descriptor ? descriptor->get_printable (self, line_prefix) : NULL);
+
+    if (!contents)
+        contents = get_generic_printable (self, line_prefix);
+    g_string_append (printable, contents);
+    g_free (contents);
+
+    return g_string_free (printable, FALSE);
+}
+
+static const QmiMessageDescriptor *
+get_service_descriptors (QmiService  service,
+                         guint      *n_descriptors)
+{
+    switch (service) {
     case QMI_SERVICE_CTL:
 #if defined HAVE_QMI_SERVICE_CTL
-        contents = __qmi_message_ctl_get_printable (self, context, line_prefix);
+        return __qmi_message_ctl_get_descriptors (n_descriptors);
 #endif
         break;
     case QMI_SERVICE_DMS:
 #if defined HAVE_QMI_SERVICE_DMS
-        contents = __qmi_message_dms_get_printable (self, context, line_prefix);
+        return __qmi_message_dms_get_descriptors (n_descriptors);
 #endif
         break;
     case QMI_SERVICE_WDS:
 #if defined HAVE_QMI_SERVICE_WDS
-        contents = __qmi_message_wds_get_printable (self, context, line_prefix);
+        return __qmi_message_wds_get_descriptors (n_descriptors);
 #endif
         break;
     case QMI_SERVICE_NAS:
 #if defined HAVE_QMI_SERVICE_NAS
-        contents = __qmi_message_nas_get_printable (self, context, line_prefix);
+        return __qmi_message_nas_get_descriptors (n_descriptors);
 #endif
         break;
     case QMI_SERVICE_WMS:
 #if defined HAVE_QMI_SERVICE_WMS
-        contents = __qmi_message_wms_get_printable (self, context, line_prefix);
+        return __qmi_message_wms_get_descriptors (n_descriptors);
 #endif
         break;
     case QMI_SERVICE_PDC:
 #if defined HAVE_QMI_SERVICE_PDC
-        contents = __qmi_message_pdc_get_printable (self, context, line_prefix);
+        return __qmi_message_pdc_get_descriptors (n_descriptors);
 #endif
         break;
     case QMI_SERVICE_PDS:
 #if defined HAVE_QMI_SERVICE_PDS
-        contents = __qmi_message_pds_get_printable (self, context, line_prefix);
+        return __qmi_message_pds_get_descriptors (n_descriptors);
 #endif
         break;
     case QMI_SERVICE_PBM:
 #if defined HAVE_QMI_SERVICE_PBM
-        contents = __qmi_message_pbm_get_printable (self, context, line_prefix);
+        return __qmi_message_pbm_get_descriptors (n_descriptors);
 #endif
         break;
     case QMI_SERVICE_UIM:
 #if defined HAVE_QMI_SERVICE_UIM
-        contents = __qmi_message_uim_get_printable (self, context, line_prefix);
+        return __qmi_message_uim_get_descriptors (n_descriptors);
 #endif
         break;
     case QMI_SERVICE_OMA:
 #if defined HAVE_QMI_SERVICE_OMA
-        contents = __qmi_message_oma_get_printable (self, context, line_prefix);
+        return __qmi_message_oma_get_descriptors (n_descriptors);
 #endif
         break;
     case QMI_SERVICE_GAS:
 #if defined HAVE_QMI_SERVICE_GAS
-        contents = __qmi_message_gas_get_printable (self, context, line_prefix);
+        return __qmi_message_gas_get_descriptors (n_descriptors);
 #endif
         break;
     case QMI_SERVICE_GMS:
 #if defined HAVE_QMI_SERVICE_GMS
-        contents = __qmi_message_gms_get_printable (self, context, line_prefix);
+        return __qmi_message_gms_get_descriptors (n_descriptors);
 #endif
         break;
     case QMI_SERVICE_WDA:
 #if defined HAVE_QMI_SERVICE_WDA
-        contents = __qmi_message_wda_get_printable (self, context, line_prefix);
+        return __qmi_message_wda_get_descriptors (n_descriptors);
 #endif
         break;
     case QMI_SERVICE_VOICE:
 #if defined HAVE_QMI_SERVICE_VOICE
-        contents = __qmi_message_voice_get_printable (self, context, line_prefix);
+        return __qmi_message_voice_get_descriptors (n_descriptors);
 #endif
         break;
     case QMI_SERVICE_LOC:
 #if defined HAVE_QMI_SERVICE_LOC
-        contents = __qmi_message_loc_get_printable (self, context, line_prefix);
+        return __qmi_message_loc_get_descriptors (n_descriptors);
 #endif
         break;
     case QMI_SERVICE_QOS:
 #if defined HAVE_QMI_SERVICE_QOS
-        contents = __qmi_message_qos_get_printable (self, context, line_prefix);
+        return __qmi_message_qos_get_descriptors (n_descriptors);
 #endif
         break;
     case QMI_SERVICE_DSD:
 #if defined HAVE_QMI_SERVICE_DSD
-        contents = __qmi_message_dsd_get_printable (self, context, line_prefix);
+        return __qmi_message_dsd_get_descriptors (n_descriptors);
 #endif
         break;
 
@@ -1755,82 +2058,62 @@ qmi_message_get_printable_full (QmiMessage        *self,
         break;
     }
 
-    if (!contents)
-        contents = get_generic_printable (self, line_prefix);
-    g_string_append (printable, contents);
-    g_free (contents);
+    *n_descriptors = 0;
+    return NULL;
+}
 
-    return g_string_free (printable, FALSE);
+static gint
+descriptor_cmp (const QmiMessageDescriptor *descriptor,
+                guint8                      indication,
+                guint16                     vendor_id,
+                guint16                     message_id)
+{
+    if (descriptor->indication != indication)
+        return (descriptor->indication < indication ? -1 : 1);
+    if (descriptor->vendor_id != vendor_id)
+        return (descriptor->vendor_id < vendor_id ? -1 : 1);
+    if (descriptor->message_id != message_id)
+        return (descriptor->message_id < message_id ? -1 : 1);
+    return 0;
 }
 
-gboolean
-__qmi_message_is_abortable (QmiMessage        *self,
-                            QmiMessageContext *context)
+const QmiMessageDescriptor *
+__qmi_message_lookup (QmiMessage        *self,
+                      QmiMessageContext *context)
 {
-    switch (qmi_message_get_service (self)) {
-    case QMI_SERVICE_WDS:
-#if defined HAVE_QMI_SERVICE_WDS
-        return __qmi_message_wds_is_abortable (self, context);
-#else
-        return FALSE;
-#endif
-    case QMI_SERVICE_NAS:
-#if defined HAVE_QMI_SERVICE_NAS
-        return __qmi_message_nas_is_abortable (self, context);
-#else
-        return FALSE;
-#endif
+    const QmiMessageDescriptor *descriptors;
+    guint    n_descriptors;
+    guint    low;
+    guint    high;
+    guint8   indication;
+    guint16  vendor_id;
+    guint16  message_id;
 
-    case QMI_SERVICE_UNKNOWN:
-        g_assert_not_reached ();
+    descriptors = get_service_descriptors (qmi_message_get_service (self), &n_descriptors);
+    if (!descriptors)
+        return NULL;
 
-    case QMI_SERVICE_CTL:
-    case QMI_SERVICE_DMS:
-    case QMI_SERVICE_WMS:
-    case QMI_SERVICE_PDS:
-    case QMI_SERVICE_PBM:
-    case QMI_SERVICE_UIM:
-    case QMI_SERVICE_OMA:
-    case QMI_SERVICE_GAS:
-    case QMI_SERVICE_WDA:
-    case QMI_SERVICE_LOC:
-    case QMI_SERVICE_AUTH:
-    case QMI_SERVICE_AT:
-    case QMI_SERVICE_CAT2:
-    case QMI_SERVICE_QCHAT:
-    case QMI_SERVICE_RMTFS:
-    case QMI_SERVICE_TEST:
-    case QMI_SERVICE_SAR:
-    case QMI_SERVICE_IMS:
-    case QMI_SERVICE_ADC:
-    case QMI_SERVICE_CSD:
-    case QMI_SERVICE_MFS:
-    case QMI_SERVICE_TIME:
-    case QMI_SERVICE_TS:
-    case QMI_SERVICE_TMD:
-    case QMI_SERVICE_SAP:
-    case QMI_SERVICE_TSYNC:
-    case QMI_SERVICE_RFSA:
-    case QMI_SERVICE_CSVT:
-    case QMI_SERVICE_QCMAP:
-    case QMI_SERVICE_IMSP:
-    case QMI_SERVICE_IMSVT:
-    case QMI_SERVICE_IMSA:
-    case QMI_SERVICE_COEX:
-    case QMI_SERVICE_STX:
-    case QMI_SERVICE_BIT:
-    case QMI_SERVICE_IMSRTP:
-    case QMI_SERVICE_RFRPE:
-    case QMI_SERVICE_SSCTL:
-    case QMI_SERVICE_CAT:
-    case QMI_SERVICE_RMS:
-    case QMI_SERVICE_FOTA:
-    case QMI_SERVICE_GMS:
-    case QMI_SERVICE_VOICE:
-    case QMI_SERVICE_PDC:
-    case QMI_SERVICE_DSD:
-    case QMI_SERVICE_QOS:
-    default:
-        return FALSE;
+    /* Indications are never vendor-specific */
+    indication = !!qmi_message_is_indication (self);
+    vendor_id = ((!indication && context) ? qmi_message_context_get_vendor_id (context) : QMI_MESSAGE_VENDOR_GENERIC);
+    message_id = qmi_message_get_message_id (self);
+
+    /* Binary search in the sorted table */
+    low = 0;
+    high = n_descriptors;
+    while (low < high) {
+        guint mid;
+        gint  cmp;
+
+        mid = low + (high - low) / 2;
+        cmp = descriptor_cmp (&descriptors[mid], indication, vendor_id, message_id);
+        if (cmp == 0)
+            return &descriptors[mid];
+        if (cmp < 0)
+            low = mid + 1;
+        else
+            high = mid;
     }
+
+    return NULL;
 }
@@ -96,6 +96,23 @@ QmiMessage *qmi_message_new (QmiService service,
                              guint16    transaction_id,
                              guint16    message_id);
 
+#if defined (LIBQMI_GLIB_COMPILATION)
+G_GNUC_INTERNAL
+QmiMessage *qmi_message_new_sized (QmiService service,
+                                   guint8     client_id,
+                                   guint16    transaction_id,
+                                   guint16    message_id,
+                                   gsize      tlvs_size);
+#endif
+
+#if defined (LIBQMI_GLIB_COMPILATION)
+G_GNUC_INTERNAL
+QmiMessage *qmi_message_new_from_template (const guint8 *data,
+                                           gsize         data_len,
+                                           guint8        client_id,
+                                           guint16       transaction_id);
+#endif
+
 /**
  * qmi_message_new_from_raw:
  * @raw: (inout): raw data buffer.
@@ -560,6 +577,16 @@ gboolean qmi_message_tlv_write_string (QmiMessage   *self,
                                        gssize        in_length,
                                        GError      **error);
 
+#if defined (LIBQMI_GLIB_COMPILATION)
+G_GNUC_INTERNAL
+gboolean qmi_message_tlv_write_integer_array (QmiMessage     *self,
+                                              QmiEndian       endian,
+                                              guint           element_size,
+                                              guint           n_items,
+                                              gconstpointer   in,
+                                              GError        **error);
+#endif
+
 /*****************************************************************************/
 /* TLV reader */
 
@@ -581,6 +608,13 @@ gsize qmi_message_tlv_read_init (QmiMessage  *self,
                                  guint16     *out_tlv_length,
                                  GError     **error);
 
+#if defined (LIBQMI_GLIB_COMPILATION)
+G_GNUC_INTERNAL
+gsize qmi_message_tlv_read_next (QmiMessage  *self,
+                                 gsize        tlv_offset,
+                                 guint8      *out_type);
+#endif
+
 /**
  * qmi_message_tlv_read_guint8:
  * @self: a #QmiMessage.
@@ -898,6 +932,19 @@ gboolean qmi_message_tlv_read_string (QmiMessage  *self,
                                       gchar      **out,
                                       GError     **error);
 
+#if defined (LIBQMI_GLIB_COMPILATION)
+G_GNUC_INTERNAL
+gboolean qmi_message_tlv_read_string_view (QmiMessage   *self,
+                                           gsize         tlv_offset,
+                                           gsize        *offset,
+                                           guint8        n_size_prefix_bytes,
+                                           guint16       max_size,
+                                           const gchar **out_view,
+                                           gsize        *out_view_length,
+                                           gchar       **out_converted,
+                                           GError      **error);
+#endif
+
 /**
  * qmi_message_tlv_read_fixed_size_string:
  * @self: a #QmiMessage.
@@ -933,6 +980,28 @@ gboolean qmi_message_tlv_read_fixed_size_string (QmiMessage  *self,
                                                  gchar       *out,
                                                  GError     **error);
 
+#if defined (LIBQMI_GLIB_COMPILATION)
+G_GNUC_INTERNAL
+const guint8 *qmi_message_tlv_read_block (QmiMessage  *self,
+                                          gsize        tlv_offset,
+                                          gsize       *offset,
+                                          guint        n_items,
+                                          guint        item_size,
+                                          GError     **error);
+#endif
+
+#if defined (LIBQMI_GLIB_COMPILATION)
+G_GNUC_INTERNAL
+gboolean qmi_message_tlv_read_integer_array (QmiMessage  *self,
+                                             gsize        tlv_offset,
+                                             gsize       *offset,
+                                             QmiEndian    endian,
+                                             guint        element_size,
+                                             guint        n_items,
+                                             gpointer     out,
+                                             GError     **error);
+#endif
+
 #if defined (LIBQMI_GLIB_COMPILATION)
 G_GNUC_INTERNAL
 guint16 qmi_message_tlv_read_remaining_size (QmiMessage  *self,
@@ -1026,9 +1095,34 @@ void qmi_message_set_transaction_id (QmiMessage *self,
                                      guint16 transaction_id);
 
 #if defined (LIBQMI_GLIB_COMPILATION)
+
+/* Parses a response or indication into its output container */
+typedef gpointer (* QmiMessageParseFunc) (QmiMessage  *message,
+                                          GError     **error);
+
+/* Builds the printable contents of a request, response or indication */
+typedef gchar * (* QmiMessagePrintableFunc) (QmiMessage  *message,
+                                             const gchar *line_prefix);
+
+/*
+ * Each service provides a table of message descriptors sorted by the
+ * (indication, vendor id, message id) key, so that any message can be
+ * resolved with a single binary search. Indications are always generic,
+ * i.e. their vendor id is QMI_MESSAGE_VENDOR_GENERIC.
+ */
+typedef struct {
+    const gchar             *name;
+    QmiMessageParseFunc      parse;
+    QmiMessagePrintableFunc  get_printable;
+    guint16                  message_id;
+    guint16                  vendor_id;
+    guint8                   indication;
+    guint8                   abortable;
+} QmiMessageDescriptor;
+
 G_GNUC_INTERNAL
-gboolean __qmi_message_is_abortable (QmiMessage        *self,
-                                     QmiMessageContext *context);
+const QmiMessageDescriptor *__qmi_message_lookup (QmiMessage        *self,
+                                                  QmiMessageContext *context);
 #endif
 
 /*****************************************************************************/
@@ -24,6 +24,7 @@
 
 #include <config.h>
 #include "qmi-utils.h"
+#include "qmi-helpers.h"
 
 /*****************************************************************************/
 
@@ -40,3 +41,19 @@ qmi_utils_set_traces_enabled (gboolean enabled)
 {
     g_atomic_int_set (&__traces_enabled, enabled);
 }
+
+/*****************************************************************************/
+
+static volatile gint __container_pool_max_items = QMI_HELPERS_POOL_DEFAULT_MAX_ITEMS;
+
+guint
+qmi_utils_get_container_pool_max_items (void)
+{
+    return (guint) g_atomic_int_get (&__container_pool_max_items);
+}
+
+void
+qmi_utils_set_container_pool_max_items (guint max_items)
+{
+    g_atomic_int_set (&__container_pool_max_items, (gint) MIN (max_items, G_MAXINT));
+}
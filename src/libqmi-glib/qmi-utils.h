@@ -67,6 +67,38 @@ gboolean qmi_utils_get_traces_enabled (void);
  */
 void qmi_utils_set_traces_enabled (gboolean enabled);
 
+/* Output container pools */
+
+/**
+ * qmi_utils_get_container_pool_max_items:
+ *
+ * Gets the maximum number of freed output containers kept for reuse for each
+ * message type.
+ *
+ * Returns: the maximum number of containers.
+ *
+ * Since: 1.30
+ */
+guint qmi_utils_get_container_pool_max_items (void);
+
+/**
+ * qmi_utils_set_container_pool_max_items:
+ * @max_items: the maximum number of containers, or 0 to disable the reuse.
+ *
+ * Sets the maximum number of freed output containers kept for reuse for each
+ * message type.
+ *
+ * Each message type keeps only as many freed containers as needed for the
+ * peak number of its containers in use at the same time, and periodically
+ * releases the ones not needed any more, so this maximum just bounds the
+ * memory kept when many messages of the same type are processed in
+ * parallel, e.g. when polling a large number of devices. Containers kept
+ * above a new lower maximum are released when the pool is next trimmed.
+ *
+ * Since: 1.30
+ */
+void qmi_utils_set_container_pool_max_items (guint max_items);
+
 G_END_DECLS
 
 #endif /* _LIBQMI_GLIB_QMI_UTILS_H_ */
@@ -0,0 +1,1127 @@
+/* -*- Mode: C; tab-width: 4; indent-tabs-mode: nil; c-basic-offset: 4 -*- */
+/*
+ * This program is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 2 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details:
+ *
+ * Copyright (C) 2012-2017 Aleksander Morgado <aleksander@aleksander.es>
+ */
+
+#include <config.h>
+#include <glib-object.h>
+#include <string.h>
+
+#include <libqmi-glib.h>
+#include "qmi-codec.h"
+
+/*****************************************************************************/
+/* The codec must read, write and print exactly as the unrolled code built by
+ * qmi-codegen does, so each test runs the same TLV through qmi_codec_*() and
+ * through the equivalent unrolled code, and compares the results. */
+
+#define TEST_TLV 0x01
+
+typedef gboolean (* TestWriteFunc)   (QmiMessage     *self,
+                                      gconstpointer   value,
+                                      GError        **error);
+typedef gboolean (* TestReadFunc)    (QmiMessage     *message,
+                                      gsize           init_offset,
+                                      gsize          *offset,
+                                      gpointer        value,
+                                      GError        **error);
+typedef gboolean (* TestPrintFunc)   (QmiMessage     *message,
+                                      gsize           init_offset,
+                                      gsize          *offset,
+                                      GString        *printable,
+                                      GError        **error);
+typedef void     (* TestCompareFunc) (gconstpointer   a,
+                                      gconstpointer   b);
+
+static QmiMessage *
+test_codec_build_message (const QmiCodecField *field,
+                          gconstpointer        value,
+                          TestWriteFunc        write_unrolled)
+{
+    g_autoptr(QmiMessage) self = NULL;
+    g_autoptr(GError)     error = NULL;
+    gboolean              ret;
+    gsize                 init_offset;
+
+    self = qmi_message_new (QMI_SERVICE_DMS, 0x01, 0x02, 0xFFFF);
+
+    init_offset = qmi_message_tlv_write_init (self, TEST_TLV, &error);
+    g_assert_no_error (error);
+    g_assert (init_offset > 0);
+
+    if (field)
+        ret = qmi_codec_write (self, field, value, "Test", &error);
+    else
+        ret = write_unrolled (self, value, &error);
+    g_assert_no_error (error);
+    g_assert (ret);
+
+    ret = qmi_message_tlv_write_complete (self, init_offset, &error);
+    g_assert_no_error (error);
+    g_assert (ret);
+
+    return g_steal_pointer (&self);
+}
+
+static void
+test_codec_read_and_print (QmiMessage          *message,
+                           const QmiCodecField *field,
+                           gsize                value_size,
+                           TestReadFunc         read_unrolled,
+                           TestPrintFunc        print_unrolled,
+                           TestCompareFunc      compare,
+                           GDestroyNotify       clear)
+{
+    g_autoptr(GError)   error = NULL;
+    g_autofree gpointer unrolled_value = NULL;
+    g_autofree gpointer codec_value = NULL;
+    GString            *unrolled_printable;
+    GString            *codec_printable;
+    gboolean            ret;
+    gsize               init_offset;
+    gsize               unrolled_offset = 0;
+    gsize               codec_offset = 0;
+
+    init_offset = qmi_message_tlv_read_init (message, TEST_TLV, NULL, &error);
+    g_assert_no_error (error);
+    g_assert (init_offset > 0);
+
+    unrolled_value = g_malloc0 (value_size);
+    ret = read_unrolled (message, init_offset, &unrolled_offset, unrolled_value, &error);
+    g_assert_no_error (error);
+    g_assert (ret);
+    g_assert_cmpuint (qmi_message_tlv_read_remaining_size (message, init_offset, unrolled_offset), ==, 0);
+
+    codec_value = g_malloc0 (value_size);
+    ret = qmi_codec_read (message, init_offset, &codec_offset, field, codec_value, &error);
+    g_assert_no_error (error);
+    g_assert (ret);
+    g_assert_cmpuint (codec_offset, ==, unrolled_offset);
+
+    compare (unrolled_value, codec_value);
+
+    if (clear) {
+        clear (unrolled_value);
+        clear (codec_value);
+    }
+
+    unrolled_printable = g_string_new ("");
+    unrolled_offset = 0;
+    ret = print_unrolled (message, init_offset, &unrolled_offset, unrolled_printable, &error);
+    g_assert_no_error (error);
+    g_assert (ret);
+
+    codec_printable = g_string_new ("");
+    codec_offset = 0;
+    ret = qmi_codec_print (message, init_offset, &codec_offset, field, codec_printable, &error);
+    g_assert_no_error (error);
+    g_assert (ret);
+    g_assert_cmpuint (codec_offset, ==, unrolled_offset);
+
+    g_assert_cmpstr (codec_printable->str, ==, unrolled_printable->str);
+
+    g_string_free (unrolled_printable, TRUE);
+    g_string_free (codec_printable, TRUE);
+}
+
+static void
+test_codec_common (const QmiCodecField *field,
+                   gconstpointer        value,
+                   gsize                value_size,
+                   TestWriteFunc        write_unrolled,
+                   TestReadFunc         read_unrolled,
+                   TestPrintFunc        print_unrolled,
+                   TestCompareFunc      compare,
+                   GDestroyNotify       clear)
+{
+    g_autoptr(QmiMessage) unrolled_message = NULL;
+    g_autoptr(QmiMessage) codec_message = NULL;
+    gsize                 unrolled_length;
+    gsize                 codec_length;
+    const guint8         *unrolled_raw;
+    const guint8         *codec_raw;
+
+    /* Both writers must build the same message */
+    unrolled_message = test_codec_build_message (NULL, value, write_unrolled);
+    codec_message = test_codec_build_message (field, value, NULL);
+
+    unrolled_raw = qmi_message_get_raw (unrolled_message, &unrolled_length, NULL);
+    codec_raw = qmi_message_get_raw (codec_message, &codec_length, NULL);
+    g_assert_cmpuint (codec_length, ==, unrolled_length);
+    g_assert (memcmp (codec_raw, unrolled_raw, codec_length) == 0);
+
+    test_codec_read_and_print (unrolled_message, field, value_size, read_unrolled, print_unrolled, compare, clear);
+}
+
+/*****************************************************************************/
+
+typedef struct {
+    guint8   uint8;
+    gint8    int8;
+    gint16   int16;
+    guint32  uint32;
+    gint64   int64;
+    guint64  sized;
+    gint32   extended;
+    gboolean boolean;
+} TestIntegers;
+
+static const QmiCodecField test_integers_codec_members[] = {
+    {
+        .name                = "uint8",
+        .kind                = QMI_CODEC_KIND_INTEGER,
+        .format              = QMI_CODEC_FORMAT_GUINT8,
+        .value_size          = sizeof (guint8),
+        .offset              = G_STRUCT_OFFSET (TestIntegers, uint8),
+    },
+    {
+        .name                = "int8",
+        .kind                = QMI_CODEC_KIND_INTEGER,
+        .format              = QMI_CODEC_FORMAT_GINT8,
+        .value_size          = sizeof (gint8),
+        .offset              = G_STRUCT_OFFSET (TestIntegers, int8),
+    },
+    {
+        .name                = "int16",
+        .kind                = QMI_CODEC_KIND_INTEGER,
+        .format              = QMI_CODEC_FORMAT_GINT16,
+        .value_size          = sizeof (gint16),
+        .offset              = G_STRUCT_OFFSET (TestIntegers, int16),
+    },
+    {
+        .name                = "uint32",
+        .kind                = QMI_CODEC_KIND_INTEGER,
+        .format              = QMI_CODEC_FORMAT_GUINT32,
+        .endian              = QMI_ENDIAN_BIG,
+        .value_size          = sizeof (guint32),
+        .offset              = G_STRUCT_OFFSET (TestIntegers, uint32),
+    },
+    {
+        .name                = "int64",
+        .kind                = QMI_CODEC_KIND_INTEGER,
+        .format              = QMI_CODEC_FORMAT_GINT64,
+        .endian              = QMI_ENDIAN_BIG,
+        .value_size          = sizeof (gint64),
+        .offset              = G_STRUCT_OFFSET (TestIntegers, int64),
+    },
+    {
+        .name                = "sized",
+        .kind                = QMI_CODEC_KIND_SIZED_INTEGER,
+        .format              = QMI_CODEC_FORMAT_GUINT64,
+        .size                = 3,
+        .endian              = QMI_ENDIAN_BIG,
+        .value_size          = sizeof (guint64),
+        .offset              = G_STRUCT_OFFSET (TestIntegers, sized),
+    },
+    {
+        /* Signed byte in the stream, stored sign-extended in a wider value */
+        .name                = "extended",
+        .kind                = QMI_CODEC_KIND_INTEGER,
+        .format              = QMI_CODEC_FORMAT_GINT8,
+        .value_size          = sizeof (gint32),
+        .offset              = G_STRUCT_OFFSET (TestIntegers, extended),
+    },
+    {
+        .name                = "boolean",
+        .kind                = QMI_CODEC_KIND_INTEGER,
+        .format              = QMI_CODEC_FORMAT_GUINT8,
+        .value_size          = sizeof (gboolean),
+        .offset              = G_STRUCT_OFFSET (TestIntegers, boolean),
+        .print               = QMI_CODEC_PRINT_BOOLEAN,
+    },
+};
+
+static const QmiCodecField test_integers_codec = {
+    .kind                = QMI_CODEC_KIND_STRUCT,
+    .n_children          = G_N_ELEMENTS (test_integers_codec_members),
+    .children            = test_integers_codec_members,
+};
+
+static gboolean
+test_integers_write (QmiMessage     *self,
+                     gconstpointer   value,
+                     GError        **error)
+{
+    const TestIntegers *in = value;
+
+    return (qmi_message_tlv_write_guint8 (self, in->uint8, error) &&
+            qmi_message_tlv_write_gint8 (self, in->int8, error) &&
+            qmi_message_tlv_write_gint16 (self, QMI_ENDIAN_LITTLE, in->int16, error) &&
+            qmi_message_tlv_write_guint32 (self, QMI_ENDIAN_BIG, in->uint32, error) &&
+            qmi_message_tlv_write_gint64 (self, QMI_ENDIAN_BIG, in->int64, error) &&
+            qmi_message_tlv_write_sized_guint (self, 3, QMI_ENDIAN_BIG, in->sized, error) &&
+            qmi_message_tlv_write_gint8 (self, (gint8) in->extended, error) &&
+            qmi_message_tlv_write_guint8 (self, (guint8) in->boolean, error));
+}
+
+static gboolean
+test_integers_read (QmiMessage  *message,
+                    gsize        init_offset,
+                    gsize       *offset,
+                    gpointer     value,
+                    GError     **error)
+{
+    TestIntegers *out = value;
+    gint8         int8;
+    guint8        uint8;
+
+    if (!qmi_message_tlv_read_guint8 (message, init_offset, offset, &out->uint8, error) ||
+        !qmi_message_tlv_read_gint8 (message, init_offset, offset, &out->int8, error) ||
+        !qmi_message_tlv_read_gint16 (message, init_offset, offset, QMI_ENDIAN_LITTLE, &out->int16, error) ||
+        !qmi_message_tlv_read_guint32 (message, init_offset, offset, QMI_ENDIAN_BIG, &out->uint32, error) ||
+        !qmi_message_tlv_read_gint64 (message, init_offset, offset, QMI_ENDIAN_BIG, &out->int64, error) ||
+        !qmi_message_tlv_read_sized_guint (message, init_offset, offset, 3, QMI_ENDIAN_BIG, &out->sized, error) ||
+        !qmi_message_tlv_read_gint8 (message, init_offset, offset, &int8, error) ||
+        !qmi_message_tlv_read_guint8 (message, init_offset, offset, &uint8, error))
+        return FALSE;
+
+    out->extended = (gint32) int8;
+    out->boolean = (gboolean) uint8;
+    return TRUE;
+}
+
+static gboolean
+test_integers_print (QmiMessage  *message,
+                     gsize        init_offset,
+                     gsize       *offset,
+                     GString     *printable,
+                     GError     **error)
+{
+    TestIntegers value = { 0 };
+
+    if (!test_integers_read (message, init_offset, offset, &value, error))
+        return FALSE;
+
+    g_string_append_printf (printable,
+                            "[ uint8 = '%u' int8 = '%d' int16 = '%" G_GINT16_FORMAT "'"
+                            " uint32 = '%" G_GUINT32_FORMAT "' int64 = '%" G_GINT64_FORMAT "'"
+                            " sized = '%" G_GUINT64_FORMAT "' extended = '%d' boolean = '%s' ]",
+                            (guint) value.uint8, (gint) value.int8, value.int16,
+                            value.uint32, value.int64,
+                            value.sized, (gint) (gint8) value.extended, value.boolean ? "yes" : "no");
+    return TRUE;
+}
+
+static void
+test_integers_compare (gconstpointer a,
+                       gconstpointer b)
+{
+    const TestIntegers *integers_a = a;
+    const TestIntegers *integers_b = b;
+
+    g_assert_cmpuint (integers_a->uint8,    ==, integers_b->uint8);
+    g_assert_cmpint  (integers_a->int8,     ==, integers_b->int8);
+    g_assert_cmpint  (integers_a->int16,    ==, integers_b->int16);
+    g_assert_cmpuint (integers_a->uint32,   ==, integers_b->uint32);
+    g_assert_cmpint  (integers_a->int64,    ==, integers_b->int64);
+    g_assert_cmpuint (integers_a->sized,    ==, integers_b->sized);
+    g_assert_cmpint  (integers_a->extended, ==, integers_b->extended);
+    g_assert_cmpint  (integers_a->boolean,  ==, integers_b->boolean);
+}
+
+static void
+test_codec_integers (void)
+{
+    static const TestIntegers values[] = {
+        { 0xFE, -2,   -300,       0x01020304, -0x0102030405060708LL, 0x0A0B0C,  -5,       TRUE  },
+        { 0x00, 127,  G_MAXINT16, G_MAXUINT32, G_MININT64,           0xFFFFFF,  G_MININT8, FALSE },
+    };
+    guint i;
+
+    for (i = 0; i < G_N_ELEMENTS (values); i++)
+        test_codec_common (&test_integers_codec, &values[i], sizeof (TestIntegers),
+                           test_integers_write, test_integers_read, test_integers_print,
+                           test_integers_compare, NULL);
+}
+
+/*****************************************************************************/
+
+typedef struct {
+    gfloat  single;
+    gdouble twice;
+} TestFloats;
+
+static const QmiCodecField test_floats_codec_members[] = {
+    {
+        .name                = "single",
+        .kind                = QMI_CODEC_KIND_INTEGER,
+        .format              = QMI_CODEC_FORMAT_GFLOAT,
+        .value_size          = sizeof (gfloat),
+        .offset              = G_STRUCT_OFFSET (TestFloats, single),
+    },
+    {
+        .name                = "twice",
+        .kind                = QMI_CODEC_KIND_INTEGER,
+        .format              = QMI_CODEC_FORMAT_GDOUBLE,
+        .endian              = QMI_ENDIAN_BIG,
+        .value_size          = sizeof (gdouble),
+        .offset              = G_STRUCT_OFFSET (TestFloats, twice),
+    },
+};
+
+static const QmiCodecField test_floats_codec = {
+    .kind                = QMI_CODEC_KIND_STRUCT,
+    .n_children          = G_N_ELEMENTS (test_floats_codec_members),
+    .children            = test_floats_codec_members,
+};
+
+/* There are no floating point writers, so the raw values are written as
+ * integers */
+static gboolean
+test_floats_write (QmiMessage     *self,
+                   gconstpointer   value,
+                   GError        **error)
+{
+    const TestFloats *in = value;
+    guint32           single;
+    guint64           twice;
+
+    memcpy (&single, &in->single, sizeof (single));
+    memcpy (&twice, &in->twice, sizeof (twice));
+    return (qmi_message_tlv_write_guint32 (self, QMI_ENDIAN_LITTLE, single, error) &&
+            qmi_message_tlv_write_guint64 (self, QMI_ENDIAN_BIG, twice, error));
+}
+
+static gboolean
+test_floats_read (QmiMessage  *message,
+                  gsize        init_offset,
+                  gsize       *offset,
+                  gpointer     value,
+                  GError     **error)
+{
+    TestFloats *out = value;
+
+    return (qmi_message_tlv_read_gfloat_endian (message, init_offset, offset, QMI_ENDIAN_LITTLE, &out->single, error) &&
+            qmi_message_tlv_read_gdouble (message, init_offset, offset, QMI_ENDIAN_BIG, &out->twice, error));
+}
+
+static gboolean
+test_floats_print (QmiMessage  *message,
+                   gsize        init_offset,
+                   gsize       *offset,
+                   GString     *printable,
+                   GError     **error)
+{
+    TestFloats value = { 0 };
+
+    if (!test_floats_read (message, init_offset, offset, &value, error))
+        return FALSE;
+
+    g_string_append_printf (printable, "[ single = '%lf' twice = '%lf' ]", (gdouble) value.single, value.twice);
+    return TRUE;
+}
+
+static void
+test_floats_compare (gconstpointer a,
+                     gconstpointer b)
+{
+    const TestFloats *floats_a = a;
+    const TestFloats *floats_b = b;
+
+    g_assert_cmpfloat (floats_a->single, ==, floats_b->single);
+    g_assert_cmpfloat (floats_a->twice,  ==, floats_b->twice);
+}
+
+static void
+test_codec_floats (void)
+{
+    static const TestFloats value = { 1.5f, -2.25 };
+    g_autoptr(QmiMessage)   message = NULL;
+    g_autoptr(QmiMessage)   codec_message = NULL;
+    g_autoptr(GError)       error = NULL;
+    gboolean                ret;
+
+    message = test_codec_build_message (NULL, &value, test_floats_write);
+    test_codec_read_and_print (message, &test_floats_codec, sizeof (TestFloats),
+                               test_floats_read, test_floats_print,
+                               test_floats_compare, NULL);
+
+    /* Writing floating point numbers is unsupported, as in the unrolled code */
+    codec_message = qmi_message_new (QMI_SERVICE_DMS, 0x01, 0x02, 0xFFFF);
+    ret = qmi_codec_write (codec_message, &test_floats_codec, &value, "Test", &error);
+    g_assert_error (error, QMI_CORE_ERROR, QMI_CORE_ERROR_UNSUPPORTED);
+    g_assert (!ret);
+}
+
+/*****************************************************************************/
+
+typedef struct {
+    gchar  inline_fixed[5];
+    gchar *fixed;
+    gchar *prefixed8;
+    gchar *prefixed16;
+    gchar *remaining;
+} TestStrings;
+
+static const QmiCodecField test_strings_codec_members[] = {
+    {
+        .name                = "inline_fixed",
+        .kind                = QMI_CODEC_KIND_STRING,
+        .size                = 4,
+        .flags               = QMI_CODEC_FLAG_INLINE,
+        .offset              = G_STRUCT_OFFSET (TestStrings, inline_fixed),
+    },
+    {
+        .name                = "fixed",
+        .kind                = QMI_CODEC_KIND_STRING,
+        .size                = 3,
+        .offset              = G_STRUCT_OFFSET (TestStrings, fixed),
+    },
+    {
+        .name                = "prefixed8",
+        .kind                = QMI_CODEC_KIND_STRING,
+        .n_size_prefix_bytes = 1,
+        .max_size            = 8,
+        .offset              = G_STRUCT_OFFSET (TestStrings, prefixed8),
+    },
+    {
+        .name                = "prefixed16",
+        .kind                = QMI_CODEC_KIND_STRING,
+        .n_size_prefix_bytes = 2,
+        .offset              = G_STRUCT_OFFSET (TestStrings, prefixed16),
+    },
+    {
+        .name                = "remaining",
+        .kind                = QMI_CODEC_KIND_STRING,
+        .offset              = G_STRUCT_OFFSET (TestStrings, remaining),
+    },
+};
+
+static const QmiCodecField test_strings_codec = {
+    .kind                = QMI_CODEC_KIND_STRUCT,
+    .n_children          = G_N_ELEMENTS (test_strings_codec_members),
+    .children            = test_strings_codec_members,
+};
+
+static gboolean
+test_strings_write (QmiMessage     *self,
+                    gconstpointer   value,
+                    GError        **error)
+{
+    const TestStrings *in = value;
+
+    return (qmi_message_tlv_write_string (self, 0, in->inline_fixed, 4, error) &&
+            qmi_message_tlv_write_string (self, 0, in->fixed, 3, error) &&
+            qmi_message_tlv_write_string (self, 1, in->prefixed8, -1, error) &&
+            qmi_message_tlv_write_string (self, 2, in->prefixed16, -1, error) &&
+            qmi_message_tlv_write_string (self, 0, in->remaining, -1, error));
+}
+
+static gboolean
+test_strings_read (QmiMessage  *message,
+                   gsize        init_offset,
+                   gsize       *offset,
+                   gpointer     value,
+                   GError     **error)
+{
+    TestStrings *out = value;
+
+    if (!qmi_message_tlv_read_fixed_size_string (message, init_offset, offset, 4, out->inline_fixed, error))
+        return FALSE;
+    out->inline_fixed[4] = '\0';
+
+    out->fixed = g_malloc (4);
+    if (!qmi_message_tlv_read_fixed_size_string (message, init_offset, offset, 3, out->fixed, error))
+        return FALSE;
+    out->fixed[3] = '\0';
+
+    return (qmi_message_tlv_read_string (message, init_offset, offset, 1, 8, &out->prefixed8, error) &&
+            qmi_message_tlv_read_string (message, init_offset, offset, 2, 0, &out->prefixed16, error) &&
+            qmi_message_tlv_read_string (message, init_offset, offset, 0, 0, &out->remaining, error));
+}
+
+static void
+test_strings_clear (gpointer value)
+{
+    TestStrings *strings = value;
+
+    g_free (strings->fixed);
+    g_free (strings->prefixed8);
+    g_free (strings->prefixed16);
+    g_free (strings->remaining);
+}
+
+static gboolean
+test_strings_print (QmiMessage  *message,
+                    gsize        init_offset,
+                    gsize       *offset,
+                    GString     *printable,
+                    GError     **error)
+{
+    TestStrings value = { { 0 } };
+    gboolean    ret;
+
+    ret = test_strings_read (message, init_offset, offset, &value, error);
+    if (ret)
+        g_string_append_printf (printable,
+                                "[ inline_fixed = '%s' fixed = '%s' prefixed8 = '%s' prefixed16 = '%s' remaining = '%s' ]",
+                                value.inline_fixed, value.fixed, value.prefixed8, value.prefixed16, value.remaining);
+    test_strings_clear (&value);
+    return ret;
+}
+
+static void
+test_strings_compare (gconstpointer a,
+                      gconstpointer b)
+{
+    const TestStrings *strings_a = a;
+    const TestStrings *strings_b = b;
+
+    g_assert_cmpstr (strings_a->inline_fixed, ==, strings_b->inline_fixed);
+    g_assert_cmpstr (strings_a->fixed,        ==, strings_b->fixed);
+    g_assert_cmpstr (strings_a->prefixed8,    ==, strings_b->prefixed8);
+    g_assert_cmpstr (strings_a->prefixed16,   ==, strings_b->prefixed16);
+    g_assert_cmpstr (strings_a->remaining,    ==, strings_b->remaining);
+}
+
+static void
+test_codec_strings (void)
+{
+    TestStrings value = {
+        .inline_fixed = "abcd",
+        .fixed        = (gchar *) "xyz",
+        .prefixed8    = (gchar *) "12345678",
+        .prefixed16   = (gchar *) "a longer string",
+        .remaining    = (gchar *) "the rest",
+    };
+
+    test_codec_common (&test_strings_codec, &value, sizeof (TestStrings),
+                       test_strings_write, test_strings_read, test_strings_print,
+                       test_strings_compare, test_strings_clear);
+
+    /* Empty strings */
+    value.prefixed8 = (gchar *) "";
+    value.prefixed16 = (gchar *) "";
+    value.remaining = (gchar *) "";
+    test_codec_common (&test_strings_codec, &value, sizeof (TestStrings),
+                       test_strings_write, test_strings_read, test_strings_print,
+                       test_strings_compare, test_strings_clear);
+}
+
+/*****************************************************************************/
+
+typedef struct {
+    guint8  sequence;
+    GArray *sequenced;
+    GArray *fixed;
+    GArray *wide;
+} TestArrays;
+
+static const QmiCodecField test_arrays_codec_sequenced_element[] = {
+    {
+        .kind                = QMI_CODEC_KIND_INTEGER,
+        .format              = QMI_CODEC_FORMAT_GUINT16,
+        .endian              = QMI_ENDIAN_BIG,
+        .value_size          = sizeof (guint16),
+    },
+};
+
+static const QmiCodecField test_arrays_codec_fixed_element[] = {
+    {
+        .kind                = QMI_CODEC_KIND_INTEGER,
+        .format              = QMI_CODEC_FORMAT_GINT32,
+        .value_size          = sizeof (gint32),
+    },
+};
+
+/* Single bytes stored as wider values, so not read as an integer array */
+static const QmiCodecField test_arrays_codec_wide_element[] = {
+    {
+        .kind                = QMI_CODEC_KIND_INTEGER,
+        .format              = QMI_CODEC_FORMAT_GUINT8,
+        .value_size          = sizeof (guint32),
+    },
+};
+
+static const QmiCodecField test_arrays_codec_members[] = {
+    {
+        .name                = "sequenced",
+        .kind                = QMI_CODEC_KIND_ARRAY,
+        .n_size_prefix_bytes = 1,
+        .flags               = QMI_CODEC_FLAG_SEQUENCE,
+        .sequence_format     = QMI_CODEC_FORMAT_GUINT8,
+        .sequence_offset     = G_STRUCT_OFFSET (TestArrays, sequence),
+        .offset              = G_STRUCT_OFFSET (TestArrays, sequenced),
+        .n_children          = 1,
+        .children            = test_arrays_codec_sequenced_element,
+    },
+    {
+        .name                = "fixed",
+        .kind                = QMI_CODEC_KIND_ARRAY,
+        .size                = 3,
+        .offset              = G_STRUCT_OFFSET (TestArrays, fixed),
+        .n_children          = 1,
+        .children            = test_arrays_codec_fixed_element,
+    },
+    {
+        .name                = "wide",
+        .kind                = QMI_CODEC_KIND_ARRAY,
+        .n_size_prefix_bytes = 2,
+        .offset              = G_STRUCT_OFFSET (TestArrays, wide),
+        .n_children          = 1,
+        .children            = test_arrays_codec_wide_element,
+    },
+};
+
+static const QmiCodecField test_arrays_codec = {
+    .kind                = QMI_CODEC_KIND_STRUCT,
+    .n_children          = G_N_ELEMENTS (test_arrays_codec_members),
+    .children            = test_arrays_codec_members,
+};
+
+static gboolean
+test_arrays_write (QmiMessage     *self,
+                   gconstpointer   value,
+                   GError        **error)
+{
+    const TestArrays *in = value;
+    guint             i;
+
+    if (!qmi_message_tlv_write_guint8 (self, (guint8) in->sequenced->len, error) ||
+        !qmi_message_tlv_write_guint8 (self, in->sequence, error))
+        return FALSE;
+    for (i = 0; i < in->sequenced->len; i++) {
+        if (!qmi_message_tlv_write_guint16 (self, QMI_ENDIAN_BIG, g_array_index (in->sequenced, guint16, i), error))
+            return FALSE;
+    }
+
+    for (i = 0; i < in->fixed->len; i++) {
+        if (!qmi_message_tlv_write_gint32 (self, QMI_ENDIAN_LITTLE, g_array_index (in->fixed, gint32, i), error))
+            return FALSE;
+    }
+
+    if (!qmi_message_tlv_write_guint16 (self, QMI_ENDIAN_LITTLE, (guint16) in->wide->len, error))
+        return FALSE;
+    for (i = 0; i < in->wide->len; i++) {
+        if (!qmi_message_tlv_write_guint8 (self, (guint8) g_array_index (in->wide, guint32, i), error))
+            return FALSE;
+    }
+
+    return TRUE;
+}
+
+static gboolean
+test_arrays_read (QmiMessage  *message,
+                  gsize        init_offset,
+                  gsize       *offset,
+                  gpointer     value,
+                  GError     **error)
+{
+    TestArrays *out = value;
+    guint8      n_items8;
+    guint16     n_items16;
+    guint       i;
+
+    if (!qmi_message_tlv_read_guint8 (message, init_offset, offset, &n_items8, error) ||
+        !qmi_message_tlv_read_guint8 (message, init_offset, offset, &out->sequence, error))
+        return FALSE;
+    out->sequenced = g_array_sized_new (FALSE, FALSE, sizeof (guint16), n_items8);
+    for (i = 0; i < n_items8; i++) {
+        guint16 aux;
+
+        if (!qmi_message_tlv_read_guint16 (message, init_offset, offset, QMI_ENDIAN_BIG, &aux, error))
+            return FALSE;
+        g_array_insert_val (out->sequenced, i, aux);
+    }
+
+    out->fixed = g_array_sized_new (FALSE, FALSE, sizeof (gint32), 3);
+    for (i = 0; i < 3; i++) {
+        gint32 aux;
+
+        if (!qmi_message_tlv_read_gint32 (message, init_offset, offset, QMI_ENDIAN_LITTLE, &aux, error))
+            return FALSE;
+        g_array_insert_val (out->fixed, i, aux);
+    }
+
+    if (!qmi_message_tlv_read_guint16 (message, init_offset, offset, QMI_ENDIAN_LITTLE, &n_items16, error))
+        return FALSE;
+    out->wide = g_array_sized_new (FALSE, FALSE, sizeof (guint32), n_items16);
+    for (i = 0; i < n_items16; i++) {
+        guint8  tmp;
+        guint32 aux;
+
+        if (!qmi_message_tlv_read_guint8 (message, init_offset, offset, &tmp, error))
+            return FALSE;
+        aux = (guint32) tmp;
+        g_array_insert_val (out->wide, i, aux);
+    }
+
+    return TRUE;
+}
+
+static void
+test_arrays_clear (gpointer value)
+{
+    TestArrays *arrays = value;
+
+    g_clear_pointer (&arrays->sequenced, g_array_unref);
+    g_clear_pointer (&arrays->fixed,     g_array_unref);
+    g_clear_pointer (&arrays->wide,      g_array_unref);
+}
+
+static gboolean
+test_arrays_print (QmiMessage  *message,
+                   gsize        init_offset,
+                   gsize       *offset,
+                   GString     *printable,
+                   GError     **error)
+{
+    TestArrays value = { 0 };
+    guint      i;
+
+    if (!test_arrays_read (message, init_offset, offset, &value, error)) {
+        test_arrays_clear (&value);
+        return FALSE;
+    }
+
+    g_string_append_printf (printable, "[ sequenced = '[[Seq:%u]] {", (guint) value.sequence);
+    for (i = 0; i < value.sequenced->len; i++)
+        g_string_append_printf (printable, " [%u] = '%" G_GUINT16_FORMAT " '", i, g_array_index (value.sequenced, guint16, i));
+    g_string_append (printable, "}' fixed = '{");
+    for (i = 0; i < value.fixed->len; i++)
+        g_string_append_printf (printable, " [%u] = '%" G_GINT32_FORMAT " '", i, g_array_index (value.fixed, gint32, i));
+    g_string_append (printable, "}' wide = '{");
+    for (i = 0; i < value.wide->len; i++)
+        g_string_append_printf (printable, " [%u] = '%u '", i, g_array_index (value.wide, guint32, i));
+    g_string_append (printable, "}' ]");
+
+    test_arrays_clear (&value);
+    return TRUE;
+}
+
+static void
+test_cmparray (GArray *a,
+               GArray *b)
+{
+    g_assert_cmpuint (g_array_get_element_size (a), ==, g_array_get_element_size (b));
+    g_assert_cmpuint (a->len, ==, b->len);
+    if (a->len > 0)
+        g_assert (memcmp (a->data, b->data, a->len * g_array_get_element_size (a)) == 0);
+}
+
+static void
+test_arrays_compare (gconstpointer a,
+                     gconstpointer b)
+{
+    const TestArrays *arrays_a = a;
+    const TestArrays *arrays_b = b;
+
+    g_assert_cmpuint (arrays_a->sequence, ==, arrays_b->sequence);
+    test_cmparray (arrays_a->sequenced, arrays_b->sequenced);
+    test_cmparray (arrays_a->fixed,     arrays_b->fixed);
+    test_cmparray (arrays_a->wide,      arrays_b->wide);
+}
+
+static void
+test_codec_arrays (void)
+{
+    static const guint16 sequenced[] = { 0x0102, 0xA1B2, 0xFFFE };
+    static const gint32  fixed[]     = { -1, 0, G_MAXINT32 };
+    static const guint32 wide[]      = { 0, 1, 0x7F, 0xFF };
+    TestArrays           value = { 0 };
+
+    value.sequence = 0x42;
+    value.sequenced = g_array_new (FALSE, FALSE, sizeof (guint16));
+    g_array_append_vals (value.sequenced, sequenced, G_N_ELEMENTS (sequenced));
+    value.fixed = g_array_new (FALSE, FALSE, sizeof (gint32));
+    g_array_append_vals (value.fixed, fixed, G_N_ELEMENTS (fixed));
+    value.wide = g_array_new (FALSE, FALSE, sizeof (guint32));
+    g_array_append_vals (value.wide, wide, G_N_ELEMENTS (wide));
+
+    test_codec_common (&test_arrays_codec, &value, sizeof (TestArrays),
+                       test_arrays_write, test_arrays_read, test_arrays_print,
+                       test_arrays_compare, test_arrays_clear);
+
+    /* Empty arrays */
+    g_array_set_size (value.sequenced, 0);
+    g_array_set_size (value.wide, 0);
+    test_codec_common (&test_arrays_codec, &value, sizeof (TestArrays),
+                       test_arrays_write, test_arrays_read, test_arrays_print,
+                       test_arrays_compare, test_arrays_clear);
+
+    test_arrays_clear (&value);
+}
+
+/*****************************************************************************/
+
+typedef struct {
+    guint16  mcc;
+    gchar   *name;
+    guint16  mnc;
+} TestElement;
+
+typedef struct {
+    GArray *elements;
+} TestStructArray;
+
+static void
+test_element_clear (TestElement *element)
+{
+    g_free (element->name);
+}
+
+static const QmiCodecField test_struct_array_codec_element_members[] = {
+    {
+        .name                = "mcc",
+        .kind                = QMI_CODEC_KIND_INTEGER,
+        .format              = QMI_CODEC_FORMAT_GUINT16,
+        .value_size          = sizeof (guint16),
+        .offset              = G_STRUCT_OFFSET (TestElement, mcc),
+    },
+    {
+        .name                = "name",
+        .kind                = QMI_CODEC_KIND_STRING,
+        .n_size_prefix_bytes = 1,
+        .offset              = G_STRUCT_OFFSET (TestElement, name),
+    },
+    {
+        .name                = "mnc",
+        .kind                = QMI_CODEC_KIND_INTEGER,
+        .format              = QMI_CODEC_FORMAT_GUINT16,
+        .value_size          = sizeof (guint16),
+        .offset              = G_STRUCT_OFFSET (TestElement, mnc),
+    },
+};
+
+static const QmiCodecField test_struct_array_codec_element[] = {
+    {
+        .kind                = QMI_CODEC_KIND_STRUCT,
+        .n_children          = G_N_ELEMENTS (test_struct_array_codec_element_members),
+        .children            = test_struct_array_codec_element_members,
+        .value_size          = sizeof (TestElement),
+    },
+};
+
+static const QmiCodecField test_struct_array_codec = {
+    .kind                = QMI_CODEC_KIND_ARRAY,
+    .n_size_prefix_bytes = 1,
+    .offset              = G_STRUCT_OFFSET (TestStructArray, elements),
+    .n_children          = 1,
+    .children            = test_struct_array_codec_element,
+    .helper              = (GCallback) test_element_clear,
+};
+
+static gboolean
+test_struct_array_write (QmiMessage     *self,
+                         gconstpointer   value,
+                         GError        **error)
+{
+    const TestStructArray *in = value;
+    guint                  i;
+
+    if (!qmi_message_tlv_write_guint8 (self, (guint8) in->elements->len, error))
+        return FALSE;
+
+    for (i = 0; i < in->elements->len; i++) {
+        TestElement *element;
+
+        element = &g_array_index (in->elements, TestElement, i);
+        if (!qmi_message_tlv_write_guint16 (self, QMI_ENDIAN_LITTLE, element->mcc, error) ||
+            !qmi_message_tlv_write_string (self, 1, element->name, -1, error) ||
+            !qmi_message_tlv_write_guint16 (self, QMI_ENDIAN_LITTLE, element->mnc, error))
+            return FALSE;
+    }
+
+    return TRUE;
+}
+
+static gboolean
+test_struct_array_read (QmiMessage  *message,
+                        gsize        init_offset,
+                        gsize       *offset,
+                        gpointer     value,
+                        GError     **error)
+{
+    TestStructArray *out = value;
+    guint8           n_items;
+    guint            i;
+
+    if (!qmi_message_tlv_read_guint8 (message, init_offset, offset, &n_items, error))
+        return FALSE;
+
+    out->elements = g_array_sized_new (FALSE, FALSE, sizeof (TestElement), n_items);
+    g_array_set_clear_func (out->elements, (GDestroyNotify) test_element_clear);
+
+    for (i = 0; i < n_items; i++) {
+        TestElement aux = { 0 };
+
+        if (!qmi_message_tlv_read_guint16 (message, init_offset, offset, QMI_ENDIAN_LITTLE, &aux.mcc, error) ||
+            !qmi_message_tlv_read_string (message, init_offset, offset, 1, 0, &aux.name, error) ||
+            !qmi_message_tlv_read_guint16 (message, init_offset, offset, QMI_ENDIAN_LITTLE, &aux.mnc, error)) {
+            test_element_clear (&aux);
+            return FALSE;
+        }
+        g_array_insert_val (out->elements, i, aux);
+    }
+
+    return TRUE;
+}
+
+static void
+test_struct_array_clear (gpointer value)
+{
+    TestStructArray *struct_array = value;
+
+    g_clear_pointer (&struct_array->elements, g_array_unref);
+}
+
+static gboolean
+test_struct_array_print (QmiMessage  *message,
+                         gsize        init_offset,
+                         gsize       *offset,
+                         GString     *printable,
+                         GError     **error)
+{
+    TestStructArray value = { 0 };
+    guint           i;
+
+    if (!test_struct_array_read (message, init_offset, offset, &value, error)) {
+        test_struct_array_clear (&value);
+        return FALSE;
+    }
+
+    g_string_append (printable, "{");
+    for (i = 0; i < value.elements->len; i++) {
+        TestElement *element;
+
+        element = &g_array_index (value.elements, TestElement, i);
+        g_string_append_printf (printable,
+                                " [%u] = '[ mcc = '%" G_GUINT16_FORMAT "' name = '%s' mnc = '%" G_GUINT16_FORMAT "' ] '",
+                                i, element->mcc, element->name, element->mnc);
+    }
+    g_string_append (printable, "}");
+
+    test_struct_array_clear (&value);
+    return TRUE;
+}
+
+static void
+test_struct_array_compare (gconstpointer a,
+                           gconstpointer b)
+{
+    const TestStructArray *struct_array_a = a;
+    const TestStructArray *struct_array_b = b;
+    guint                  i;
+
+    g_assert_cmpuint (struct_array_a->elements->len, ==, struct_array_b->elements->len);
+    for (i = 0; i < struct_array_a->elements->len; i++) {
+        TestElement *element_a;
+        TestElement *element_b;
+
+        element_a = &g_array_index (struct_array_a->elements, TestElement, i);
+        element_b = &g_array_index (struct_array_b->elements, TestElement, i);
+        g_assert_cmpuint (element_a->mcc, ==, element_b->mcc);
+        g_assert_cmpstr  (element_a->name, ==, element_b->name);
+        g_assert_cmpuint (element_a->mnc, ==, element_b->mnc);
+    }
+}
+
+static void
+test_codec_struct_array (void)
+{
+    TestElement     elements[] = {
+        { 214, (gchar *) "first",  3 },
+        { 310, (gchar *) "",       260 },
+        { 1,   (gchar *) "third",  G_MAXUINT16 },
+    };
+    TestStructArray value = { 0 };
+
+    value.elements = g_array_new (FALSE, FALSE, sizeof (TestElement));
+    g_array_append_vals (value.elements, elements, G_N_ELEMENTS (elements));
+
+    test_codec_common (&test_struct_array_codec, &value, sizeof (TestStructArray),
+                       test_struct_array_write, test_struct_array_read, test_struct_array_print,
+                       test_struct_array_compare, test_struct_array_clear);
+
+    g_array_unref (value.elements);
+}
+
+static void
+test_codec_struct_array_partial (void)
+{
+    g_autoptr(QmiMessage) message = NULL;
+    g_autoptr(GError)     unrolled_error = NULL;
+    g_autoptr(GError)     codec_error = NULL;
+    g_autoptr(GError)     error = NULL;
+    TestStructArray       unrolled_value = { 0 };
+    TestStructArray       codec_value = { 0 };
+    TestElement          *element;
+    gboolean              ret;
+    gsize                 init_offset;
+    gsize                 unrolled_offset = 0;
+    gsize                 codec_offset = 0;
+
+    /* Two elements announced, but the second one is missing its last field
+     * after its string has already been read */
+    message = qmi_message_new (QMI_SERVICE_DMS, 0x01, 0x02, 0xFFFF);
+    init_offset = qmi_message_tlv_write_init (message, TEST_TLV, &error);
+    g_assert_no_error (error);
+    g_assert (init_offset > 0);
+    ret = (qmi_message_tlv_write_guint8 (message, 2, &error) &&
+           qmi_message_tlv_write_guint16 (message, QMI_ENDIAN_LITTLE, 214, &error) &&
+           qmi_message_tlv_write_string (message, 1, "first", -1, &error) &&
+           qmi_message_tlv_write_guint16 (message, QMI_ENDIAN_LITTLE, 3, &error) &&
+           qmi_message_tlv_write_guint16 (message, QMI_ENDIAN_LITTLE, 310, &error) &&
+           qmi_message_tlv_write_string (message, 1, "second", -1, &error) &&
+           qmi_message_tlv_write_guint8 (message, 0xFF, &error));
+    g_assert_no_error (error);
+    g_assert (ret);
+    ret = qmi_message_tlv_write_complete (message, init_offset, &error);
+    g_assert_no_error (error);
+    g_assert (ret);
+
+    init_offset = qmi_message_tlv_read_init (message, TEST_TLV, NULL, &error);
+    g_assert_no_error (error);
+    g_assert (init_offset > 0);
+
+    ret = test_struct_array_read (message, init_offset, &unrolled_offset, &unrolled_value, &unrolled_error);
+    g_assert (unrolled_error);
+    g_assert (!ret);
+
+    ret = qmi_codec_read (message, init_offset, &codec_offset, &test_struct_array_codec, &codec_value, &codec_error);
+    g_assert_error (codec_error, unrolled_error->domain, unrolled_error->code);
+    g_assert (!ret);
+
+    /* The unrolled code only adds fully read elements, while the codec reads
+     * them in place, so the partial one is kept in the array and must be
+     * cleared along with it */
+    g_assert_cmpuint (unrolled_value.elements->len, ==, 1);
+    g_assert_cmpuint (codec_value.elements->len, ==, 2);
+    element = &g_array_index (codec_value.elements, TestElement, 0);
+    g_assert_cmpuint (element->mcc, ==, 214);
+    g_assert_cmpstr  (element->name, ==, "first");
+    g_assert_cmpuint (element->mnc, ==, 3);
+    element = &g_array_index (codec_value.elements, TestElement, 1);
+    g_assert_cmpuint (element->mcc, ==, 310);
+    g_assert_cmpstr  (element->name, ==, "second");
+    g_assert_cmpuint (element->mnc, ==, 0);
+
+    test_struct_array_clear (&unrolled_value);
+    test_struct_array_clear (&codec_value);
+}
+
+/*****************************************************************************/
+
+int main (int argc, char **argv)
+{
+    g_test_init (&argc, &argv, NULL);
+
+    g_test_add_func ("/libqmi-glib/codec/integers",             test_codec_integers);
+    g_test_add_func ("/libqmi-glib/codec/floats",               test_codec_floats);
+    g_test_add_func ("/libqmi-glib/codec/strings",              test_codec_strings);
+    g_test_add_func ("/libqmi-glib/codec/arrays",               test_codec_arrays);
+    g_test_add_func ("/libqmi-glib/codec/struct-array",         test_codec_struct_array);
+    g_test_add_func ("/libqmi-glib/codec/struct-array-partial", test_codec_struct_array_partial);
+
+    return g_test_run ();
+}
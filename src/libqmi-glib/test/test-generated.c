@@ -910,6 +910,123 @@ test_generated_nas_get_serving_system (TestFixture *fixture)
 
 #endif /* HAVE_QMI_MESSAGE_NAS_GET_SERVING_SYSTEM */
 
+/*****************************************************************************/
+/* NAS Serving System indication */
+
+#if defined HAVE_QMI_MESSAGE_NAS_RESET && defined HAVE_QMI_INDICATION_NAS_SERVING_SYSTEM
+
+typedef struct {
+    TestFixture *fixture;
+    gboolean     reset_done;
+    guint        n_indications;
+    guint64      changed_fields[2];
+} NasServingSystemIndicationContext;
+
+static void
+nas_serving_system_indication_check_done (NasServingSystemIndicationContext *ctx)
+{
+    if (ctx->reset_done && ctx->n_indications == G_N_ELEMENTS (ctx->changed_fields))
+        test_fixture_loop_stop (ctx->fixture);
+}
+
+static void
+nas_serving_system_indication_cb (QmiClientNas                        *client,
+                                  QmiIndicationNasServingSystemOutput *output,
+                                  NasServingSystemIndicationContext   *ctx)
+{
+    g_assert_cmpuint (ctx->n_indications, <, G_N_ELEMENTS (ctx->changed_fields));
+    ctx->changed_fields[ctx->n_indications++] = qmi_indication_nas_serving_system_output_get_changed_fields (output);
+    nas_serving_system_indication_check_done (ctx);
+}
+
+static void
+nas_reset_ready (QmiClientNas                      *client,
+                 GAsyncResult                      *res,
+                 NasServingSystemIndicationContext *ctx)
+{
+    QmiMessageNasResetOutput *output;
+    GError *error = NULL;
+    gboolean st;
+
+    output = qmi_client_nas_reset_finish (client, res, &error);
+    g_assert_no_error (error);
+    g_assert (output);
+
+    st = qmi_message_nas_reset_output_get_result (output, &error);
+    g_assert_no_error (error);
+    g_assert (st);
+
+    qmi_message_nas_reset_output_unref (output);
+
+    ctx->reset_done = TRUE;
+    nas_serving_system_indication_check_done (ctx);
+}
+
+static void
+test_generated_nas_serving_system_indication_changed_fields (TestFixture *fixture)
+{
+    NasServingSystemIndicationContext ctx = { 0 };
+    gulong indication_id;
+    guint8 expected[] = {
+        0x01,
+        0x0C, 0x00, 0x00, 0x03, 0x01,
+        0x00, 0x01, 0x00, 0x00, 0x00, 0x00, 0x00
+    };
+    /* The response is followed by two indications:
+     *  - Serving System, Roaming Indicator 'off' and Current PLMN 214/03 'ABC'
+     *  - Same Serving System, Roaming Indicator 'on' and LAC 0x1234
+     */
+    guint8 response[] = {
+        0x01,
+        0x13, 0x00, 0x80, 0x03, 0x01,
+        0x02, 0x01, 0x00, 0x00, 0x00, 0x07, 0x00, 0x02,
+        0x04, 0x00, 0x00, 0x00, 0x00, 0x00,
+        0x01,
+        0x24, 0x00, 0x80, 0x03, 0x01,
+        0x04, 0x00, 0x00, 0x24, 0x00, 0x18, 0x00, 0x01,
+        0x06, 0x00, 0x01, 0x01, 0x01, 0x02, 0x01, 0x08,
+        0x10, 0x01, 0x00, 0x01, 0x12, 0x08, 0x00, 0xD6,
+        0x00, 0x03, 0x00, 0x03, 0x41, 0x42, 0x43,
+        0x01,
+        0x1E, 0x00, 0x80, 0x03, 0x01,
+        0x04, 0x00, 0x00, 0x24, 0x00, 0x12, 0x00, 0x01,
+        0x06, 0x00, 0x01, 0x01, 0x01, 0x02, 0x01, 0x08,
+        0x10, 0x01, 0x00, 0x00, 0x1D, 0x02, 0x00, 0x34,
+        0x12
+    };
+
+    ctx.fixture = fixture;
+    indication_id = g_signal_connect (fixture->service_info[QMI_SERVICE_NAS].client,
+                                      "serving-system",
+                                      G_CALLBACK (nas_serving_system_indication_cb),
+                                      &ctx);
+
+    test_port_context_set_command (fixture->ctx,
+                                   expected, G_N_ELEMENTS (expected),
+                                   response, G_N_ELEMENTS (response),
+                                   fixture->service_info[QMI_SERVICE_NAS].transaction_id++);
+
+    qmi_client_nas_reset (QMI_CLIENT_NAS (fixture->service_info[QMI_SERVICE_NAS].client), NULL, 3, NULL,
+                          (GAsyncReadyCallback) nas_reset_ready,
+                          &ctx);
+
+    test_fixture_loop_run (fixture);
+
+    g_signal_handler_disconnect (fixture->service_info[QMI_SERVICE_NAS].client, indication_id);
+
+    /* All fields given in the first indication are new */
+    g_assert_cmphex (ctx.changed_fields[0], ==, (QMI_INDICATION_NAS_SERVING_SYSTEM_OUTPUT_CHANGED_SERVING_SYSTEM |
+                                                 QMI_INDICATION_NAS_SERVING_SYSTEM_OUTPUT_CHANGED_ROAMING_INDICATOR |
+                                                 QMI_INDICATION_NAS_SERVING_SYSTEM_OUTPUT_CHANGED_CURRENT_PLMN));
+    /* The roaming indicator changed, the current PLMN went away and the LAC
+     * is new, while the serving system is the same */
+    g_assert_cmphex (ctx.changed_fields[1], ==, (QMI_INDICATION_NAS_SERVING_SYSTEM_OUTPUT_CHANGED_ROAMING_INDICATOR |
+                                                 QMI_INDICATION_NAS_SERVING_SYSTEM_OUTPUT_CHANGED_CURRENT_PLMN |
+                                                 QMI_INDICATION_NAS_SERVING_SYSTEM_OUTPUT_CHANGED_LAC_3GPP));
+}
+
+#endif /* HAVE_QMI_MESSAGE_NAS_RESET && HAVE_QMI_INDICATION_NAS_SERVING_SYSTEM */
+
 /*****************************************************************************/
 /* NAS Get System Info */
 
@@ -1070,6 +1187,170 @@ test_generated_nas_get_system_info (TestFixture *fixture)
 
 #endif
 
+/*****************************************************************************/
+/* NAS Get Signal Info parse into */
+
+#if defined HAVE_QMI_MESSAGE_NAS_GET_SIGNAL_INFO
+
+static QmiMessage *
+nas_get_signal_info_response_new (const guint8 *raw,
+                                  gsize         raw_length)
+{
+    GByteArray *buffer;
+    QmiMessage *message;
+    GError *error = NULL;
+
+    buffer = g_byte_array_append (g_byte_array_sized_new (raw_length), raw, raw_length);
+    message = qmi_message_new_from_raw (buffer, &error);
+    g_assert_no_error (error);
+    g_assert (message);
+    g_assert_cmpuint (buffer->len, ==, 0);
+    g_byte_array_unref (buffer);
+
+    return message;
+}
+
+static void
+test_generated_nas_get_signal_info_parse_into (void)
+{
+    QmiMessageNasGetSignalInfoResponse out;
+    QmiMessage *message;
+    GError *error = NULL;
+    gboolean st;
+    const guint8 response[] = {
+        0x01,
+        0x20, 0x00, 0x80, 0x03, 0x01,
+        0x02, 0x01, 0x00, 0x4F, 0x00, 0x14, 0x00, 0x02,
+        0x04, 0x00, 0x00, 0x00, 0x00, 0x00, 0x12, 0x01,
+        0x00, 0xC0, 0x14, 0x06, 0x00, 0xBE, 0xF6, 0x9C,
+        0xFF, 0x64, 0x00
+    };
+
+    message = nas_get_signal_info_response_new (response, G_N_ELEMENTS (response));
+
+    st = qmi_message_nas_get_signal_info_response_parse_into (message, &out, &error);
+    g_assert_no_error (error);
+    g_assert (st);
+
+    g_assert (out.gsm_signal_strength_set);
+    g_assert_cmpint (out.gsm_signal_strength, ==, -64);
+    g_assert (out.lte_signal_strength_set);
+    g_assert_cmpint (out.lte_signal_strength_rssi, ==, -66);
+    g_assert_cmpint (out.lte_signal_strength_rsrq, ==, -10);
+    g_assert_cmpint (out.lte_signal_strength_rsrp, ==, -100);
+    g_assert_cmpint (out.lte_signal_strength_snr, ==, 100);
+    g_assert (!out.cdma_signal_strength_set);
+    g_assert (!out.hdr_signal_strength_set);
+    g_assert (!out.wcdma_signal_strength_set);
+
+    qmi_message_unref (message);
+}
+
+static void
+test_generated_nas_get_signal_info_parse_into_protocol_error (void)
+{
+    QmiMessageNasGetSignalInfoResponse out;
+    QmiMessage *message;
+    GError *error = NULL;
+    gboolean st;
+    const guint8 response[] = {
+        0x01,
+        0x13, 0x00, 0x80, 0x03, 0x01,
+        0x02, 0x01, 0x00, 0x4F, 0x00, 0x07, 0x00, 0x02,
+        0x04, 0x00, 0x01, 0x00, 0x03, 0x00
+    };
+
+    message = nas_get_signal_info_response_new (response, G_N_ELEMENTS (response));
+
+    st = qmi_message_nas_get_signal_info_response_parse_into (message, &out, &error);
+    g_assert_error (error, QMI_PROTOCOL_ERROR, QMI_PROTOCOL_ERROR_INTERNAL);
+    g_assert (!st);
+
+    g_error_free (error);
+    qmi_message_unref (message);
+}
+
+static void
+test_generated_nas_get_signal_info_parse_into_missing_result (void)
+{
+    QmiMessageNasGetSignalInfoResponse out;
+    QmiMessage *message;
+    GError *error = NULL;
+    gboolean st;
+    const guint8 response[] = {
+        0x01,
+        0x10, 0x00, 0x80, 0x03, 0x01,
+        0x02, 0x01, 0x00, 0x4F, 0x00, 0x04, 0x00, 0x12,
+        0x01, 0x00, 0xC0
+    };
+
+    message = nas_get_signal_info_response_new (response, G_N_ELEMENTS (response));
+
+    st = qmi_message_nas_get_signal_info_response_parse_into (message, &out, &error);
+    g_assert_error (error, QMI_CORE_ERROR, QMI_CORE_ERROR_INVALID_MESSAGE);
+    g_assert (!st);
+
+    g_error_free (error);
+    qmi_message_unref (message);
+}
+
+static void
+test_generated_nas_get_signal_info_parse_into_truncated_result (void)
+{
+    QmiMessageNasGetSignalInfoResponse out;
+    QmiMessage *message;
+    GError *error = NULL;
+    gboolean st;
+    /* Result with the status but without the error code */
+    const guint8 response[] = {
+        0x01,
+        0x11, 0x00, 0x80, 0x03, 0x01,
+        0x02, 0x01, 0x00, 0x4F, 0x00, 0x05, 0x00, 0x02,
+        0x02, 0x00, 0x00, 0x00
+    };
+
+    message = nas_get_signal_info_response_new (response, G_N_ELEMENTS (response));
+
+    st = qmi_message_nas_get_signal_info_response_parse_into (message, &out, &error);
+    g_assert_error (error, QMI_CORE_ERROR, QMI_CORE_ERROR_TLV_TOO_LONG);
+    g_assert (!st);
+
+    g_error_free (error);
+    qmi_message_unref (message);
+}
+
+static void
+test_generated_nas_get_signal_info_parse_into_truncated_field (void)
+{
+    QmiMessageNasGetSignalInfoResponse out;
+    QmiMessage *message;
+    GError *error = NULL;
+    gboolean st;
+    /* LTE signal strength without the SNR, which is skipped */
+    const guint8 response[] = {
+        0x01,
+        0x1E, 0x00, 0x80, 0x03, 0x01,
+        0x02, 0x01, 0x00, 0x4F, 0x00, 0x12, 0x00, 0x02,
+        0x04, 0x00, 0x00, 0x00, 0x00, 0x00, 0x14, 0x04,
+        0x00, 0xBE, 0xF6, 0x9C, 0xFF, 0x12, 0x01, 0x00,
+        0xC0
+    };
+
+    message = nas_get_signal_info_response_new (response, G_N_ELEMENTS (response));
+
+    st = qmi_message_nas_get_signal_info_response_parse_into (message, &out, &error);
+    g_assert_no_error (error);
+    g_assert (st);
+
+    g_assert (!out.lte_signal_strength_set);
+    g_assert (out.gsm_signal_strength_set);
+    g_assert_cmpint (out.gsm_signal_strength, ==, -64);
+
+    qmi_message_unref (message);
+}
+
+#endif /* HAVE_QMI_MESSAGE_NAS_GET_SIGNAL_INFO */
+
 /*****************************************************************************/
 
 int main (int argc, char **argv)
@@ -1103,9 +1384,19 @@ int main (int argc, char **argv)
 #if defined HAVE_QMI_MESSAGE_NAS_GET_SERVING_SYSTEM
     TEST_ADD ("/libqmi-glib/generated/nas/get-serving-system", test_generated_nas_get_serving_system);
 #endif
+#if defined HAVE_QMI_MESSAGE_NAS_RESET && defined HAVE_QMI_INDICATION_NAS_SERVING_SYSTEM
+    TEST_ADD ("/libqmi-glib/generated/nas/serving-system-indication/changed-fields", test_generated_nas_serving_system_indication_changed_fields);
+#endif
 #if defined HAVE_QMI_MESSAGE_NAS_GET_SYSTEM_INFO
     TEST_ADD ("/libqmi-glib/generated/nas/get-system-info", test_generated_nas_get_system_info);
 #endif
+#if defined HAVE_QMI_MESSAGE_NAS_GET_SIGNAL_INFO
+    g_test_add_func ("/libqmi-glib/generated/nas/get-signal-info/parse-into",                  test_generated_nas_get_signal_info_parse_into);
+    g_test_add_func ("/libqmi-glib/generated/nas/get-signal-info/parse-into/protocol-error",   test_generated_nas_get_signal_info_parse_into_protocol_error);
+    g_test_add_func ("/libqmi-glib/generated/nas/get-signal-info/parse-into/missing-result",   test_generated_nas_get_signal_info_parse_into_missing_result);
+    g_test_add_func ("/libqmi-glib/generated/nas/get-signal-info/parse-into/truncated-result", test_generated_nas_get_signal_info_parse_into_truncated_result);
+    g_test_add_func ("/libqmi-glib/generated/nas/get-signal-info/parse-into/truncated-field",  test_generated_nas_get_signal_info_parse_into_truncated_field);
+#endif
 
     return g_test_run ();
 }
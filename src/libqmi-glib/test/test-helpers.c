@@ -0,0 +1,148 @@
+/* -*- Mode: C; tab-width: 4; indent-tabs-mode: nil; c-basic-offset: 4 -*- */
+/*
+ * This program is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 2 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details:
+ *
+ * Copyright (C) 2012-2017 Aleksander Morgado <aleksander@aleksander.es>
+ */
+
+#include <config.h>
+#include <glib-object.h>
+#include <string.h>
+
+#include <libqmi-glib.h>
+#include "qmi-helpers.h"
+
+/*****************************************************************************/
+/* Pools */
+
+#define TEST_POOL_BLOCK_SIZE 64
+
+static void
+test_helpers_pool_max_items (void)
+{
+    g_assert_cmpuint (qmi_utils_get_container_pool_max_items (), ==, QMI_HELPERS_POOL_DEFAULT_MAX_ITEMS);
+
+    qmi_utils_set_container_pool_max_items (5);
+    g_assert_cmpuint (qmi_utils_get_container_pool_max_items (), ==, 5);
+
+    qmi_utils_set_container_pool_max_items (0);
+    g_assert_cmpuint (qmi_utils_get_container_pool_max_items (), ==, 0);
+
+    qmi_utils_set_container_pool_max_items (QMI_HELPERS_POOL_DEFAULT_MAX_ITEMS);
+}
+
+static void
+test_helpers_pool_reuse (void)
+{
+    static QmiHelpersPool  pool;
+    guint8                *first;
+    guint8                *second;
+    guint                  i;
+
+    first = qmi_helpers_pool_alloc0 (&pool, TEST_POOL_BLOCK_SIZE);
+    for (i = 0; i < TEST_POOL_BLOCK_SIZE; i++)
+        g_assert_cmpuint (first[i], ==, 0);
+    memset (first, 0xAA, TEST_POOL_BLOCK_SIZE);
+    qmi_helpers_pool_free (&pool, TEST_POOL_BLOCK_SIZE, first);
+    g_assert_cmpuint (pool.n_free, ==, 1);
+
+    /* The freed block is given again, zeroed */
+    second = qmi_helpers_pool_alloc0 (&pool, TEST_POOL_BLOCK_SIZE);
+    g_assert (second == first);
+    g_assert_cmpuint (pool.n_free, ==, 0);
+    for (i = 0; i < TEST_POOL_BLOCK_SIZE; i++)
+        g_assert_cmpuint (second[i], ==, 0);
+
+    qmi_helpers_pool_free (&pool, TEST_POOL_BLOCK_SIZE, second);
+}
+
+static void
+test_helpers_pool_disabled (void)
+{
+    static QmiHelpersPool  pool;
+    gpointer              *blocks;
+    guint                  n_blocks = QMI_HELPERS_POOL_TRIM_PERIOD + 10;
+    guint                  i;
+
+    blocks = g_new (gpointer, n_blocks);
+    for (i = 0; i < n_blocks; i++)
+        blocks[i] = qmi_helpers_pool_alloc0 (&pool, TEST_POOL_BLOCK_SIZE);
+
+    for (i = 0; i < 10; i++)
+        qmi_helpers_pool_free (&pool, TEST_POOL_BLOCK_SIZE, blocks[i]);
+    g_assert_cmpuint (pool.n_free, ==, 10);
+
+    /* Once disabled, freed blocks are not kept any more... */
+    qmi_utils_set_container_pool_max_items (0);
+    for (; i < QMI_HELPERS_POOL_TRIM_PERIOD - 1; i++)
+        qmi_helpers_pool_free (&pool, TEST_POOL_BLOCK_SIZE, blocks[i]);
+    g_assert_cmpuint (pool.n_free, ==, 10);
+
+    /* ...and the ones already kept are released at the next trim */
+    for (; i < n_blocks; i++) {
+        qmi_helpers_pool_free (&pool, TEST_POOL_BLOCK_SIZE, blocks[i]);
+        g_assert_cmpuint (pool.n_free, ==, 0);
+    }
+
+    for (i = 0; i < 10; i++) {
+        blocks[0] = qmi_helpers_pool_alloc0 (&pool, TEST_POOL_BLOCK_SIZE);
+        qmi_helpers_pool_free (&pool, TEST_POOL_BLOCK_SIZE, blocks[0]);
+        g_assert_cmpuint (pool.n_free, ==, 0);
+    }
+
+    qmi_utils_set_container_pool_max_items (QMI_HELPERS_POOL_DEFAULT_MAX_ITEMS);
+    g_free (blocks);
+}
+
+static void
+test_helpers_pool_trim (void)
+{
+    static QmiHelpersPool  pool;
+    gpointer               blocks[QMI_HELPERS_POOL_DEFAULT_MAX_ITEMS + 10];
+    guint                  n_frees = 0;
+    guint                  i;
+
+    /* A burst keeps as many blocks as were in use, up to the maximum */
+    for (i = 0; i < G_N_ELEMENTS (blocks); i++)
+        blocks[i] = qmi_helpers_pool_alloc0 (&pool, TEST_POOL_BLOCK_SIZE);
+    for (i = 0; i < G_N_ELEMENTS (blocks); i++)
+        qmi_helpers_pool_free (&pool, TEST_POOL_BLOCK_SIZE, blocks[i]);
+    n_frees += G_N_ELEMENTS (blocks);
+    g_assert_cmpuint (pool.n_free, ==, QMI_HELPERS_POOL_DEFAULT_MAX_ITEMS);
+
+    /* Kept until the end of the trim period, as the burst is its peak usage */
+    for (; n_frees < QMI_HELPERS_POOL_TRIM_PERIOD; n_frees++) {
+        blocks[0] = qmi_helpers_pool_alloc0 (&pool, TEST_POOL_BLOCK_SIZE);
+        qmi_helpers_pool_free (&pool, TEST_POOL_BLOCK_SIZE, blocks[0]);
+    }
+    g_assert_cmpuint (pool.n_free, ==, QMI_HELPERS_POOL_DEFAULT_MAX_ITEMS);
+
+    /* And released during the next one, down to the single block in use */
+    for (i = 0; i < QMI_HELPERS_POOL_TRIM_PERIOD; i++) {
+        blocks[0] = qmi_helpers_pool_alloc0 (&pool, TEST_POOL_BLOCK_SIZE);
+        qmi_helpers_pool_free (&pool, TEST_POOL_BLOCK_SIZE, blocks[0]);
+    }
+    g_assert_cmpuint (pool.n_free, ==, 1);
+}
+
+/*****************************************************************************/
+
+int main (int argc, char **argv)
+{
+    g_test_init (&argc, &argv, NULL);
+
+    g_test_add_func ("/libqmi-glib/helpers/pool/max-items", test_helpers_pool_max_items);
+    g_test_add_func ("/libqmi-glib/helpers/pool/reuse",     test_helpers_pool_reuse);
+    g_test_add_func ("/libqmi-glib/helpers/pool/disabled",  test_helpers_pool_disabled);
+    g_test_add_func ("/libqmi-glib/helpers/pool/trim",      test_helpers_pool_trim);
+
+    return g_test_run ();
+}
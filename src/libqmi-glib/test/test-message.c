@@ -457,6 +457,129 @@ test_message_new_response_error (void)
     _g_assert_cmpmem (buffer, buffer_length, expected_buffer, sizeof (expected_buffer));
 }
 
+static void
+test_message_new_request_sized (void)
+{
+    static const QmiService services[] = { QMI_SERVICE_CTL, QMI_SERVICE_DMS };
+    guint                   i;
+
+    for (i = 0; i < G_N_ELEMENTS (services); i++) {
+        g_autoptr(QmiMessage)  self = NULL;
+        g_autoptr(QmiMessage)  expected = NULL;
+        g_autoptr(GError)      error = NULL;
+        QmiMessage            *messages[2];
+        gsize                  header_length;
+        gsize                  tlvs_size;
+        gboolean               ret;
+        gsize                  init_offset;
+        guint                  j;
+
+        /* One TLV with a 32-bit value, one with a 1-byte prefixed string */
+        tlvs_size = (3 + 4) + (3 + 1 + 4);
+
+        self = qmi_message_new_sized (services[i], 0x01, 0x02, 0xFFFF, tlvs_size);
+        g_assert (self);
+        expected = qmi_message_new (services[i], 0x01, 0x02, 0xFFFF);
+        g_assert (expected);
+
+        /* Same header as a message created without a size hint */
+        header_length = qmi_message_get_length (self);
+        _g_assert_cmpmem (self->data, self->len, expected->data, expected->len);
+
+        messages[0] = self;
+        messages[1] = expected;
+        for (j = 0; j < G_N_ELEMENTS (messages); j++) {
+            init_offset = qmi_message_tlv_write_init (messages[j], 0x01, &error);
+            g_assert_no_error (error);
+            g_assert (init_offset > 0);
+            ret = qmi_message_tlv_write_guint32 (messages[j], QMI_ENDIAN_LITTLE, 0x12345678, &error);
+            g_assert_no_error (error);
+            g_assert (ret);
+            ret = qmi_message_tlv_write_complete (messages[j], init_offset, &error);
+            g_assert_no_error (error);
+            g_assert (ret);
+
+            init_offset = qmi_message_tlv_write_init (messages[j], 0x02, &error);
+            g_assert_no_error (error);
+            g_assert (init_offset > 0);
+            ret = qmi_message_tlv_write_string (messages[j], 1, "abcd", -1, &error);
+            g_assert_no_error (error);
+            g_assert (ret);
+            ret = qmi_message_tlv_write_complete (messages[j], init_offset, &error);
+            g_assert_no_error (error);
+            g_assert (ret);
+        }
+
+        /* The precomputed size is exactly what was written */
+        g_assert_cmpuint (qmi_message_get_length (self), ==, header_length + tlvs_size);
+        _g_assert_cmpmem (self->data, self->len, expected->data, expected->len);
+    }
+}
+
+static void
+test_message_new_request_from_template (void)
+{
+    /* Same layout as the templates of the generated request creators, with
+     * zero client and transaction IDs */
+    static const guint8 ctl_template[] = {
+        0x01,             /* marker */
+        0x0B, 0x00,       /* qmux length */
+        0x00,             /* qmux flags */
+        0x00,             /* service: CTL */
+        0x00,             /* client id */
+        0x00,             /* service flags */
+        0x00,             /* transaction */
+        0x22, 0x00,       /* message id */
+        0x00, 0x00,       /* all tlvs length */
+    };
+    static const guint8 dms_template[] = {
+        0x01,             /* marker */
+        0x0C, 0x00,       /* qmux length */
+        0x00,             /* qmux flags */
+        0x02,             /* service: DMS */
+        0x00,             /* client id */
+        0x00,             /* service flags */
+        0x00, 0x00,       /* transaction */
+        0x22, 0x00,       /* message id */
+        0x00, 0x00,       /* all tlvs length */
+    };
+    static const struct {
+        QmiService    service;
+        const guint8 *data;
+        gsize         data_len;
+        guint16       transaction_ids[3];
+    } templates[] = {
+        { QMI_SERVICE_CTL, ctl_template, sizeof (ctl_template), { 0x01, 0x55, 0xFF } },
+        { QMI_SERVICE_DMS, dms_template, sizeof (dms_template), { 0x0001, 0x00FF, 0xABCD } },
+    };
+    guint i;
+    guint j;
+
+    for (i = 0; i < G_N_ELEMENTS (templates); i++) {
+        for (j = 0; j < G_N_ELEMENTS (templates[i].transaction_ids); j++) {
+            g_autoptr(QmiMessage) self = NULL;
+            g_autoptr(QmiMessage) expected = NULL;
+
+            self = qmi_message_new_from_template (templates[i].data,
+                                                  templates[i].data_len,
+                                                  0x07,
+                                                  templates[i].transaction_ids[j]);
+            g_assert (self);
+            expected = qmi_message_new (templates[i].service,
+                                        0x07,
+                                        templates[i].transaction_ids[j],
+                                        0x0022);
+            g_assert (expected);
+
+            _g_assert_cmpmem (self->data, self->len, expected->data, expected->len);
+            g_assert_cmpuint (qmi_message_get_service (self), ==, templates[i].service);
+            g_assert_cmpuint (qmi_message_get_client_id (self), ==, 0x07);
+            g_assert_cmpuint (qmi_message_get_transaction_id (self), ==, templates[i].transaction_ids[j]);
+            g_assert_cmpuint (qmi_message_get_message_id (self), ==, 0x0022);
+        }
+    }
+}
+
 /*****************************************************************************/
 
 static void
@@ -1062,6 +1185,104 @@ test_message_tlv_rw_strings (void)
     g_free (str);
 }
 
+static void
+test_message_tlv_read_string_view (void)
+{
+    /* "Hello" in packed GSM-7, not valid UTF-8 */
+    static const guint8 gsm7[] = { 0xC8, 0x32, 0x9B, 0xFD, 0x06 };
+
+    g_autoptr(QmiMessage)  self = NULL;
+    g_autoptr(GError)      error = NULL;
+    gboolean               ret;
+    gsize                  init_offset;
+    guint16                tlv_length = 0;
+    gsize                  offset;
+    gsize                  gsm7_offset;
+    const gchar           *view;
+    gsize                  view_length;
+    g_autofree gchar      *converted = NULL;
+    g_autofree gchar      *str = NULL;
+
+    self = qmi_message_new (QMI_SERVICE_DMS, 0x01, 0x02, 0xFFFF);
+
+    init_offset = qmi_message_tlv_write_init (self, 0x01, &error);
+    g_assert_no_error (error);
+    g_assert (init_offset > 0);
+    ret = qmi_message_tlv_write_string (self, 1, "abcd", -1, &error);
+    g_assert_no_error (error);
+    g_assert (ret);
+    ret = qmi_message_tlv_write_string (self, 1, "", -1, &error);
+    g_assert_no_error (error);
+    g_assert (ret);
+    ret = qmi_message_tlv_write_string (self, 2, "abcdef", -1, &error);
+    g_assert_no_error (error);
+    g_assert (ret);
+    ret = qmi_message_tlv_write_string (self, 1, (const gchar *) gsm7, sizeof (gsm7), &error);
+    g_assert_no_error (error);
+    g_assert (ret);
+    ret = qmi_message_tlv_write_complete (self, init_offset, &error);
+    g_assert_no_error (error);
+    g_assert (ret);
+
+    /* Now read */
+    init_offset = qmi_message_tlv_read_init (self, 0x01, &tlv_length, &error);
+    g_assert_no_error (error);
+    g_assert (init_offset > 0);
+    offset = 0;
+
+    /* Valid UTF-8 strings are given from the message itself, not copied */
+    ret = qmi_message_tlv_read_string_view (self, init_offset, &offset, 1, 0, &view, &view_length, &converted, &error);
+    g_assert_no_error (error);
+    g_assert (ret);
+    g_assert (!converted);
+    g_assert (view == (const gchar *) &self->data[init_offset + 3 + 1]);
+    g_assert_cmpuint (view_length, ==, 4);
+    g_assert (memcmp (view, "abcd", 4) == 0);
+    g_assert_cmpuint (offset, ==, 1 + 4);
+
+    /* Empty strings too */
+    ret = qmi_message_tlv_read_string_view (self, init_offset, &offset, 1, 0, &view, &view_length, &converted, &error);
+    g_assert_no_error (error);
+    g_assert (ret);
+    g_assert (!converted);
+    g_assert_cmpuint (view_length, ==, 0);
+    g_assert_cmpuint (offset, ==, 1 + 4 + 1);
+
+    /* Strings longer than the maximum size are truncated, but fully skipped */
+    ret = qmi_message_tlv_read_string_view (self, init_offset, &offset, 2, 4, &view, &view_length, &converted, &error);
+    g_assert_no_error (error);
+    g_assert (ret);
+    g_assert (!converted);
+    g_assert_cmpuint (view_length, ==, 4);
+    g_assert (memcmp (view, "abcd", 4) == 0);
+    g_assert_cmpuint (offset, ==, 1 + 4 + 1 + 2 + 6);
+
+    /* Other strings are converted, as when they're copied */
+    gsm7_offset = offset;
+    ret = qmi_message_tlv_read_string_view (self, init_offset, &offset, 1, 0, &view, &view_length, &converted, &error);
+    g_assert_no_error (error);
+    g_assert (ret);
+    g_assert (converted);
+    g_assert (view == converted);
+    g_assert_cmpuint (view_length, ==, strlen (converted));
+    g_assert_cmpstr (converted, ==, "Hello");
+    g_assert_cmpuint (offset, ==, tlv_length);
+
+    ret = qmi_message_tlv_read_string (self, init_offset, &gsm7_offset, 1, 0, &str, &error);
+    g_assert_no_error (error);
+    g_assert (ret);
+    g_assert_cmpstr (str, ==, converted);
+    g_assert_cmpuint (gsm7_offset, ==, offset);
+
+    /* Nothing else to read */
+    g_clear_pointer (&converted, g_free);
+    ret = qmi_message_tlv_read_string_view (self, init_offset, &offset, 1, 0, &view, &view_length, &converted, &error);
+    g_assert_error (error, QMI_CORE_ERROR, QMI_CORE_ERROR_TLV_TOO_LONG);
+    g_assert (!ret);
+    g_assert (!converted);
+    g_assert_cmpuint (offset, ==, tlv_length);
+}
+
 static void
 test_message_tlv_rw_mixed (void)
 {
@@ -1196,6 +1417,175 @@ test_message_tlv_rw_mixed (void)
     g_assert_cmpuint (int64, ==, 0 - 0x1212121212121212LL);
 }
 
+static void
+test_message_tlv_rw_integer_array (void)
+{
+    static const guint16 values16[] = { 0x0102, 0xA1B2, 0xFFFE };
+    static const guint32 values32[] = { 0x01020304, 0xA1B2C3D4, 0xFFFFFFFE };
+    static const guint64 values64[] = { 0x0102030405060708ULL, 0xA1B2C3D4E5F60718ULL, 0xFFFFFFFFFFFFFFFEULL };
+    static const struct {
+        guint         element_size;
+        gconstpointer values;
+    } arrays[] = {
+        { 2, values16 },
+        { 4, values32 },
+        { 8, values64 },
+    };
+    static const QmiEndian endians[] = { QMI_ENDIAN_LITTLE, QMI_ENDIAN_BIG };
+    guint arrays_i;
+    guint endians_i;
+
+    for (arrays_i = 0; arrays_i < G_N_ELEMENTS (arrays); arrays_i++) {
+        for (endians_i = 0; endians_i < G_N_ELEMENTS (endians); endians_i++) {
+            g_autoptr(QmiMessage) self = NULL;
+            g_autoptr(GError)     error = NULL;
+            gboolean              ret;
+            gsize                 init_offset;
+            guint16               tlv_length = 0;
+            gsize                 offset;
+            guint                 element_size;
+            QmiEndian             endian;
+            guint8                uint8;
+            guint16               uint16;
+            guint32               uint32;
+            guint64               uint64;
+            guint64               out[G_N_ELEMENTS (values64) + 1];
+            guint                 i;
+
+            element_size = arrays[arrays_i].element_size;
+            endian = endians[endians_i];
+
+            self = qmi_message_new (QMI_SERVICE_DMS, 0x01, 0x02, 0xFFFF);
+
+            init_offset = qmi_message_tlv_write_init (self, 0x01, &error);
+            g_assert_no_error (error);
+            g_assert (init_offset > 0);
+
+            /* One byte before the array, so that it isn't aligned */
+            ret = qmi_message_tlv_write_guint8 (self, 0xFF, &error);
+            g_assert_no_error (error);
+            g_assert (ret);
+
+            ret = qmi_message_tlv_write_integer_array (self, endian, element_size, 3, arrays[arrays_i].values, &error);
+            g_assert_no_error (error);
+            g_assert (ret);
+
+            ret = qmi_message_tlv_write_complete (self, init_offset, &error);
+            g_assert_no_error (error);
+            g_assert (ret);
+
+            /* Now read */
+            init_offset = qmi_message_tlv_read_init (self, 0x01, &tlv_length, &error);
+            g_assert_no_error (error);
+            g_assert (init_offset > 0);
+            g_assert_cmpuint (tlv_length, ==, 1 + 3 * element_size);
+
+            /* The array must be written as the single items would be */
+            offset = 0;
+            ret = qmi_message_tlv_read_guint8 (self, init_offset, &offset, &uint8, &error);
+            g_assert_no_error (error);
+            g_assert (ret);
+            g_assert_cmpuint (uint8, ==, 0xFF);
+
+            for (i = 0; i < 3; i++) {
+                switch (element_size) {
+                case 2:
+                    ret = qmi_message_tlv_read_guint16 (self, init_offset, &offset, endian, &uint16, &error);
+                    g_assert_no_error (error);
+                    g_assert (ret);
+                    g_assert_cmpuint (uint16, ==, values16[i]);
+                    break;
+                case 4:
+                    ret = qmi_message_tlv_read_guint32 (self, init_offset, &offset, endian, &uint32, &error);
+                    g_assert_no_error (error);
+                    g_assert (ret);
+                    g_assert_cmpuint (uint32, ==, values32[i]);
+                    break;
+                case 8:
+                    ret = qmi_message_tlv_read_guint64 (self, init_offset, &offset, endian, &uint64, &error);
+                    g_assert_no_error (error);
+                    g_assert (ret);
+                    g_assert_cmpuint (uint64, ==, values64[i]);
+                    break;
+                default:
+                    g_assert_not_reached ();
+                }
+            }
+
+            /* And read back as a whole */
+            offset = 1;
+            memset (out, 0, sizeof (out));
+            ret = qmi_message_tlv_read_integer_array (self, init_offset, &offset, endian, element_size, 3, out, &error);
+            g_assert_no_error (error);
+            g_assert (ret);
+            g_assert_cmpuint (offset, ==, tlv_length);
+            g_assert (memcmp (out, arrays[arrays_i].values, 3 * element_size) == 0);
+
+            /* Truncated: one more item than available, offset must not change */
+            offset = 1;
+            ret = qmi_message_tlv_read_integer_array (self, init_offset, &offset, endian, element_size, 4, out, &error);
+            g_assert_error (error, QMI_CORE_ERROR, QMI_CORE_ERROR_TLV_TOO_LONG);
+            g_assert (!ret);
+            g_assert_cmpuint (offset, ==, 1);
+        }
+    }
+}
+
+static void
+test_message_tlv_rw_integer_array_overflow (void)
+{
+    static const guint32 values32[] = { 0x01020304 };
+
+    g_autoptr(QmiMessage) self = NULL;
+    g_autoptr(GError)     error = NULL;
+    gboolean              ret;
+    gsize                 init_offset;
+    gsize                 offset;
+    guint                 message_length;
+    guint64               out[1];
+
+    self = qmi_message_new (QMI_SERVICE_DMS, 0x01, 0x02, 0xFFFF);
+
+    init_offset = qmi_message_tlv_write_init (self, 0x01, &error);
+    g_assert_no_error (error);
+    g_assert (init_offset > 0);
+
+    /* The whole array must fit in the message, nothing is written otherwise */
+    message_length = self->len;
+    ret = qmi_message_tlv_write_integer_array (self, QMI_ENDIAN_LITTLE, 4, G_MAXUINT16, values32, &error);
+    g_assert_error (error, QMI_CORE_ERROR, QMI_CORE_ERROR_TLV_TOO_LONG);
+    g_assert (!ret);
+    g_assert_cmpuint (self->len, ==, message_length);
+    g_clear_error (&error);
+
+    ret = qmi_message_tlv_write_integer_array (self, QMI_ENDIAN_LITTLE, 4, G_N_ELEMENTS (values32), values32, &error);
+    g_assert_no_error (error);
+    g_assert (ret);
+
+    ret = qmi_message_tlv_write_complete (self, init_offset, &error);
+    g_assert_no_error (error);
+    g_assert (ret);
+
+    init_offset = qmi_message_tlv_read_init (self, 0x01, NULL, &error);
+    g_assert_no_error (error);
+    g_assert (init_offset > 0);
+
+    /* Item counts whose total size wouldn't fit in any TLV, or would even
+     * overflow the size computation */
+    offset = 0;
+    ret = qmi_message_tlv_read_integer_array (self, init_offset, &offset, QMI_ENDIAN_LITTLE, 2, (G_MAXUINT16 / 2) + 1, out, &error);
+    g_assert_error (error, QMI_CORE_ERROR, QMI_CORE_ERROR_TLV_TOO_LONG);
+    g_assert (!ret);
+    g_assert_cmpuint (offset, ==, 0);
+    g_clear_error (&error);
+
+    ret = qmi_message_tlv_read_integer_array (self, init_offset, &offset, QMI_ENDIAN_LITTLE, 8, G_MAXUINT, out, &error);
+    g_assert_error (error, QMI_CORE_ERROR, QMI_CORE_ERROR_TLV_TOO_LONG);
+    g_assert (!ret);
+    g_assert_cmpuint (offset, ==, 0);
+    g_clear_error (&error);
+}
+
 static void
 test_message_tlv_write_overflow (void)
 {
@@ -1529,6 +1919,235 @@ test_message_tlv_read_overflow_tlv (void)
     g_clear_pointer (&self, qmi_message_unref);
 }
 
+static void
+test_message_tlv_read_block (void)
+{
+    static const guint8 block[] = { 0x00, 0x01, 0x02, 0x03, 0x04, 0x05 };
+
+    g_autoptr(QmiMessage)  self = NULL;
+    g_autoptr(GError)      error = NULL;
+    gboolean               ret;
+    gsize                  init_offset;
+    gsize                  offset;
+    const guint8          *ptr;
+
+    self = qmi_message_new (QMI_SERVICE_DMS, 0x01, 0x02, 0xFFFF);
+
+    init_offset = qmi_message_tlv_write_init (self, 0x01, &error);
+    g_assert_no_error (error);
+    g_assert (init_offset > 0);
+    ret = qmi_message_tlv_write_integer_array (self, QMI_ENDIAN_LITTLE, 1, sizeof (block), block, &error);
+    g_assert_no_error (error);
+    g_assert (ret);
+    ret = qmi_message_tlv_write_complete (self, init_offset, &error);
+    g_assert_no_error (error);
+    g_assert (ret);
+
+    /* A second TLV, so that reading past the first one would still be
+     * within the message */
+    init_offset = qmi_message_tlv_write_init (self, 0x02, &error);
+    g_assert_no_error (error);
+    g_assert (init_offset > 0);
+    ret = qmi_message_tlv_write_guint16 (self, QMI_ENDIAN_LITTLE, 0xFFFF, &error);
+    g_assert_no_error (error);
+    g_assert (ret);
+    ret = qmi_message_tlv_write_complete (self, init_offset, &error);
+    g_assert_no_error (error);
+    g_assert (ret);
+
+    init_offset = qmi_message_tlv_read_init (self, 0x01, NULL, &error);
+    g_assert_no_error (error);
+    g_assert (init_offset > 0);
+
+    /* Exact size */
+    offset = 0;
+    ptr = qmi_message_tlv_read_block (self, init_offset, &offset, 3, 2, &error);
+    g_assert_no_error (error);
+    g_assert (ptr);
+    g_assert_cmpuint (offset, ==, sizeof (block));
+    g_assert (memcmp (ptr, block, sizeof (block)) == 0);
+
+    /* Empty block at the end of the TLV */
+    ptr = qmi_message_tlv_read_block (self, init_offset, &offset, 0, 1, &error);
+    g_assert_no_error (error);
+    g_assert (ptr);
+    g_assert_cmpuint (offset, ==, sizeof (block));
+
+    /* Nothing else to read */
+    ptr = qmi_message_tlv_read_block (self, init_offset, &offset, 1, 1, &error);
+    g_assert_error (error, QMI_CORE_ERROR, QMI_CORE_ERROR_TLV_TOO_LONG);
+    g_assert (!ptr);
+    g_assert_cmpuint (offset, ==, sizeof (block));
+    g_clear_error (&error);
+
+    /* Exact size from the middle of the TLV */
+    offset = 2;
+    ptr = qmi_message_tlv_read_block (self, init_offset, &offset, 1, 4, &error);
+    g_assert_no_error (error);
+    g_assert (ptr);
+    g_assert_cmpuint (offset, ==, sizeof (block));
+    g_assert (memcmp (ptr, &block[2], 4) == 0);
+
+    /* Truncated, one byte short */
+    offset = 0;
+    ptr = qmi_message_tlv_read_block (self, init_offset, &offset, 7, 1, &error);
+    g_assert_error (error, QMI_CORE_ERROR, QMI_CORE_ERROR_TLV_TOO_LONG);
+    g_assert (!ptr);
+    g_assert_cmpuint (offset, ==, 0);
+    g_clear_error (&error);
+
+    /* Truncated, last item incomplete */
+    offset = 2;
+    ptr = qmi_message_tlv_read_block (self, init_offset, &offset, 2, 3, &error);
+    g_assert_error (error, QMI_CORE_ERROR, QMI_CORE_ERROR_TLV_TOO_LONG);
+    g_assert (!ptr);
+    g_assert_cmpuint (offset, ==, 2);
+    g_clear_error (&error);
+
+    /* Block size not fitting in any TLV */
+    offset = 0;
+    ptr = qmi_message_tlv_read_block (self, init_offset, &offset, G_MAXUINT, G_MAXUINT, &error);
+    g_assert_error (error, QMI_CORE_ERROR, QMI_CORE_ERROR_TLV_TOO_LONG);
+    g_assert (!ptr);
+    g_assert_cmpuint (offset, ==, 0);
+    g_clear_error (&error);
+}
+
+/*****************************************************************************/
+
+static void
+test_message_tlv_read_next_empty (void)
+{
+    g_autoptr(QmiMessage) self = NULL;
+    guint8                tlv_type = 0;
+
+    self = qmi_message_new (QMI_SERVICE_DMS, 0x01, 0x02, 0xFFFF);
+    g_assert_cmpuint (qmi_message_tlv_read_next (self, 0, &tlv_type), ==, 0);
+    g_assert_cmpuint (tlv_type, ==, 0);
+}
+
+static void
+test_message_tlv_read_next_truncated (void)
+{
+    static const guint8 truncated_header[] = {
+        0x01,       /* marker */
+        0x12, 0x00, /* qmux length */
+        0x00,       /* qmux flags */
+        0x02,       /* service: DMS */
+        0x01,       /* client id */
+        0x00,       /* service flags */
+        0x02, 0x00, /* transaction */
+        0xFF, 0xFF, /* message id */
+        0x06, 0x00, /* all tlvs length */
+        /* TLV */
+        0x01,       /* tlv type */
+        0x01, 0x00, /* tlv size */
+        0xAA,
+        /* Truncated TLV header */
+        0x02,       /* tlv type */
+        0x05        /* tlv size, first byte only */
+    };
+    static const guint8 truncated_value[] = {
+        0x01,       /* marker */
+        0x14, 0x00, /* qmux length */
+        0x00,       /* qmux flags */
+        0x02,       /* service: DMS */
+        0x01,       /* client id */
+        0x00,       /* service flags */
+        0x02, 0x00, /* transaction */
+        0xFF, 0xFF, /* message id */
+        0x08, 0x00, /* all tlvs length */
+        /* TLV */
+        0x01,       /* tlv type */
+        0x01, 0x00, /* tlv size */
+        0xAA,
+        /* TLV with a truncated value */
+        0x02,       /* tlv type */
+        0x05, 0x00, /* tlv size */
+        0xBB
+    };
+    const guint8 *buffers[] = { truncated_header, truncated_value };
+    gsize         buffer_lengths[] = { sizeof (truncated_header), sizeof (truncated_value) };
+    guint         i;
+
+    for (i = 0; i < G_N_ELEMENTS (buffers); i++) {
+        g_autoptr(QmiMessage) self = NULL;
+        gsize                 tlv_offset;
+        guint8                tlv_type = 0;
+
+        /* Built directly in the array, as these wouldn't pass the validation
+         * done when creating messages from raw data */
+        self = (QmiMessage *) g_byte_array_append (g_byte_array_sized_new (buffer_lengths[i]), buffers[i], buffer_lengths[i]);
+
+        /* The first TLV is complete */
+        tlv_offset = qmi_message_tlv_read_next (self, 0, &tlv_type);
+        g_assert_cmpuint (tlv_offset, ==, 13);
+        g_assert_cmpuint (tlv_type, ==, 0x01);
+
+        /* The second one overflows the message */
+        tlv_type = 0;
+        tlv_offset = qmi_message_tlv_read_next (self, tlv_offset, &tlv_type);
+        g_assert_cmpuint (tlv_offset, ==, 0);
+        g_assert_cmpuint (tlv_type, ==, 0);
+    }
+}
+
+static void
+test_message_tlv_read_next_duplicated (void)
+{
+    static const guint8 tlv_types[] = { 0x10, 0x11, 0x10 };
+
+    g_autoptr(QmiMessage)  self = NULL;
+    g_autoptr(GError)      error = NULL;
+    gboolean               ret;
+    gsize                  init_offset;
+    gsize                  tlv_offset;
+    gsize                  first_tlv_offset = 0;
+    guint8                 tlv_type;
+    gsize                  offset;
+    guint8                 uint8;
+    guint                  i;
+
+    self = qmi_message_new (QMI_SERVICE_DMS, 0x01, 0x02, 0xFFFF);
+
+    /* Each TLV holds its own index */
+    for (i = 0; i < G_N_ELEMENTS (tlv_types); i++) {
+        init_offset = qmi_message_tlv_write_init (self, tlv_types[i], &error);
+        g_assert_no_error (error);
+        g_assert (init_offset > 0);
+        ret = qmi_message_tlv_write_guint8 (self, i, &error);
+        g_assert_no_error (error);
+        g_assert (ret);
+        ret = qmi_message_tlv_write_complete (self, init_offset, &error);
+        g_assert_no_error (error);
+        g_assert (ret);
+    }
+
+    /* All TLVs are walked in order, including the duplicated ones */
+    for (i = 0, tlv_offset = qmi_message_tlv_read_next (self, 0, &tlv_type);
+         tlv_offset;
+         i++, tlv_offset = qmi_message_tlv_read_next (self, tlv_offset, &tlv_type)) {
+        g_assert_cmpuint (i, <, G_N_ELEMENTS (tlv_types));
+        g_assert_cmpuint (tlv_type, ==, tlv_types[i]);
+
+        offset = 0;
+        ret = qmi_message_tlv_read_guint8 (self, tlv_offset, &offset, &uint8, &error);
+        g_assert_no_error (error);
+        g_assert (ret);
+        g_assert_cmpuint (uint8, ==, i);
+
+        /* The first occurrence wins, as in the generated parsers */
+        if (tlv_type == 0x10 && !first_tlv_offset)
+            first_tlv_offset = tlv_offset;
+    }
+    g_assert_cmpuint (i, ==, G_N_ELEMENTS (tlv_types));
+
+    /* Same TLV as the one found when looking for it explicitly */
+    init_offset = qmi_message_tlv_read_init (self, 0x10, NULL, &error);
+    g_assert_no_error (error);
+    g_assert_cmpuint (init_offset, ==, first_tlv_offset);
+}
+
 /*****************************************************************************/
 
 static void
@@ -1605,6 +2224,8 @@ int main (int argc, char **argv)
     g_test_add_func ("/libqmi-glib/message/new/request-from-data", test_message_new_request_from_data);
     g_test_add_func ("/libqmi-glib/message/new/response/ok",       test_message_new_response_ok);
     g_test_add_func ("/libqmi-glib/message/new/response/error",    test_message_new_response_error);
+    g_test_add_func ("/libqmi-glib/message/new/request-sized",     test_message_new_request_sized);
+    g_test_add_func ("/libqmi-glib/message/new/request-template",  test_message_new_request_from_template);
 
     g_test_add_func ("/libqmi-glib/message/tlv-write/empty",           test_message_tlv_write_empty);
     g_test_add_func ("/libqmi-glib/message/tlv-write/reset",           test_message_tlv_write_reset);
@@ -1614,10 +2235,17 @@ int main (int argc, char **argv)
     g_test_add_func ("/libqmi-glib/message/tlv-rw/64",                 test_message_tlv_rw_64);
     g_test_add_func ("/libqmi-glib/message/tlv-rw/sized",              test_message_tlv_rw_sized);
     g_test_add_func ("/libqmi-glib/message/tlv-rw/strings",            test_message_tlv_rw_strings);
+    g_test_add_func ("/libqmi-glib/message/tlv-read/string-view",      test_message_tlv_read_string_view);
     g_test_add_func ("/libqmi-glib/message/tlv-rw/mixed",              test_message_tlv_rw_mixed);
+    g_test_add_func ("/libqmi-glib/message/tlv-rw/integer-array",      test_message_tlv_rw_integer_array);
+    g_test_add_func ("/libqmi-glib/message/tlv-rw/integer-array-overflow", test_message_tlv_rw_integer_array_overflow);
     g_test_add_func ("/libqmi-glib/message/tlv-write/overflow",        test_message_tlv_write_overflow);
     g_test_add_func ("/libqmi-glib/message/tlv-read/overflow-message", test_message_tlv_read_overflow_message);
     g_test_add_func ("/libqmi-glib/message/tlv-read/overflow-tlv",     test_message_tlv_read_overflow_tlv);
+    g_test_add_func ("/libqmi-glib/message/tlv-read/block",            test_message_tlv_read_block);
+    g_test_add_func ("/libqmi-glib/message/tlv-read/next-empty",       test_message_tlv_read_next_empty);
+    g_test_add_func ("/libqmi-glib/message/tlv-read/next-truncated",   test_message_tlv_read_next_truncated);
+    g_test_add_func ("/libqmi-glib/message/tlv-read/next-duplicated",  test_message_tlv_read_next_duplicated);
 
     g_test_add_func ("/libqmi-glib/message/set-transaction-id/ctl",      test_message_set_transaction_id_ctl);
     g_test_add_func ("/libqmi-glib/message/set-transaction-id/services", test_message_set_transaction_id_services);